@@ -0,0 +1,101 @@
+"""
+CareNest Pro - Benchmark Helpers
+Description: Shared plumbing for the benchmark_* management commands.
+
+Benchmarks run against a throwaway database created next to the
+configured one (the same machinery the test runner uses), so they never
+touch real data. On SQLite the scratch database is a temporary file rather
+than the test runner's in-memory database, so that worker threads each get
+their own connection and really contend for locks.
+"""
+
+import math
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.db import connection, connections
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of numbers (0 for an empty list)."""
+    if not samples:
+        return 0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(samples):
+    """Latency summary in milliseconds for a list of durations in seconds."""
+    millis = [sample * 1000 for sample in samples]
+    return {
+        'count': len(millis),
+        'mean': sum(millis) / len(millis) if millis else 0,
+        'p50': percentile(millis, 50),
+        'p95': percentile(millis, 95),
+        'p99': percentile(millis, 99),
+        'max': max(millis, default=0),
+    }
+
+
+def format_summary(summary):
+    return (
+        f"n={summary['count']} mean={summary['mean']:.2f}ms p50={summary['p50']:.2f}ms "
+        f"p95={summary['p95']:.2f}ms p99={summary['p99']:.2f}ms max={summary['max']:.2f}ms"
+    )
+
+
+@contextmanager
+def scratch_database():
+    """
+    Create a migrated scratch copy of the default database (under the test
+    environment settings) for the block, then drop it.
+    """
+    test_settings = connection.settings_dict.setdefault('TEST', {})
+    original_name = test_settings.get('NAME')
+    scratch_file = None
+    if connection.vendor == 'sqlite':
+        handle, scratch_file = tempfile.mkstemp(prefix='carenest-bench-', suffix='.sqlite3')
+        os.close(handle)
+        test_settings['NAME'] = scratch_file
+
+    old_name = connection.settings_dict['NAME']
+    # Test client host, in-memory email, ...
+    setup_test_environment()
+    try:
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        yield
+    finally:
+        connections.close_all()
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+        test_settings['NAME'] = original_name
+        if scratch_file and os.path.exists(scratch_file):
+            os.remove(scratch_file)
+
+
+def timed(func, *args, **kwargs):
+    """Run func and return (result, elapsed seconds)."""
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def run_concurrently(func, jobs, threads):
+    """
+    Call func(job) for every job on a pool of `threads` workers and return
+    the results in job order. Each worker closes its database connection
+    when it finishes.
+    """
+    def worker(job):
+        try:
+            return func(job)
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return list(pool.map(worker, jobs))
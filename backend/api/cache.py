@@ -0,0 +1,149 @@
+"""
+CareNest Pro - Response Cache
+Description: Shared cache for hot, public read endpoints.
+
+Responses are stored under a key built from the view namespace, the
+current version stamp(s) and the normalized query string. Writes never
+delete entries: the owning app calls bump_version() from its signal
+receivers, which makes every key built from the old stamp unreachable (the
+TTL only reclaims memory). Cached responses carry an ETag, and a request
+whose If-None-Match matches gets a 304 without the view running.
+
+Version stamps live in the same Django cache as the responses, so a
+process-local backend (the default LocMemCache) only invalidates within
+one process; multi-process deployments should point CACHES at Redis.
+"""
+
+import hashlib
+import json
+from functools import wraps
+
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.response import Response
+
+from .codec import dumps
+
+CACHE_ALIAS = 'default'
+DEFAULT_TIMEOUT = 300
+KEY_PREFIX = 'rc'
+
+# Client cache-busting parameters that never change the response
+IGNORED_PARAMS = {'_', 'nocache'}
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def _version_key(namespace, scope=None):
+    if scope is None:
+        return f'{KEY_PREFIX}:v:{namespace}'
+    return f'{KEY_PREFIX}:v:{namespace}:{scope}'
+
+
+def get_versions(namespace, scope=None):
+    """Current stamp(s) for a namespace (and scope), in one cache round trip."""
+    keys = [_version_key(namespace)]
+    if scope is not None:
+        keys.append(_version_key(namespace, scope))
+    found = _cache().get_many(keys)
+    return [found.get(key, 0) for key in keys]
+
+
+def bump_version(namespace, scope=None):
+    """Invalidate every cached response of a namespace (or of one scope in it)."""
+    cache = _cache()
+    key = _version_key(namespace, scope)
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.set(key, 1, timeout=None)
+
+
+def normalize_query(query_dict):
+    """Canonical form of a QueryDict: sorted keys and values, blanks and cache-busters dropped."""
+    items = []
+    for name in sorted(query_dict.keys()):
+        if name in IGNORED_PARAMS:
+            continue
+        values = sorted(' '.join(value.split()) for value in query_dict.getlist(name))
+        values = [value for value in values if value]
+        if values:
+            items.append((name, values))
+    return json.dumps(items, separators=(',', ':'))
+
+
+def compute_etag(data):
+    payload = dumps(data, sort_keys=True)
+    return 'W/"{}"'.format(hashlib.sha1(payload.encode()).hexdigest())
+
+
+def _etag_matches(request, etag):
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    candidates = {tag.strip() for tag in header.split(',')}
+    # Weak comparison: W/"x" and "x" are the same validator
+    return '*' in candidates or etag in candidates or etag[2:] in candidates
+
+
+def _finish(request, data, etag):
+    if _etag_matches(request, etag):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(data)
+    response['ETag'] = etag
+    return response
+
+
+def conditional_response(request, data):
+    """A response for data built per request, with an ETag and If-None-Match support."""
+    return _finish(request, data, compute_etag(data))
+
+
+def cache_response(namespace, scope_kwarg=None, timeout=DEFAULT_TIMEOUT):
+    """
+    Cache successful GET responses of a view function or APIView method.
+
+    `scope_kwarg` names a URL kwarg (e.g. 'caregiver_id') whose value also
+    selects a per-scope version stamp, so one caregiver's write does not
+    flush everyone else's entries.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            # URL captures arrive as kwargs, so the request is always last
+            request = args[-1]
+            if request.method != 'GET':
+                return view(*args, **kwargs)
+
+            scope = kwargs.get(scope_kwarg) if scope_kwarg else None
+            versions = get_versions(namespace, scope)
+            raw_key = '|'.join([
+                request.path,
+                ':'.join(str(version) for version in versions),
+                normalize_query(request.GET),
+            ])
+            key = f'{KEY_PREFIX}:{namespace}:{hashlib.sha1(raw_key.encode()).hexdigest()}'
+
+            cache = _cache()
+            entry = cache.get(key)
+            if entry is not None:
+                data, etag = entry
+                return _finish(request, data, etag)
+
+            response = view(*args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+
+            etag = compute_etag(response.data)
+            cache.set(key, (response.data, etag), timeout)
+            if _etag_matches(request, etag):
+                return _finish(request, response.data, etag)
+            response['ETag'] = etag
+            return response
+        return wrapper
+    return decorator
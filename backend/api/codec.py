@@ -0,0 +1,117 @@
+"""
+CareNest Pro - JSON Codec
+Description: One JSON codec for API responses, request bodies and WebSocket frames.
+
+dumps() writes compact JSON (no spaces, non-ASCII kept as is, NaN and
+infinities rejected) and converts what DRF's encoder converts: datetimes
+to ISO 8601 with 'Z' for UTC, UUIDs to strings, Decimals to numbers, lazy
+translations, querysets and other iterables. It encodes with ujson when
+that is installed (and JSON_CODEC is not 'json'), otherwise with the
+stdlib json module. Anything ujson refuses (bytes, NaN, unknown types) is
+redone by the stdlib encoder, so the result, or the error, is the same
+either way; only the number formatting differs (1e-07 vs 1e-7).
+
+loads() always uses the stdlib decoder: ujson's accepts malformed input
+(leading zeros, raw control characters in strings) and is barely faster
+on request-sized bodies. Like DRF's strict parser it rejects NaN and
+Infinity.
+
+JSONRenderer and JSONParser plug the codec into DRF (REST_FRAMEWORK
+settings); JSONCodecMixin plugs it into channels consumers.
+"""
+
+import json
+
+from django.conf import settings
+from rest_framework import parsers, renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.json import strict_constant
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+if getattr(settings, 'JSON_CODEC', 'ujson') == 'json':
+    ujson = None
+
+BACKEND = 'ujson' if ujson is not None else 'json'
+
+_encoder = JSONEncoder(ensure_ascii=False, allow_nan=False, separators=(',', ':'))
+_sorted_encoder = JSONEncoder(ensure_ascii=False, allow_nan=False, separators=(',', ':'), sort_keys=True)
+# DRF's conversions (datetime, UUID, lazy strings, ...) for types ujson does not know
+_default = _encoder.default
+
+
+def dumps(obj, sort_keys=False):
+    """Compact JSON text for `obj`."""
+    if ujson is not None:
+        try:
+            return ujson.dumps(
+                obj, ensure_ascii=False, escape_forward_slashes=False, allow_nan=False,
+                sort_keys=sort_keys, default=_default,
+            )
+        except (TypeError, ValueError, OverflowError):
+            # The stdlib encoder handles it or raises the canonical error
+            pass
+    return (_sorted_encoder if sort_keys else _encoder).encode(obj)
+
+
+def loads(text):
+    """Parse JSON text (str or bytes); NaN and Infinity raise ValueError."""
+    return json.loads(text, parse_constant=strict_constant)
+
+
+# =============================================================================
+# DRF
+# =============================================================================
+
+class JSONRenderer(renderers.JSONRenderer):
+    """DRF's JSONRenderer through dumps(); indented output (browsable API) is left to DRF."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact or not self.strict:
+            return super().render(data, accepted_media_type, renderer_context)
+        # As DRF does, so the output stays a strict JavaScript subset
+        return dumps(data).replace('\u2028', '\\u2028').replace('\u2029', '\\u2029').encode()
+
+
+class JSONParser(parsers.JSONParser):
+    """DRF's JSONParser through loads(), reading the body in one go."""
+    renderer_class = JSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if not self.strict:
+            return super().parse(stream, media_type, parser_context)
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            return loads(stream.read().decode(encoding))
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+
+# =============================================================================
+# CHANNELS
+# =============================================================================
+
+class JSONCodecMixin:
+    """
+    For async consumers: encode_json/decode_json (the hooks
+    AsyncJsonWebsocketConsumer calls) and send_json through the codec.
+    """
+
+    @classmethod
+    async def decode_json(cls, text_data):
+        return loads(text_data)
+
+    @classmethod
+    async def encode_json(cls, content):
+        return dumps(content)
+
+    async def send_json(self, content, close=False):
+        await self.send(text_data=dumps(content), close=close)
@@ -0,0 +1,89 @@
+"""
+CareNest Pro - Cached Counters
+Description: Per-user counts kept in the cache, adjusted on writes and recounted from the database.
+
+A CachedCounter keeps one integer per user in the default cache
+(`counter:<name>:<user id>`). Writers call add() with the change, which
+is applied once their transaction commits; readers take the cached value
+and only run the counter's `count` query when the entry is missing.
+add() never extends an entry's lifetime, so every entry is recounted
+from the database at least every COUNTER_TTL seconds: drift from a write
+racing a recount, a bulk repair or a lost update lasts no longer than
+that. An entry that would go negative is dropped and recounted.
+
+read_counters() reads several counters for one user in one cache round
+trip. With the default process-local cache each process keeps its own
+entries; multi-process deployments should point CACHES at Redis.
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+CACHE_ALIAS = 'default'
+KEY_PREFIX = 'counter'
+
+
+def counter_ttl():
+    return getattr(settings, 'COUNTER_TTL', 300)
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+class CachedCounter:
+    """
+    `count(user_id)` is the authoritative database count behind the
+    counter (used on a cache miss).
+    """
+
+    def __init__(self, name, count):
+        self.name = name
+        self.count = count
+
+    def key(self, user_id):
+        return f'{KEY_PREFIX}:{self.name}:{user_id}'
+
+    def get(self, user_id):
+        return read_counters([self], user_id)[self.name]
+
+    def add(self, deltas):
+        """Apply {user_id: delta} once the current transaction commits."""
+        deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+        if deltas:
+            transaction.on_commit(lambda: self._apply(deltas))
+
+    def invalidate(self, user_ids):
+        """Recount these users on their next read (after bulk changes)."""
+        keys = [self.key(user_id) for user_id in user_ids]
+        if keys:
+            transaction.on_commit(lambda: _cache().delete_many(keys))
+
+    def _apply(self, deltas):
+        cache = _cache()
+        for user_id, delta in deltas.items():
+            key = self.key(user_id)
+            try:
+                value = cache.incr(key, delta)
+            except ValueError:
+                # Not cached: the next read counts from the database
+                continue
+            if value < 0:
+                cache.delete(key)
+
+
+def read_counters(counters, user_id):
+    """{counter name: count} for one user, recounting only missing entries."""
+    keys = {counter.key(user_id): counter for counter in counters}
+    found = _cache().get_many(list(keys))
+    values = {}
+    recounted = {}
+    for key, counter in keys.items():
+        value = found.get(key)
+        if value is None or value < 0:
+            value = recounted[key] = counter.count(user_id)
+        values[counter.name] = value
+    if recounted:
+        _cache().set_many(recounted, timeout=counter_ttl())
+    return values
@@ -0,0 +1,358 @@
+"""
+CareNest Pro - Full-Text Index
+Description: Backend-neutral inverted index over rows keyed by an integer id.
+
+SQLite:      an FTS5 virtual table (rowid = key), ranked with bm25().
+PostgreSQL:  a side table (key, tsvector, content) with a GIN index, ranked
+             with ts_rank_cd().
+Anything else (or SQLite built without FTS5) reports available() == False
+and callers fall back to plain filtering.
+
+Indexes are created by migrations through create_statements() and kept up
+to date incrementally by the owning app via index_many()/remove().
+
+An index may also carry an integer `scope_column` (e.g. the conversation a
+message belongs to) that searches can be restricted to. On SQLite it is an
+extra FTS5 column of id tokens matched in the same MATCH expression, and on
+PostgreSQL a btree-indexed column of the side table, so a scoped search
+only visits the scope's documents instead of every match in the corpus.
+FTS5's bm25() still counts every corpus-wide match of each term for its
+statistics, so scoped SQLite searches skip it: they take the newest
+`max_scoped_candidates` matches and rank those in Python with the same
+length-normalized term-frequency formula, without the global IDF.
+"""
+
+import re
+from collections import namedtuple
+
+from django.db import DEFAULT_DB_ALIAS, OperationalError, ProgrammingError, connections
+
+SearchHit = namedtuple('SearchHit', ['key', 'score', 'snippet'])
+
+# Column weights, highest first, in PostgreSQL setweight() letters
+_SQLITE_WEIGHTS = {'A': 4.0, 'B': 2.0, 'C': 1.0, 'D': 0.5}
+# BM25 term-frequency saturation and length normalization
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+HIGHLIGHT_START = '<mark>'
+HIGHLIGHT_END = '</mark>'
+
+
+class FullTextIndex:
+    """
+    `columns` is an ordered list of (name, weight) pairs where weight is one
+    of 'A' (most important) to 'D'. `scope_column` optionally names an
+    integer partition key stored with each document (see search(scopes=)).
+    With `prefix_terms` off, query terms match whole (stemmed) words only,
+    which avoids expanding common prefixes over large indexes.
+    """
+
+    pg_config = 'english'
+    max_query_terms = 8
+    max_scoped_candidates = 1000
+
+    def __init__(self, table, columns, using=DEFAULT_DB_ALIAS, scope_column=None, prefix_terms=True):
+        self.table = table
+        self.columns = list(columns)
+        self.using = using
+        self.scope_column = scope_column
+        self.prefix_terms = prefix_terms
+        self._available = None
+
+    @property
+    def connection(self):
+        return connections[self.using]
+
+    # -------------------------------------------------------------------------
+    # Schema (used from migrations)
+    # -------------------------------------------------------------------------
+
+    def create_statements(self, vendor):
+        names = [name for name, _ in self.columns]
+        if vendor == 'sqlite':
+            return [
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5("
+                f"{', '.join(names + self._scope_names())}, tokenize='porter unicode61')"
+            ]
+        if vendor == 'postgresql':
+            scope = f", {self.scope_column} bigint NOT NULL" if self.scope_column else ""
+            statements = [
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                f"key bigint PRIMARY KEY, document tsvector NOT NULL, content text NOT NULL{scope})",
+                f"CREATE INDEX IF NOT EXISTS {self.table}_document_gin ON {self.table} USING GIN (document)",
+            ]
+            if self.scope_column:
+                statements.append(
+                    f"CREATE INDEX IF NOT EXISTS {self.table}_{self.scope_column} "
+                    f"ON {self.table} ({self.scope_column})"
+                )
+            return statements
+        return []
+
+    def _scope_names(self):
+        return [self.scope_column] if self.scope_column else []
+
+    def drop_statements(self, vendor):
+        if vendor in ('sqlite', 'postgresql'):
+            return [f"DROP TABLE IF EXISTS {self.table}"]
+        return []
+
+    def create(self, schema_editor):
+        """Migration helper; tolerates SQLite builds without FTS5."""
+        for statement in self.create_statements(schema_editor.connection.vendor):
+            try:
+                schema_editor.execute(statement)
+            except OperationalError:
+                if schema_editor.connection.vendor != 'sqlite':
+                    raise
+                return
+
+    def drop(self, schema_editor):
+        for statement in self.drop_statements(schema_editor.connection.vendor):
+            schema_editor.execute(statement)
+
+    def available(self):
+        if self._available is None:
+            self._available = (
+                self.connection.vendor in ('sqlite', 'postgresql')
+                and self.table in self.connection.introspection.table_names()
+            )
+        return self._available
+
+    # -------------------------------------------------------------------------
+    # Maintenance
+    # -------------------------------------------------------------------------
+
+    def index_many(self, rows):
+        """
+        Insert or replace documents; `rows` yields (key, {column: text}),
+        with the scope_column's integer among the values when there is one.
+        """
+        if not self.available():
+            return
+        rows = [
+            (key, [values.get(name) or '' for name, _ in self.columns],
+             [values[name] for name in self._scope_names()])
+            for key, values in rows
+        ]
+        if not rows:
+            return
+
+        names = [name for name, _ in self.columns]
+        scope_names = self._scope_names()
+        with self.connection.cursor() as cursor:
+            if self.connection.vendor == 'sqlite':
+                keys = [key for key, _, _ in rows]
+                self._delete_sqlite(cursor, keys)
+                placeholders = ', '.join(['%s'] * (len(names) + len(scope_names) + 1))
+                cursor.executemany(
+                    f"INSERT INTO {self.table} (rowid, {', '.join(names + scope_names)}) VALUES ({placeholders})",
+                    [[key] + texts + [str(scope) for scope in scopes] for key, texts, scopes in rows]
+                )
+            else:
+                vector = ' || '.join(
+                    f"setweight(to_tsvector('{self.pg_config}', %s), '{weight}')"
+                    for _, weight in self.columns
+                )
+                scope_insert = ''.join(f", {name}" for name in scope_names)
+                scope_values = ', %s' * len(scope_names)
+                scope_update = ''.join(f", {name} = EXCLUDED.{name}" for name in scope_names)
+                cursor.executemany(
+                    f"INSERT INTO {self.table} (key, document, content{scope_insert}) "
+                    f"VALUES (%s, {vector}, %s{scope_values}) "
+                    f"ON CONFLICT (key) DO UPDATE SET document = EXCLUDED.document, "
+                    f"content = EXCLUDED.content{scope_update}",
+                    [[key] + texts + ['\n'.join(texts)] + scopes for key, texts, scopes in rows]
+                )
+
+    def index(self, key, values):
+        self.index_many([(key, values)])
+
+    def remove(self, keys):
+        if not self.available():
+            return
+        keys = list(keys)
+        if not keys:
+            return
+        with self.connection.cursor() as cursor:
+            if self.connection.vendor == 'sqlite':
+                self._delete_sqlite(cursor, keys)
+            else:
+                cursor.execute(f"DELETE FROM {self.table} WHERE key = ANY(%s)", [keys])
+
+    def _delete_sqlite(self, cursor, keys):
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            cursor.execute(
+                f"DELETE FROM {self.table} WHERE rowid IN ({', '.join(['%s'] * len(chunk))})",
+                chunk
+            )
+
+    # -------------------------------------------------------------------------
+    # Querying
+    # -------------------------------------------------------------------------
+
+    def terms(self, text):
+        return _TOKEN_RE.findall(text or '')[:self.max_query_terms]
+
+    def search(self, text, limit=100, offset=0, within=None, snippet_column=None, scopes=None):
+        """
+        Ranked search (every term must match, as a prefix unless the index
+        was built with prefix_terms=False). Returns a list of
+        SearchHit(key, score, snippet) with higher scores first, or None if
+        the index is unavailable on this database.
+
+        `within` is an optional (sql, params) subquery of keys restricting
+        the search scope; it filters matches after the fact, so prefer
+        `scopes` (a list of scope_column values) for large indexes.
+        `snippet_column` names the column to highlight.
+        """
+        if not self.available():
+            return None
+        terms = self.terms(text)
+        if scopes is not None:
+            scopes = [int(scope) for scope in scopes]
+        if not terms or scopes == []:
+            return []
+
+        if self.connection.vendor == 'sqlite' and scopes is not None:
+            return self._sqlite_scoped_search(terms, limit, offset, within, snippet_column, scopes)
+        if self.connection.vendor == 'sqlite':
+            sql, params = self._sqlite_query(terms, snippet_column, scopes)
+            key_column = 'rowid'
+        else:
+            sql, params = self._postgres_query(terms, snippet_column, scopes)
+            key_column = 'key'
+
+        if within is not None:
+            within_sql, within_params = within
+            sql += f" AND {key_column} IN ({within_sql})"
+            params += list(within_params)
+        sql += f" ORDER BY score DESC, {key_column} LIMIT %s OFFSET %s"
+        params += [limit, offset]
+
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                rows = cursor.fetchall()
+        except (OperationalError, ProgrammingError):
+            # Malformed MATCH expressions should never surface as a 500
+            return []
+        return [SearchHit(row[0], float(row[1]), row[2] if snippet_column else None) for row in rows]
+
+    def _sqlite_match(self, terms, scopes=None):
+        suffix = '*' if self.prefix_terms else ''
+        match = ' '.join('"{}"{}'.format(term.replace('"', ''), suffix) for term in terms)
+        if self.scope_column:
+            # Terms must not match scope ids; the scope ANDs into the same expression
+            names = ' '.join(name for name, _ in self.columns)
+            match = f"{{{names}}} : ({match})"
+            if scopes is not None:
+                scope_match = ' OR '.join('"{}"'.format(scope) for scope in scopes)
+                match += f" AND {self.scope_column} : ({scope_match})"
+        return match
+
+    def _sqlite_snippet(self, snippet_column):
+        column_index = [name for name, _ in self.columns].index(snippet_column)
+        return f"snippet({self.table}, {column_index}, %s, %s, '…', 12)", [HIGHLIGHT_START, HIGHLIGHT_END]
+
+    def _sqlite_query(self, terms, snippet_column, scopes=None):
+        # The scope column never contributes to the rank
+        weights = ', '.join(
+            [str(_SQLITE_WEIGHTS[weight]) for _, weight in self.columns] + ['0.0'] * len(self._scope_names())
+        )
+        select = f"rowid, -bm25({self.table}, {weights}) AS score"
+        params = []
+        if snippet_column:
+            snippet, params = self._sqlite_snippet(snippet_column)
+            select += f", {snippet}"
+        sql = f"SELECT {select} FROM {self.table} WHERE {self.table} MATCH %s"
+        return sql, params + [self._sqlite_match(terms, scopes)]
+
+    def _sqlite_scoped_search(self, terms, limit, offset, within, snippet_column, scopes):
+        """
+        Rank the newest scoped matches in Python; ties go to the newest key.
+        Snippets are only built for the returned page.
+        """
+        match = self._sqlite_match(terms, scopes)
+        names = [name for name, _ in self.columns]
+        sql = f"SELECT rowid, {', '.join(names)} FROM {self.table} WHERE {self.table} MATCH %s"
+        params = [match]
+        if within is not None:
+            within_sql, within_params = within
+            sql += f" AND rowid IN ({within_sql})"
+            params += list(within_params)
+        sql += " ORDER BY rowid DESC LIMIT %s"
+        params.append(self.max_scoped_candidates)
+
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                candidates = cursor.fetchall()
+                scores = self._local_scores(terms, [row[1:] for row in candidates])
+                scored = sorted(
+                    zip((row[0] for row in candidates), scores), key=lambda hit: (-hit[1], -hit[0])
+                )[offset:offset + limit]
+                snippets = {}
+                if snippet_column and scored:
+                    snippet, snippet_params = self._sqlite_snippet(snippet_column)
+                    keys = [key for key, _ in scored]
+                    cursor.execute(
+                        f"SELECT rowid, {snippet} FROM {self.table} WHERE {self.table} MATCH %s "
+                        f"AND rowid IN ({', '.join(['%s'] * len(keys))})",
+                        snippet_params + [match] + keys
+                    )
+                    snippets = dict(cursor.fetchall())
+        except (OperationalError, ProgrammingError):
+            return []
+        return [SearchHit(key, score, snippets.get(key)) for key, score in scored]
+
+    def _local_scores(self, terms, rows):
+        """
+        Weighted BM25 term-frequency scores for `rows` of column texts, with
+        lengths normalized against these rows. A word counts toward a term
+        when it starts with it (close to the stemmer's view); a row matched
+        through stemming alone scores one occurrence in its first column.
+        """
+        terms = [term.lower() for term in terms]
+        tokenized = [[_TOKEN_RE.findall((text or '').lower()) for text in row] for row in rows]
+        average = [
+            max(1.0, sum(len(columns[index]) for columns in tokenized) / max(1, len(tokenized)))
+            for index in range(len(self.columns))
+        ]
+        scores = []
+        for columns in tokenized:
+            score = 0.0
+            for term in terms:
+                frequencies = [sum(1 for word in words if word.startswith(term)) for words in columns]
+                if not any(frequencies):
+                    frequencies[0] = 1
+                for index, frequency in enumerate(frequencies):
+                    if frequency:
+                        norm = _BM25_K1 * (1 - _BM25_B + _BM25_B * len(columns[index]) / average[index])
+                        weight = _SQLITE_WEIGHTS[self.columns[index][1]]
+                        score += weight * frequency * (_BM25_K1 + 1) / (frequency + norm)
+            scores.append(score)
+        return scores
+
+    def _postgres_query(self, terms, snippet_column, scopes=None):
+        suffix = ':*' if self.prefix_terms else ''
+        tsquery = ' & '.join(f"{term}{suffix}" for term in terms)
+        select = "key, ts_rank_cd(document, query) AS score"
+        params = []
+        if snippet_column:
+            select += (
+                f", ts_headline('{self.pg_config}', content, query, "
+                f"'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}, MaxFragments=1, MaxWords=24')"
+            )
+        sql = (
+            f"SELECT {select} FROM {self.table}, to_tsquery('{self.pg_config}', %s) query "
+            f"WHERE document @@ query"
+        )
+        params.append(tsquery)
+        if self.scope_column and scopes is not None:
+            sql += f" AND {self.scope_column} = ANY(%s)"
+            params.append(scopes)
+        return sql, params
@@ -0,0 +1,135 @@
+import json
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer as StockJSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api import codec
+from api.benchmarks import scratch_database
+from messaging.models import Conversation, Message
+from messaging.views import ConversationViewSet
+from profiles.models import CaregiverProfile
+from profiles.views import CaregiverDiscoveryView
+
+SPECIALTIES = ['Elder Care', 'Dementia Care', 'Child Care', 'Special Needs', 'Companionship', 'Post-Surgery']
+CITIES = ['Austin', 'Zürich', 'São Paulo', 'Kraków', 'Montréal']
+
+
+def _seed(caregivers, conversations, messages_per_conversation, rng):
+    """Caregivers with profiles, and one client with a conversation with each of the first few."""
+    User = get_user_model()
+    viewer = User.objects.create_user(
+        email='codec-client@example.com', password=None,
+        first_name='Codec', last_name='Client', user_type='client',
+    )
+    users = []
+    for n in range(caregivers):
+        user = User.objects.create_user(
+            email=f'codec-caregiver-{n}@example.com', password=None,
+            first_name='Codec', last_name=f'Caregiver {n}', user_type='caregiver',
+        )
+        CaregiverProfile.objects.create(
+            user=user, first_name='Codec', last_name=f'Caregiver {n}', city=rng.choice(CITIES),
+            hourly_rate=rng.randint(1500, 6000) / 100, experience_years=rng.randint(0, 30),
+            specialties=rng.sample(SPECIALTIES, rng.randint(1, 4)),
+            bio=' '.join(rng.choice(['Patient', 'caring', 'certified', 'bilingual', 'CPR-trained', 'gentle'])
+                         for _ in range(rng.randint(20, 60))),
+        )
+        users.append(user)
+    for user in users[:conversations]:
+        conversation = Conversation.objects.create()
+        conversation.participants.add(viewer, user)
+        for n in range(messages_per_conversation):
+            Message.objects.create(
+                conversation=conversation, sender=rng.choice([viewer, user]),
+                content=f"Message {n}: can you do Tuesday at 9? “Yes” — see you then ✓",
+            )
+    return viewer
+
+
+def _payloads(viewer):
+    """(name, data, stock encoder, codec encoder) for each representative payload."""
+    factory = APIRequestFactory()
+    stock, fast = StockJSONRenderer(), codec.JSONRenderer()
+
+    request = factory.get('/api/profiles/caregiver/discovery/', {'page_size': 20})
+    discovery = CaregiverDiscoveryView.as_view()(request).data
+
+    request = factory.get('/api/messaging/conversations/')
+    force_authenticate(request, user=viewer)
+    inbox = ConversationViewSet.as_view({'get': 'list'})(request).data
+
+    # As ChatConsumer.send_message builds it; the consumer used json.dumps
+    message = Message.objects.select_related('sender').latest('id')
+    frame = {
+        'action': 'new_message',
+        'message': {
+            'id': message.id,
+            'sender_id': str(message.sender_id),
+            'sender_email': message.sender.email,
+            'content': message.content,
+            'created_at': message.created_at.isoformat(),
+            'is_read': message.is_read,
+        },
+    }
+    return [
+        ('discovery page', discovery, stock.render, fast.render),
+        ('inbox', inbox, stock.render, fast.render),
+        ('message frame', frame, json.dumps, codec.dumps),
+    ]
+
+
+def _best_mean(encode, data, iterations, repeats=5):
+    """Best-of-`repeats` mean seconds per call."""
+    best = float('inf')
+    for _ in range(repeats):
+        began = time.perf_counter()
+        for _ in range(iterations):
+            encode(data)
+        best = min(best, (time.perf_counter() - began) / iterations)
+    return best
+
+
+class Command(BaseCommand):
+    help = (
+        "Build representative payloads (discovery page, inbox, chat message frame) on a "
+        "scratch database and compare encoding them with DRF's stock renderer / json.dumps "
+        "and with api.codec."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--caregivers', type=int, default=100)
+        parser.add_argument('--conversations', type=int, default=50, help="Conversations in the inbox.")
+        parser.add_argument('--iterations', type=int, default=2000, help="Encodes per timing run.")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--min-speedup', type=float, default=1.2,
+                            help="Required speedup per payload (checked only when ujson is in use).")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        with scratch_database():
+            viewer = _seed(options['caregivers'], options['conversations'], 3, rng)
+            payloads = _payloads(viewer)
+
+        self.stdout.write(f"codec backend: {codec.BACKEND}")
+        slow = []
+        for name, data, old, new in payloads:
+            before, after = old(data), new(data)
+            if json.loads(before) != json.loads(after):
+                raise CommandError(f"{name}: the codec's output decodes differently")
+            old_time = _best_mean(old, data, options['iterations'])
+            new_time = _best_mean(new, data, options['iterations'])
+            speedup = old_time / new_time
+            self.stdout.write(
+                f"{name:>15}: {len(after):>6} bytes  stock {old_time * 1e6:8.1f}us  "
+                f"codec {new_time * 1e6:8.1f}us  ({speedup:.1f}x)"
+            )
+            if speedup < options['min_speedup']:
+                slow.append(name)
+
+        if codec.BACKEND == 'ujson' and slow:
+            raise CommandError(f"Speedup below {options['min_speedup']}x for: {', '.join(slow)}")
+        self.stdout.write(self.style.SUCCESS("Codec output matches the stock encoders"))
@@ -0,0 +1,105 @@
+"""
+CareNest Pro - Serializer Query Plans
+Description: Derives select_related/prefetch_related from a serializer's fields.
+
+plan_queryset(queryset, SerializerClass) walks the serializer's declared
+fields (dotted sources, nested serializers, many-valued relations) against
+the model's relations and adds the joins and prefetches needed to render
+any number of rows with a fixed number of queries:
+
+- single-valued hops (forward FK/one-to-one and reverse one-to-one) are
+  joined with select_related;
+- the first many-valued hop (M2M or reverse FK) and everything below it is
+  prefetched;
+- a hop straight back along the relation just followed (profile.user after
+  user.profile) is already cached by Django and adds nothing;
+- plain primary key fields read the local *_id column and add nothing.
+
+SerializerMethodFields are opaque to the planner; methods that touch
+relations must be given the relation through a declared field instead.
+Plans are computed once per (serializer, model) pair.
+"""
+
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, PrimaryKeyRelatedField
+
+
+def _is_many(model_field):
+    return model_field.many_to_many or model_field.one_to_many
+
+
+def _walk(serializer, model, hops, select, prefetch):
+    """
+    hops: [(lookup path, model field)] from the root to `model`.
+    Adds lookup paths to `select` / `prefetch`.
+    """
+    for field in serializer.fields.values():
+        if isinstance(field, serializers.SerializerMethodField):
+            continue
+
+        nested = field.child if isinstance(field, serializers.ListSerializer) else field
+        if field.source == '*':
+            if isinstance(nested, serializers.BaseSerializer):
+                _walk(nested, model, hops, select, prefetch)
+            continue
+
+        current_model = model
+        path = list(hops)
+        reached = False
+        for position, bit in enumerate(field.source_attrs):
+            try:
+                model_field = current_model._meta.get_field(bit)
+            except FieldDoesNotExist:
+                break
+            if not model_field.is_relation:
+                break
+
+            is_last = position == len(field.source_attrs) - 1
+            if is_last and isinstance(nested, PrimaryKeyRelatedField) and not _is_many(model_field):
+                # Rendered from the local <name>_id column
+                break
+
+            if path and path[-1][1].remote_field is model_field:
+                # Straight back along the previous hop: already cached
+                path.pop()
+            else:
+                lookup = f"{path[-1][0]}__{bit}" if path else bit
+                path.append((lookup, model_field))
+            current_model = model_field.related_model
+            reached = True
+
+        if not reached or not path:
+            continue
+        lookup = path[-1][0]
+        if any(_is_many(model_field) for _, model_field in path):
+            prefetch.add(lookup)
+        else:
+            select.add(lookup)
+        if isinstance(nested, serializers.BaseSerializer) and not isinstance(field, ManyRelatedField):
+            _walk(nested, current_model, path, select, prefetch)
+
+
+@lru_cache(maxsize=None)
+def query_plan(serializer_class, model):
+    """(select_related paths, prefetch_related paths) for rendering `model` rows."""
+    select, prefetch = set(), set()
+    _walk(serializer_class(), model, [], select, prefetch)
+    # Select paths below a prefetched lookup are carried by the prefetch
+    select = {path for path in select if not any(path.startswith(f"{p}__") for p in prefetch)}
+    # Drop paths implied by longer ones
+    select = {path for path in select if not any(other.startswith(f"{path}__") for other in select)}
+    prefetch = {path for path in prefetch if not any(other.startswith(f"{path}__") for other in prefetch)}
+    return tuple(sorted(select)), tuple(sorted(prefetch))
+
+
+def plan_queryset(queryset, serializer_class):
+    """Apply the serializer's query plan to a queryset."""
+    select, prefetch = query_plan(serializer_class, queryset.model)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    return queryset
@@ -5,5 +5,20 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 django.setup()
 
-# Simple WSGI-like application (no WebSockets)
-application = get_asgi_application()
\ No newline at end of file
+# HTTP app first: it finishes loading Django before the WebSocket stack imports models
+django_asgi_app = get_asgi_application()
+
+from channels.routing import ProtocolTypeRouter, URLRouter  # noqa: E402
+from channels.security.websocket import AllowedHostsOriginValidator  # noqa: E402
+
+from messaging.middleware import JWTAuthMiddlewareStack  # noqa: E402
+from messaging.routing import websocket_urlpatterns  # noqa: E402
+
+# HTTP is served by Django; WebSockets authenticate with a JWT and route
+# to the messaging consumers (run with daphne/uvicorn, not gunicorn's WSGI worker)
+application = ProtocolTypeRouter({
+    'http': django_asgi_app,
+    'websocket': AllowedHostsOriginValidator(
+        JWTAuthMiddlewareStack(URLRouter(websocket_urlpatterns))
+    ),
+})
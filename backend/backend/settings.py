@@ -47,7 +47,7 @@ ALLOWED_HOSTS = config('ALLOWED_HOSTS', default='localhost,127.0.0.1').split(','
 # Application definition
 INSTALLED_APPS = [
     # Django channels for WebSockets (must be first)
-    # 'daphne',
+    'daphne',
     
     # Django core
     'django.contrib.admin',
@@ -67,7 +67,7 @@ INSTALLED_APPS = [
     'allauth',
     'allauth.account',
     'allauth.socialaccount',
-    # 'channels',
+    'channels',
     
     # Local apps
     'users.apps.UsersConfig',
@@ -219,6 +219,16 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # JSON through api.codec (ujson when installed); the rest are DRF's defaults
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.codec.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.codec.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 40,
     'DEFAULT_THROTTLE_CLASSES': [
@@ -307,11 +317,28 @@ EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='noreply@CareNest.com')
 
 # Channels configuration for WebSockets (messaging)
-CHANNEL_LAYERS = {
-    "default": {
-        "BACKEND": "channels.layers.InMemoryChannelLayer"
-    },
-}
+# Redis carries group messages between ASGI worker processes. The in-process
+# layer is the stand-in for tests and single-worker setups
+# (CHANNEL_LAYER_BACKEND=memory, the default when REDIS_URL is unset).
+REDIS_URL = config('REDIS_URL', default='')
+CHANNEL_LAYER_BACKEND = config('CHANNEL_LAYER_BACKEND', default='redis' if REDIS_URL else 'memory')
+if CHANNEL_LAYER_BACKEND == 'redis':
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels_redis.core.RedisChannelLayer",
+            "CONFIG": {
+                "hosts": [REDIS_URL],
+                "capacity": config('CHANNEL_LAYER_CAPACITY', default=1500, cast=int),
+                "expiry": 10,
+            },
+        },
+    }
+else:
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels.layers.InMemoryChannelLayer"
+        },
+    }
 
 # Celery configuration (background tasks)
 # CELERY_BROKER_URL = config('REDIS_URL', default='redis://localhost:6379/0')
@@ -319,6 +346,44 @@ CHANNEL_LAYERS = {
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    # Only needed with NOTIFICATION_OUTBOX_WORKER = 'external'
+    'drain-notification-outbox': {
+        'task': 'notifications.tasks.drain_notification_outbox',
+        'schedule': 5.0,
+    },
+    'prune-notifications': {
+        'task': 'notifications.tasks.prune_notifications',
+        'schedule': 60 * 60,
+    },
+}
+
+# Seconds between in-process booking request expiry sweeps (0 = disabled;
+# run `manage.py expire_booking_requests` from cron instead)
+BOOKING_EXPIRY_SWEEP_INTERVAL = config('BOOKING_EXPIRY_SWEEP_INTERVAL', default=0, cast=int)
+
+# Online presence: seconds a user stays online after their last heartbeat,
+# and seconds between batched writes of presence changes to
+# UserOnlineStatus (0 = write each change immediately)
+PRESENCE_TTL = config('PRESENCE_TTL', default=90, cast=int)
+PRESENCE_FLUSH_INTERVAL = config('PRESENCE_FLUSH_INTERVAL', default=15, cast=int)
+
+# JSON encoder behind api.codec: 'ujson' (stdlib json if it is not installed) or 'json'
+JSON_CODEC = config('JSON_CODEC', default='ujson')
+
+# Who delivers queued notifications (see notifications.outbox): 'thread'
+# (in-process worker), 'inline' (right after each request commits) or
+# 'external' (Celery beat or `manage.py drain_notification_outbox --loop`),
+# and how long the thread waits after an enqueue so bursts coalesce
+NOTIFICATION_OUTBOX_WORKER = config('NOTIFICATION_OUTBOX_WORKER', default='thread')
+NOTIFICATION_OUTBOX_LINGER = config('NOTIFICATION_OUTBOX_LINGER', default=1.0, cast=float)
+
+# Seconds a cached counter (api.counters, e.g. the unread badges) lives
+# before it is recounted from the database
+COUNTER_TTL = config('COUNTER_TTL', default=300, cast=int)
+
+# Days read notifications are kept before prune_notifications deletes them
+NOTIFICATION_RETENTION_DAYS = config('NOTIFICATION_RETENTION_DAYS', default=90, cast=int)
 
 # Stripe configuration
 STRIPE_PUBLIC_KEY = config('STRIPE_PUBLIC_KEY', default='')
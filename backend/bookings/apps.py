@@ -1,6 +1,17 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class BookingsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'bookings'
+
+    def ready(self):
+        # Availability schedule cache invalidation
+        from . import signals  # noqa: F401
+
+        # Optional in-process expiry sweeps (enable on a single process)
+        interval = getattr(settings, 'BOOKING_EXPIRY_SWEEP_INTERVAL', 0)
+        if interval:
+            from .expiry import start_expiry_sweeper
+            start_expiry_sweeper(interval)
@@ -0,0 +1,184 @@
+"""
+CareNest Pro - Availability Engine
+Description: Per-caregiver interval model answering free/busy questions.
+
+Each caregiver's recurring slots, one-off slots and blocking bookings are
+loaded once (two indexed queries) into a CaregiverSchedule and cached.
+Open hours and bookings are kept as IntervalSets: sorted, merged,
+non-overlapping intervals searched with bisect, which gives the same
+O(log n) stabbing and overlap queries as an interval tree for disjoint
+intervals. "Is X free for this long" and "next N free windows" are then
+pure in-memory computations. Slot and booking writes drop the cached
+schedule (see bookings.signals).
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime, time, timedelta
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import AvailabilitySlot, Booking
+
+# Booking statuses that occupy the caregiver's time
+BLOCKING_STATUSES = ('confirmed', 'in_progress')
+
+SCHEDULE_CACHE_TIMEOUT = 60 * 60
+SCHEDULE_CACHE_PREFIX = 'availability:schedule'
+
+
+class IntervalSet:
+    """Sorted, merged [start, end) intervals with logarithmic lookups."""
+
+    def __init__(self, intervals=()):
+        merged = []
+        for start, end in sorted(interval for interval in intervals if interval[0] < interval[1]):
+            if merged and start <= merged[-1][1]:
+                if end > merged[-1][1]:
+                    merged[-1] = (merged[-1][0], end)
+            else:
+                merged.append((start, end))
+        self.intervals = merged
+        self._starts = [start for start, _ in merged]
+
+    def __iter__(self):
+        return iter(self.intervals)
+
+    def __bool__(self):
+        return bool(self.intervals)
+
+    def covers(self, start, end):
+        """True if [start, end) lies inside a single interval."""
+        index = bisect_right(self._starts, start) - 1
+        return index >= 0 and self.intervals[index][1] >= end
+
+    def overlaps(self, start, end):
+        """True if any interval intersects [start, end)."""
+        # Merged intervals have increasing ends, so the last one starting
+        # before `end` is the only candidate
+        index = bisect_left(self._starts, end) - 1
+        return index >= 0 and self.intervals[index][1] > start
+
+    def clip(self, start, end):
+        """Intervals intersecting [start, end), trimmed to it."""
+        index = max(0, bisect_right(self._starts, start) - 1)
+        clipped = []
+        for interval_start, interval_end in self.intervals[index:]:
+            if interval_start >= end:
+                break
+            if interval_end > start:
+                clipped.append((max(start, interval_start), min(end, interval_end)))
+        return clipped
+
+    def subtract(self, other):
+        """This set minus `other`."""
+        result = []
+        for start, end in self.intervals:
+            cursor = start
+            for busy_start, busy_end in other.clip(start, end):
+                if busy_start > cursor:
+                    result.append((cursor, busy_start))
+                cursor = max(cursor, busy_end)
+            if cursor < end:
+                result.append((cursor, end))
+        return IntervalSet(result)
+
+
+def _aware(day, clock):
+    return timezone.make_aware(datetime.combine(day, clock))
+
+
+class CaregiverSchedule:
+    """
+    Materialized availability of one caregiver.
+
+    `weekly` maps weekday -> [(start_time, end_time)], `dated` maps a date to
+    its one-off slots, `busy` holds blocking bookings that end after
+    `busy_from`.
+    """
+
+    def __init__(self, caregiver_id, weekly, dated, busy, busy_from):
+        self.caregiver_id = caregiver_id
+        self.weekly = weekly
+        self.dated = dated
+        self.busy = busy
+        self.busy_from = busy_from
+
+    def open_hours(self, first_day, last_day):
+        """Published hours for the local dates first_day..last_day."""
+        windows = []
+        day = first_day
+        while day <= last_day:
+            for start, end in self.weekly.get(day.weekday(), []) + self.dated.get(day, []):
+                # end_time 00:00 closes the slot at midnight
+                close = _aware(day + timedelta(days=1), time.min) if end == time.min else _aware(day, end)
+                windows.append((_aware(day, start), close))
+            day += timedelta(days=1)
+        return IntervalSet(windows)
+
+    def is_free(self, start, end):
+        """True if [start, end) is inside published hours and overlaps no booking."""
+        first_day = timezone.localtime(start).date()
+        last_day = timezone.localtime(end).date()
+        return self.open_hours(first_day, last_day).covers(start, end) and not self.busy.overlaps(start, end)
+
+    def free_windows(self, start, end, min_duration=timedelta(0), limit=None):
+        """Free windows inside [start, end) lasting at least `min_duration`, earliest first."""
+        first_day = timezone.localtime(start).date()
+        last_day = timezone.localtime(end).date()
+        free = self.open_hours(first_day, last_day).subtract(self.busy)
+
+        windows = []
+        for window_start, window_end in free.clip(start, end):
+            if window_end - window_start >= min_duration:
+                windows.append((window_start, window_end))
+                if limit is not None and len(windows) >= limit:
+                    break
+        return windows
+
+
+def load_schedule(caregiver_id, busy_from):
+    """Build a schedule from the database (slots + blocking bookings ending after busy_from)."""
+    weekly = {}
+    dated = {}
+    slots = AvailabilitySlot.objects.filter(caregiver_id=caregiver_id).values_list(
+        'day_of_week', 'start_time', 'end_time', 'is_recurring', 'specific_date'
+    )
+    for day_of_week, start, end, is_recurring, specific_date in slots:
+        if specific_date is not None:
+            dated.setdefault(specific_date, []).append((start, end))
+        elif is_recurring:
+            weekly.setdefault(day_of_week, []).append((start, end))
+
+    busy = IntervalSet(Booking.objects.filter(
+        caregiver_id=caregiver_id,
+        status__in=BLOCKING_STATUSES,
+        end_datetime__gt=busy_from,
+    ).values_list('start_datetime', 'end_datetime'))
+    return CaregiverSchedule(caregiver_id, weekly, dated, busy, busy_from)
+
+
+def _cache_key(caregiver_id):
+    return f'{SCHEDULE_CACHE_PREFIX}:{caregiver_id}'
+
+
+def get_schedule(caregiver_id, since=None):
+    """
+    Cached schedule covering bookings from `since` (default: today) onwards.
+    Cached schedules start at the beginning of the day they were built;
+    queries reaching further back are answered from a fresh, uncached load.
+    """
+    today = _aware(timezone.localdate(), time.min)
+    if since is not None and since < today:
+        return load_schedule(caregiver_id, since)
+
+    key = _cache_key(caregiver_id)
+    schedule = cache.get(key)
+    if schedule is None:
+        schedule = load_schedule(caregiver_id, today)
+        cache.set(key, schedule, SCHEDULE_CACHE_TIMEOUT)
+    return schedule
+
+
+def invalidate_schedule(caregiver_id):
+    cache.delete(_cache_key(caregiver_id))
@@ -0,0 +1,133 @@
+"""
+CareNest Pro - Booking Request Expiry
+Description: Moves unanswered booking requests past expires_at to 'expired'.
+
+expire_booking_requests() works in bounded batches, each its own short
+transaction: lock up to `batch_size` overdue open requests (skipping rows
+a concurrent accept holds), flip them with one UPDATE and notify both
+parties with one bulk INSERT. The (status, expires_at) index keeps every
+batch an index range scan however many requests have been answered.
+
+It runs from the expire_booking_requests management command (cron, or
+--loop) or, when BOOKING_EXPIRY_SWEEP_INTERVAL is set, from a daemon
+thread started by BookingsConfig.ready().
+"""
+
+import logging
+import threading
+import time
+
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+from notifications.badges import notifications_created
+from notifications.models import Notification
+
+from .models import BookingRequest
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def _expiry_notifications(rows):
+    notifications = []
+    for row in rows:
+        when = f"{row['service_type']} on {row['proposed_date']:%b %d}"
+        notifications.append(Notification(
+            user_id=row['client_id'],
+            notification_type='booking',
+            title="Booking request expired",
+            message=f"Your request for {when} expired before the caregiver responded.",
+            related_object_type='booking_request',
+            related_object_id=row['id'],
+        ))
+        notifications.append(Notification(
+            user_id=row['caregiver_id'],
+            notification_type='booking',
+            title="Booking request expired",
+            message=f"A request for {when} expired without a response.",
+            related_object_type='booking_request',
+            related_object_id=row['id'],
+        ))
+    return notifications
+
+
+def expire_booking_requests(now=None, batch_size=DEFAULT_BATCH_SIZE, max_batches=None):
+    """
+    Expire open requests whose deadline is at or before `now`.
+    Returns throughput metrics: expired, notifications, batches, seconds, per_second.
+    """
+    now = now or timezone.now()
+    metrics = {'expired': 0, 'notifications': 0, 'batches': 0}
+    started = time.perf_counter()
+
+    while max_batches is None or metrics['batches'] < max_batches:
+        with transaction.atomic():
+            rows = list(
+                BookingRequest.objects.select_for_update(skip_locked=True).filter(
+                    status__in=BookingRequest.OPEN_STATUSES,
+                    expires_at__lte=now,
+                ).order_by('expires_at').values(
+                    'id', 'client_id', 'caregiver_id', 'service_type', 'proposed_date'
+                )[:batch_size]
+            )
+            if not rows:
+                break
+            BookingRequest.objects.filter(id__in=[row['id'] for row in rows]).update(
+                status='expired', updated_at=timezone.now()
+            )
+            notifications = Notification.objects.bulk_create(_expiry_notifications(rows), batch_size=1000)
+            notifications_created(notifications)
+
+        metrics['batches'] += 1
+        metrics['expired'] += len(rows)
+        metrics['notifications'] += len(notifications)
+        if len(rows) < batch_size:
+            break
+
+    metrics['seconds'] = time.perf_counter() - started
+    metrics['per_second'] = metrics['expired'] / metrics['seconds'] if metrics['seconds'] else 0
+    if metrics['expired']:
+        logger.info(
+            "Expired %(expired)d booking requests in %(batches)d batches "
+            "(%(seconds).3fs, %(per_second).0f/s)", metrics
+        )
+    return metrics
+
+
+# =============================================================================
+# IN-PROCESS SCHEDULER
+# =============================================================================
+
+_sweeper = None
+_sweeper_guard = threading.Lock()
+
+
+def _sweep_forever(interval, stop, batch_size):
+    while not stop.wait(interval):
+        try:
+            close_old_connections()
+            expire_booking_requests(batch_size=batch_size)
+        except Exception:
+            logger.exception("Booking request expiry sweep failed")
+        finally:
+            connection.close()
+
+
+def start_expiry_sweeper(interval, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Sweep every `interval` seconds on a daemon thread (once per process).
+    Returns the threading.Event that stops it.
+    """
+    global _sweeper
+    with _sweeper_guard:
+        if _sweeper is None:
+            stop = threading.Event()
+            thread = threading.Thread(
+                target=_sweep_forever, args=(interval, stop, batch_size),
+                name='booking-expiry-sweeper', daemon=True,
+            )
+            thread.start()
+            _sweeper = stop
+        return _sweeper
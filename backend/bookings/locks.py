@@ -0,0 +1,48 @@
+"""
+CareNest Pro - Caregiver Schedule Locks
+Description: Serializes writes to one caregiver's calendar.
+
+locked_schedule(caregiver_id) opens a transaction that holds an exclusive
+lock on the caregiver's row for its whole duration, so a
+check-for-overlap-then-insert sequence cannot interleave with another one
+for the same caregiver:
+
+- Backends with SELECT ... FOR UPDATE (PostgreSQL, MySQL, Oracle) lock the
+  caregiver's User row; the lock is released at commit or rollback.
+- SQLite has no row locks; a process-local lock per caregiver is held
+  across the transaction instead. That is exact for a single process
+  (development, tests, benchmarks) but not across processes.
+"""
+
+import threading
+import weakref
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+_process_locks = weakref.WeakValueDictionary()
+_process_locks_guard = threading.Lock()
+
+
+def _process_lock(caregiver_id):
+    with _process_locks_guard:
+        lock = _process_locks.get(caregiver_id)
+        if lock is None:
+            lock = threading.Lock()
+            _process_locks[caregiver_id] = lock
+        return lock
+
+
+@contextmanager
+def locked_schedule(caregiver_id, using=DEFAULT_DB_ALIAS):
+    """Run the block in a transaction holding the caregiver's schedule lock."""
+    if connections[using].features.has_select_for_update:
+        with transaction.atomic(using=using):
+            User = get_user_model()
+            list(User.objects.using(using).select_for_update().filter(pk=caregiver_id).values_list('pk'))
+            yield
+    else:
+        lock = _process_lock(caregiver_id)
+        with lock, transaction.atomic(using=using):
+            yield
@@ -0,0 +1,87 @@
+from datetime import date, time, timedelta
+from itertools import combinations
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api.benchmarks import format_summary, run_concurrently, scratch_database, summarize, timed
+from bookings.models import Booking, BookingRequest
+from bookings.views import BookingRequestViewSet
+
+
+class Command(BaseCommand):
+    help = (
+        "Fire concurrent accepts at contested booking requests on a scratch database; "
+        "fails if any caregiver ends up double-booked or p99 latency exceeds the bound."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--slots', type=int, default=25, help="Distinct time slots to contest.")
+        parser.add_argument('--contenders', type=int, default=8, help="Overlapping requests per slot.")
+        parser.add_argument('--max-p99-ms', type=float, default=250.0)
+
+    def handle(self, *args, **options):
+        with scratch_database():
+            caregiver, request_ids = self._seed(options['slots'], options['contenders'])
+            accept = BookingRequestViewSet.as_view({'post': 'accept'}, throttle_classes=[])
+            factory = APIRequestFactory()
+
+            def fire(request_id):
+                request = factory.post(
+                    f'/api/bookings/booking-requests/{request_id}/accept/', {'accepted': True}, format='json'
+                )
+                force_authenticate(request, user=caregiver)
+                response, elapsed = timed(accept, request, pk=request_id)
+                return response.status_code, elapsed
+
+            results = run_concurrently(fire, request_ids, options['threads'])
+            bookings = list(Booking.objects.filter(caregiver=caregiver).values_list('start_datetime', 'end_datetime'))
+
+        codes = [code for code, _ in results]
+        summary = summarize([elapsed for _, elapsed in results])
+        overlaps = sum(1 for a, b in combinations(bookings, 2) if a[0] < b[1] and b[0] < a[1])
+        self.stdout.write(
+            f"accepted={codes.count(200)} conflicts={codes.count(409)} bookings={len(bookings)} overlaps={overlaps}"
+        )
+        self.stdout.write(format_summary(summary))
+
+        unexpected = sorted({code for code in codes if code not in (200, 409)})
+        if unexpected:
+            raise CommandError(f"Unexpected response codes: {unexpected}")
+        if overlaps:
+            raise CommandError(f"{overlaps} overlapping bookings were created")
+        if len(bookings) != options['slots']:
+            raise CommandError(f"Expected {options['slots']} bookings, got {len(bookings)}")
+        if summary['p99'] > options['max_p99_ms']:
+            raise CommandError(f"p99 {summary['p99']:.2f}ms exceeds {options['max_p99_ms']}ms")
+        self.stdout.write(self.style.SUCCESS("No double bookings; latency within bound"))
+
+    def _seed(self, slots, contenders):
+        User = get_user_model()
+        caregiver = User.objects.create_user(
+            email='bench-caregiver@example.com', password=None,
+            first_name='Bench', last_name='Caregiver', user_type='caregiver',
+        )
+        client = User.objects.create_user(
+            email='bench-client@example.com', password=None,
+            first_name='Bench', last_name='Client', user_type='client',
+        )
+        first_day = date.today() + timedelta(days=1)
+        expires_at = timezone.now() + timedelta(days=1)
+        requests = []
+        for slot in range(slots):
+            for contender in range(contenders):
+                # Contenders for a slot are staggered by 30 minutes so they
+                # overlap each other but never the neighbouring slots
+                requests.append(BookingRequest(
+                    client=client, caregiver=caregiver, service_type='Benchmark',
+                    proposed_date=first_day + timedelta(days=slot),
+                    proposed_time=time(9, 0 if contender % 2 == 0 else 30),
+                    duration_hours=4, proposed_rate=25, address='Benchmark', expires_at=expires_at,
+                ))
+        # Created slot by slot, so a slot's contenders are dispatched together
+        created = BookingRequest.objects.bulk_create(requests)
+        return caregiver, [booking_request.id for booking_request in created]
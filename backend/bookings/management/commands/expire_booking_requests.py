@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from bookings.expiry import DEFAULT_BATCH_SIZE, expire_booking_requests
+
+
+class Command(BaseCommand):
+    help = "Mark unanswered booking requests past their expires_at as expired and notify both parties."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--max-batches', type=int, default=None, help="Stop after this many batches.")
+        parser.add_argument('--loop', type=int, default=0, metavar='SECONDS',
+                            help="Keep sweeping every SECONDS instead of exiting after one pass.")
+
+    def handle(self, *args, **options):
+        while True:
+            metrics = expire_booking_requests(
+                batch_size=options['batch_size'], max_batches=options['max_batches']
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f"Expired {metrics['expired']} requests in {metrics['batches']} batches, "
+                f"{metrics['notifications']} notifications, {metrics['seconds']:.3f}s "
+                f"({metrics['per_second']:.0f}/s)"
+            ))
+            if not options['loop']:
+                break
+            time.sleep(options['loop'])
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.9 on 2026-10-17 07:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='availabilityslot',
+            index=models.Index(condition=models.Q(('is_recurring', True), ('specific_date__isnull', True)), fields=['day_of_week', 'caregiver', 'start_time', 'end_time'], name='slot_weekly_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='availabilityslot',
+            index=models.Index(condition=models.Q(('specific_date__isnull', False)), fields=['specific_date', 'caregiver', 'start_time', 'end_time'], name='slot_dated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(condition=models.Q(('status__in', ['confirmed', 'in_progress'])), fields=['caregiver', 'end_datetime', 'start_datetime'], name='booking_busy_idx'),
+        ),
+    ]
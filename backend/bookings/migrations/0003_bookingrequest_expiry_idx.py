@@ -0,0 +1,19 @@
+# Generated by Django 5.2.9 on 2026-10-17 07:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0002_availability_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bookingrequest',
+            index=models.Index(fields=['status', 'expires_at'], name='bookingrequest_expiry_idx'),
+        ),
+    ]
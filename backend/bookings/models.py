@@ -1,5 +1,8 @@
+from decimal import Decimal
+
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 from profiles.models import CaregiverProfile, ClientProfile
 
@@ -69,6 +72,12 @@ class Booking(models.Model):
             models.Index(fields=['status', 'start_datetime']),
             models.Index(fields=['client', 'status']),
             models.Index(fields=['caregiver', 'status']),
+            # Busy-time lookups of the availability engine (index-only scan)
+            models.Index(
+                fields=['caregiver', 'end_datetime', 'start_datetime'],
+                condition=models.Q(status__in=['confirmed', 'in_progress']),
+                name='booking_busy_idx',
+            ),
         ]
     
     def __str__(self):
@@ -78,7 +87,7 @@ class Booking(models.Model):
         # Calculate totals before saving
         if self.hours and self.hourly_rate and not self.total_amount:
             self.total_amount = self.hours * self.hourly_rate
-            self.platform_fee = self.total_amount * 0.15  # 15% platform fee
+            self.platform_fee = (self.total_amount * Decimal('0.15')).quantize(Decimal('0.01'))  # 15% platform fee
             self.caregiver_payout = self.total_amount - self.platform_fee
         super().save(*args, **kwargs)
 
@@ -125,8 +134,21 @@ class BookingRequest(models.Model):
     responded_at = models.DateTimeField(null=True, blank=True)
     expires_at = models.DateTimeField()
     
+    # Requests still waiting for the caregiver's answer
+    OPEN_STATUSES = ('sent', 'viewed')
+    
     class Meta:
         ordering = ['-created_at']
+        # Expiry sweeps: open requests ordered by deadline
+        indexes = [
+            models.Index(fields=['status', 'expires_at'], name='bookingrequest_expiry_idx'),
+        ]
+    
+    @property
+    def is_expired(self):
+        return self.status == 'expired' or (
+            self.status in self.OPEN_STATUSES and self.expires_at <= timezone.now()
+        )
     
     def __str__(self):
         return f"Request #{self.id}: {self.client.email} -> {self.caregiver.email}"
@@ -156,6 +178,19 @@ class AvailabilitySlot(models.Model):
     class Meta:
         ordering = ['day_of_week', 'start_time']
         unique_together = ['caregiver', 'day_of_week', 'start_time', 'specific_date']
+        # Covering indexes for the two halves of the "slots on a date" lookup
+        indexes = [
+            models.Index(
+                fields=['day_of_week', 'caregiver', 'start_time', 'end_time'],
+                condition=models.Q(is_recurring=True, specific_date__isnull=True),
+                name='slot_weekly_idx',
+            ),
+            models.Index(
+                fields=['specific_date', 'caregiver', 'start_time', 'end_time'],
+                condition=models.Q(specific_date__isnull=False),
+                name='slot_dated_idx',
+            ),
+        ]
     
     def __str__(self):
         days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
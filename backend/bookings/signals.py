@@ -0,0 +1,23 @@
+"""
+CareNest Pro - Booking Signal Receivers
+Description: Drops a caregiver's cached availability schedule whenever one
+of their slots or bookings is written.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .availability import invalidate_schedule
+from .models import AvailabilitySlot, Booking
+
+
+@receiver(post_save, sender=AvailabilitySlot)
+@receiver(post_delete, sender=AvailabilitySlot)
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def caregiver_schedule_changed(sender, instance, **kwargs):
+    caregiver_id = instance.caregiver_id
+    invalidate_schedule(caregiver_id)
+    # Again after commit, in case a reader re-cached the pre-write state
+    transaction.on_commit(lambda: invalidate_schedule(caregiver_id))
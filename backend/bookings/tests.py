@@ -1,3 +1,141 @@
-from django.test import TestCase
+from datetime import date, time, timedelta
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+
+from api.benchmarks import run_concurrently
+from profiles.models import CaregiverProfile, ClientProfile
+
+from .models import Booking, BookingRequest
+from .views import BookingRequestViewSet
+
+User = get_user_model()
+
+
+class BookingRequestResponseTests(TransactionTestCase):
+    """
+    Accepts and rejects race on real threads (TransactionTestCase, so each
+    worker's connection sees committed rows and the schedule lock is real).
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.caregiver = User.objects.create_user(
+            email='caregiver@example.com', password=None, user_type='caregiver',
+        )
+        self.client_user = User.objects.create_user(
+            email='client@example.com', password=None, user_type='client',
+        )
+        self.respond = BookingRequestViewSet.as_view({'post': 'accept'}, throttle_classes=[])
+        self.factory = APIRequestFactory()
+
+    def make_requests(self, count):
+        """`count` requests for the same morning, staggered so they all overlap."""
+        day = date.today() + timedelta(days=1)
+        return BookingRequest.objects.bulk_create(
+            BookingRequest(
+                client=self.client_user, caregiver=self.caregiver, service_type='Care',
+                proposed_date=day, proposed_time=time(9, 0 if n % 2 == 0 else 30),
+                duration_hours=4, proposed_rate=25, address='1 Main St',
+                expires_at=timezone.now() + timedelta(days=1),
+            )
+            for n in range(count)
+        )
+
+    def answer(self, request_id, accepted):
+        request = self.factory.post(
+            f'/api/bookings/booking-requests/{request_id}/accept/', {'accepted': accepted}, format='json'
+        )
+        force_authenticate(request, user=self.caregiver)
+        return self.respond(request, pk=request_id).status_code
+
+    def test_parallel_accepts_of_overlapping_requests_book_once(self):
+        requests = self.make_requests(6)
+        codes = run_concurrently(lambda booking_request: self.answer(booking_request.id, True), requests, 6)
+
+        self.assertEqual(sorted(codes), [200] + [409] * 5)
+        self.assertEqual(Booking.objects.filter(caregiver=self.caregiver).count(), 1)
+        self.assertEqual(BookingRequest.objects.filter(status='accepted').count(), 1)
+
+    def test_reject_after_accept_conflicts(self):
+        booking_request, = self.make_requests(1)
+        self.assertEqual(self.answer(booking_request.id, True), 200)
+
+        self.assertEqual(self.answer(booking_request.id, False), 409)
+        booking_request.refresh_from_db()
+        self.assertEqual(booking_request.status, 'accepted')
+        self.assertEqual(Booking.objects.filter(caregiver=self.caregiver).count(), 1)
+
+    def test_concurrent_accept_and_reject_answer_once(self):
+        booking_request, = self.make_requests(1)
+        codes = run_concurrently(lambda accepted: self.answer(booking_request.id, accepted), [True, False], 2)
+
+        self.assertEqual(sorted(codes), [200, 409])
+        booking_request.refresh_from_db()
+        bookings = Booking.objects.filter(caregiver=self.caregiver).count()
+        self.assertEqual(bookings, 1 if booking_request.status == 'accepted' else 0)
+
+
+class ListQueryCountTests(TestCase):
+    """
+    The booking lists run the same number of queries for a small and a large
+    page: each row has its own client and caregiver, so a per-row lookup
+    would show up as extra queries.
+    """
+
+    SMALL, LARGE = 2, 20
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(email='admin@example.com', password=None, user_type='admin')
+        self.api = APIClient()
+        self.api.force_authenticate(self.admin)
+        self.rows = 0
+
+    def make_pair(self):
+        n = self.rows = self.rows + 1
+        client = User.objects.create_user(email=f'client-{n}@example.com', password=None, user_type='client')
+        ClientProfile.objects.create(user=client, first_name='Client', last_name=str(n), city='Austin')
+        caregiver = User.objects.create_user(
+            email=f'caregiver-{n}@example.com', password=None, user_type='caregiver',
+        )
+        CaregiverProfile.objects.create(
+            user=caregiver, first_name='Caregiver', last_name=str(n), city='Austin',
+            hourly_rate=25, specialties=['Elder Care'],
+        )
+        return client, caregiver
+
+    def add_booking(self):
+        client, caregiver = self.make_pair()
+        start = timezone.now() + timedelta(days=self.rows)
+        Booking.objects.create(
+            client=client, caregiver=caregiver, service_type='Care',
+            start_datetime=start, end_datetime=start + timedelta(hours=2), hours=2,
+            address='1 Main St', city='Austin', hourly_rate=25,
+        )
+
+    def add_booking_request(self):
+        client, caregiver = self.make_pair()
+        BookingRequest.objects.create(
+            client=client, caregiver=caregiver, service_type='Care',
+            proposed_date=date.today() + timedelta(days=1), proposed_time=time(9),
+            address='1 Main St', proposed_rate=25, expires_at=timezone.now() + timedelta(days=1),
+        )
+
+    def assert_constant_queries(self, url, add_row, queries):
+        for size in (self.SMALL, self.LARGE):
+            while self.rows < size:
+                add_row()
+            with self.assertNumQueries(queries):
+                response = self.api.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data['count'], size)
+
+    def test_booking_list(self):
+        self.assert_constant_queries('/api/bookings/bookings/', self.add_booking, 3)
+
+    def test_booking_request_list(self):
+        self.assert_constant_queries('/api/bookings/booking-requests/', self.add_booking_request, 2)
@@ -10,5 +10,7 @@ router.register(r'availability', views.AvailabilitySlotViewSet, basename='availa
 urlpatterns = [
     path('', include(router.urls)),
     path('create-request/', views.create_booking_request, name='create-booking-request'),
-    path('caregiver/<int:caregiver_id>/check-availability/', views.check_caregiver_availability, name='check-availability'),
+    path('available-caregivers/', views.available_caregivers, name='available-caregivers'),
+    path('caregiver/<uuid:caregiver_id>/check-availability/', views.check_caregiver_availability, name='check-availability'),
+    path('caregiver/<uuid:caregiver_id>/free-windows/', views.caregiver_free_windows, name='caregiver-free-windows'),
 ]
\ No newline at end of file
@@ -3,10 +3,17 @@ from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes, action
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from django.db.models import Q
+from django.db.models import Exists, OuterRef, Q
 from datetime import datetime, timedelta
 import json
 
+from api.query_plans import plan_queryset
+from profiles.models import CaregiverSearchDocument
+from profiles.pagination import InvalidCursor, KeysetPaginator, decode_cursor, encode_cursor
+from profiles.serializers import CaregiverSearchDocumentSerializer
+
+from .availability import BLOCKING_STATUSES, get_schedule
+from .locks import locked_schedule
 from .models import Booking, BookingRequest, AvailabilitySlot
 from .serializers import (
     BookingSerializer, BookingRequestSerializer, AvailabilitySlotSerializer,
@@ -16,6 +23,11 @@ from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
+# Widest date range a free-window search may span
+MAX_WINDOW_RANGE_DAYS = 31
+# Same keyset as discovery's `recommended` sort (search_recommended_idx)
+FREE_CAREGIVER_ORDERING = ['-average_rating', '-total_reviews', '-id']
+
 class BookingViewSet(viewsets.ModelViewSet):
     """ViewSet for bookings"""
     serializer_class = BookingSerializer
@@ -25,11 +37,12 @@ class BookingViewSet(viewsets.ModelViewSet):
         user = self.request.user
         
         if user.user_type == 'client':
-            return Booking.objects.filter(client=user)
+            queryset = Booking.objects.filter(client=user)
         elif user.user_type == 'caregiver':
-            return Booking.objects.filter(caregiver=user)
+            queryset = Booking.objects.filter(caregiver=user)
         else:  # admin
-            return Booking.objects.all()
+            queryset = Booking.objects.all()
+        return plan_queryset(queryset, self.get_serializer_class())
     
     def perform_create(self, serializer):
         # Only caregivers can create bookings directly
@@ -47,15 +60,27 @@ class BookingRequestViewSet(viewsets.ModelViewSet):
         user = self.request.user
         
         if user.user_type == 'client':
-            return BookingRequest.objects.filter(client=user)
+            queryset = BookingRequest.objects.filter(client=user)
         elif user.user_type == 'caregiver':
-            return BookingRequest.objects.filter(caregiver=user)
+            queryset = BookingRequest.objects.filter(caregiver=user)
         else:  # admin
-            return BookingRequest.objects.all()
+            queryset = BookingRequest.objects.all()
+        
+        # Lists skip expired requests (swept or merely overdue) unless asked for
+        if self.action == 'list' and self.request.query_params.get('include_expired') != 'true':
+            queryset = queryset.exclude(status='expired').exclude(
+                status__in=BookingRequest.OPEN_STATUSES, expires_at__lte=timezone.now()
+            )
+        return plan_queryset(queryset, self.get_serializer_class())
     
     @action(detail=True, methods=['post'])
     def accept(self, request, pk=None):
-        """Accept or reject a booking request"""
+        """
+        Accept or reject a booking request.
+        Both run under the caregiver's schedule lock and re-check the
+        request state (acceptance also overlapping bookings), so a request
+        is answered once; conflicts return 409.
+        """
         booking_request = self.get_object()
         
         if booking_request.caregiver != request.user:
@@ -65,56 +90,86 @@ class BookingRequestViewSet(viewsets.ModelViewSet):
             )
         
         serializer = AcceptBookingRequestSerializer(data=request.data)
-        if serializer.is_valid():
-            accepted = serializer.validated_data['accepted']
-            proposed_rate = serializer.validated_data.get('proposed_rate')
-            response_message = serializer.validated_data.get('response_message', '')
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        accepted = serializer.validated_data['accepted']
+        proposed_rate = serializer.validated_data.get('proposed_rate')
+        response_message = serializer.validated_data.get('response_message', '')
+
+        # Booking details for an acceptance, read before taking the lock
+        if accepted:
+            start_datetime = timezone.make_aware(
+                datetime.combine(booking_request.proposed_date, booking_request.proposed_time)
+            )
+            end_datetime = start_datetime + timedelta(hours=float(booking_request.duration_hours))
+            
+            # Get city from client profile or use default
+            city = "Unknown"
+            if hasattr(booking_request.client, 'client_profile') and booking_request.client.client_profile.city:
+                city = booking_request.client.client_profile.city
             
-            if accepted:
-                booking_request.status = 'accepted'
-                booking_request.caregiver_response = response_message
-                if proposed_rate:
-                    booking_request.proposed_rate = proposed_rate
-                
-                # Create booking from accepted request
-                start_datetime = timezone.make_aware(
-                    datetime.combine(booking_request.proposed_date, booking_request.proposed_time)
+            # Get hourly rate
+            hourly_rate = proposed_rate or booking_request.proposed_rate
+            if not hourly_rate and hasattr(booking_request.caregiver, 'caregiver_profile'):
+                hourly_rate = booking_request.caregiver.caregiver_profile.hourly_rate
+
+        with locked_schedule(booking_request.caregiver_id):
+            # Re-read under the lock: a concurrent accept or reject may have
+            # won (row lock also keeps the expiry sweeper off this request)
+            booking_request = BookingRequest.objects.select_for_update().get(pk=booking_request.pk)
+            if booking_request.is_expired:
+                return Response(
+                    {"error": "Request has expired"},
+                    status=status.HTTP_409_CONFLICT
                 )
-                end_datetime = start_datetime + timedelta(hours=float(booking_request.duration_hours))
-                
-                # Get city from client profile or use default
-                city = "Unknown"
-                if hasattr(booking_request.client, 'client_profile') and booking_request.client.client_profile.city:
-                    city = booking_request.client.client_profile.city
-                
-                # Get hourly rate
-                hourly_rate = proposed_rate
-                if not hourly_rate and hasattr(booking_request.caregiver, 'caregiver_profile'):
-                    hourly_rate = booking_request.caregiver.caregiver_profile.hourly_rate
-                
-                Booking.objects.create(
-                    client=booking_request.client,
-                    caregiver=booking_request.caregiver,
-                    service_type=booking_request.service_type,
-                    start_datetime=start_datetime,
-                    end_datetime=end_datetime,
-                    hours=booking_request.duration_hours,
-                    address=booking_request.address,
-                    city=city,
-                    hourly_rate=hourly_rate or 0,
-                    status='confirmed',
-                    confirmed_at=timezone.now()
+            if booking_request.status not in BookingRequest.OPEN_STATUSES:
+                return Response(
+                    {"error": f"Request has already been {booking_request.status}"},
+                    status=status.HTTP_409_CONFLICT
                 )
-            else:
+
+            if not accepted:
                 booking_request.status = 'rejected'
                 booking_request.caregiver_response = response_message or 'Request rejected'
+                booking_request.responded_at = timezone.now()
+                booking_request.save()
+                return Response(self.get_serializer(booking_request).data)
+
+            conflict = Booking.objects.filter(
+                caregiver_id=booking_request.caregiver_id,
+                status__in=BLOCKING_STATUSES,
+                start_datetime__lt=end_datetime,
+                end_datetime__gt=start_datetime,
+            ).values_list('id', flat=True).first()
+            if conflict is not None:
+                return Response(
+                    {"error": "This time overlaps an existing booking", "conflicting_booking": conflict},
+                    status=status.HTTP_409_CONFLICT
+                )
+
+            booking_request.status = 'accepted'
+            booking_request.caregiver_response = response_message
+            if proposed_rate:
+                booking_request.proposed_rate = proposed_rate
             
+            Booking.objects.create(
+                client_id=booking_request.client_id,
+                caregiver_id=booking_request.caregiver_id,
+                service_type=booking_request.service_type,
+                start_datetime=start_datetime,
+                end_datetime=end_datetime,
+                hours=booking_request.duration_hours,
+                address=booking_request.address,
+                city=city,
+                hourly_rate=hourly_rate or 0,
+                status='confirmed',
+                confirmed_at=timezone.now()
+            )
             booking_request.responded_at = timezone.now()
             booking_request.save()
-            
-            return Response(self.get_serializer(booking_request).data)
-        
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(self.get_serializer(booking_request).data)
 
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
@@ -156,13 +211,20 @@ def create_booking_request(request):
     
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+def _get_caregiver(caregiver_id):
+    return User.objects.select_related('caregiver_profile').filter(
+        id=caregiver_id, user_type='caregiver', caregiver_profile__isnull=False
+    ).first()
+
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def check_caregiver_availability(request, caregiver_id):
-    """Check caregiver availability for a specific date/time"""
-    try:
-        caregiver = User.objects.get(id=caregiver_id, user_type='caregiver')
-    except User.DoesNotExist:
+    """
+    Check caregiver availability for a specific date/time.
+    Optional `duration` (hours, default 1): the whole span must be free.
+    """
+    caregiver = _get_caregiver(caregiver_id)
+    if caregiver is None:
         return Response(
             {"error": "Caregiver not found"},
             status=status.HTTP_404_NOT_FOUND
@@ -181,11 +243,17 @@ def check_caregiver_availability(request, caregiver_id):
         check_date = datetime.strptime(date_str, '%Y-%m-%d').date()
         check_time = datetime.strptime(time_str, '%H:%M').time()
         check_datetime = timezone.make_aware(datetime.combine(check_date, check_time))
+        duration = float(request.query_params.get('duration', 1))
     except ValueError:
         return Response(
             {"error": "Invalid date or time format. Use YYYY-MM-DD and HH:MM"},
             status=status.HTTP_400_BAD_REQUEST
         )
+    if not 0 < duration <= 24:
+        return Response(
+            {"error": "duration must be between 0 and 24 hours"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
     
     # Check if caregiver is generally available
     if not caregiver.caregiver_profile.is_available:
@@ -194,40 +262,164 @@ def check_caregiver_availability(request, caregiver_id):
             "reason": "Caregiver is not currently accepting bookings"
         })
     
-    # Check for existing bookings at that time
-    day_of_week = check_date.weekday()
-    
-    # Check availability slots
-
-    availability_slots = AvailabilitySlot.objects.filter(
-        Q(caregiver=caregiver, specific_date=check_date) |
-        Q(caregiver=caregiver, is_recurring=True, day_of_week=day_of_week)
-    )
-    
-    is_available = availability_slots.filter(
-        start_time__lte=check_time,
-        end_time__gte=check_time
-    ).exists()
-    
-    # Check for conflicting bookings
-    conflicting_bookings = Booking.objects.filter(
-        caregiver=caregiver,
-        status__in=['confirmed', 'in_progress'],
-        start_datetime__lt=check_datetime + timedelta(hours=1),
-        end_datetime__gt=check_datetime - timedelta(hours=1)
-    ).exists()
-    
-    if conflicting_bookings:
-        is_available = False
+    schedule = get_schedule(caregiver.id, since=check_datetime)
+    is_available = schedule.is_free(check_datetime, check_datetime + timedelta(hours=duration))
     
     return Response({
         "available": is_available,
         "caregiver_id": caregiver_id,
         "date": date_str,
         "time": time_str,
+        "duration_hours": duration,
         "hourly_rate": float(caregiver.caregiver_profile.hourly_rate)
     })
 
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def caregiver_free_windows(request, caregiver_id):
+    """
+    Next free windows of a caregiver.
+    Params: start_date (default today), end_date (default start_date + 7 days,
+    at most 31 days later), duration (minimum hours, default 1), limit (default 10, max 100).
+    """
+    caregiver = _get_caregiver(caregiver_id)
+    if caregiver is None:
+        return Response(
+            {"error": "Caregiver not found"},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    try:
+        start_date = request.query_params.get('start_date')
+        start_date = datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else timezone.localdate()
+        end_date = request.query_params.get('end_date')
+        end_date = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else start_date + timedelta(days=7)
+        duration = float(request.query_params.get('duration', 1))
+        limit = int(request.query_params.get('limit', 10))
+    except ValueError:
+        return Response(
+            {"error": "Invalid parameters. Dates use YYYY-MM-DD; duration and limit are numbers"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if end_date < start_date or (end_date - start_date).days > MAX_WINDOW_RANGE_DAYS:
+        return Response(
+            {"error": f"end_date must be within {MAX_WINDOW_RANGE_DAYS} days after start_date"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if not 0 < duration <= 24:
+        return Response(
+            {"error": "duration must be between 0 and 24 hours"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    limit = max(1, min(limit, 100))
+
+    if not caregiver.caregiver_profile.is_available:
+        return Response({"caregiver_id": caregiver_id, "windows": []})
+
+    range_start = timezone.make_aware(datetime.combine(start_date, datetime.min.time()))
+    range_end = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), datetime.min.time()))
+    # Never offer time that has already passed
+    range_start = max(range_start, timezone.now())
+
+    schedule = get_schedule(caregiver.id, since=range_start)
+    windows = schedule.free_windows(range_start, range_end, timedelta(hours=duration), limit)
+    return Response({
+        "caregiver_id": caregiver_id,
+        "windows": [
+            {"start": timezone.localtime(start).isoformat(), "end": timezone.localtime(end).isoformat()}
+            for start, end in windows
+        ]
+    })
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def available_caregivers(request):
+    """
+    Every caregiver free for a time window, as discovery cards.
+    Params: date (YYYY-MM-DD), start (HH:MM), duration (hours, default 1),
+    optional city, min_rate, max_rate; paged with page_size/cursor like discovery.
+
+    Answered by one set-based query over the discovery read model: an
+    EXISTS probe for a slot covering the window (weekly or dated, on the
+    covering slot indexes) and a NOT EXISTS probe for an overlapping
+    confirmed booking (on booking_busy_idx). A window must fit inside a
+    single published slot.
+    """
+    try:
+        check_date = datetime.strptime(request.query_params.get('date', ''), '%Y-%m-%d').date()
+        start_time = datetime.strptime(request.query_params.get('start', ''), '%H:%M').time()
+        duration = float(request.query_params.get('duration', 1))
+        min_rate = request.query_params.get('min_rate')
+        max_rate = request.query_params.get('max_rate')
+        min_rate = float(min_rate) if min_rate else None
+        max_rate = float(max_rate) if max_rate else None
+        page_size = int(request.query_params.get('page_size', 20))
+    except ValueError:
+        return Response(
+            {"error": "date (YYYY-MM-DD) and start (HH:MM) are required; duration, rates and page_size must be numbers"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    # Bounded before building the timedelta (huge or inf durations overflow it)
+    if not 0 < duration <= 24:
+        return Response(
+            {"error": "duration must be between 0 and 24 hours"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    window_start = timezone.make_aware(datetime.combine(check_date, start_time))
+    window_end = window_start + timedelta(hours=duration)
+    day_end = timezone.make_aware(datetime.combine(check_date + timedelta(days=1), datetime.min.time()))
+    if window_end > day_end:
+        return Response(
+            {"error": "The window must have a positive duration and end by midnight"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    end_time = timezone.localtime(window_end).time()
+    page_size = max(1, min(page_size, 100))
+
+    # A slot ending at 00:00 runs until midnight
+    slot_ends_in_time = Q(end_time__gte=end_time) if window_end < day_end else Q()
+    covering_slot = AvailabilitySlot.objects.filter(
+        Q(is_recurring=True, specific_date__isnull=True, day_of_week=check_date.weekday()) |
+        Q(specific_date=check_date),
+        caregiver_id=OuterRef('user_id'),
+        start_time__lte=start_time,
+    ).filter(slot_ends_in_time | Q(end_time=datetime.min.time()))
+    clashing_booking = Booking.objects.filter(
+        caregiver_id=OuterRef('user_id'),
+        status__in=BLOCKING_STATUSES,
+        start_datetime__lt=window_end,
+        end_datetime__gt=window_start,
+    )
+
+    qs = CaregiverSearchDocument.objects.filter(is_active=True, is_available=True)
+    if request.query_params.get('city'):
+        qs = qs.filter(city__iexact=request.query_params['city'].strip())
+    if min_rate is not None:
+        qs = qs.filter(hourly_rate__gte=min_rate)
+    if max_rate is not None:
+        qs = qs.filter(hourly_rate__lte=max_rate)
+    qs = qs.filter(Exists(covering_slot)).exclude(Exists(clashing_booking))
+
+    paginator = KeysetPaginator(FREE_CAREGIVER_ORDERING, page_size)
+    try:
+        token = request.query_params.get('cursor')
+        after = None
+        if token:
+            payload = decode_cursor(token)
+            if payload.get('sort') != 'recommended':
+                raise InvalidCursor("Cursor does not match the requested sort")
+            after = payload['after']
+        documents, next_key = paginator.paginate(qs, after)
+    except InvalidCursor as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({
+        "window": {"start": window_start.isoformat(), "end": window_end.isoformat()},
+        "next_cursor": encode_cursor({'sort': 'recommended', 'after': next_key}) if next_key else None,
+        "results": CaregiverSearchDocumentSerializer(documents, many=True).data,
+    })
+
 class AvailabilitySlotViewSet(viewsets.ModelViewSet):
     """ViewSet for availability slots (caregivers only)"""
     serializer_class = AvailabilitySlotSerializer
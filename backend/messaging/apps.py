@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class MessagingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'messaging'
+
+    def ready(self):
+        # Inbox last-message / unread counter maintenance
+        from . import inbox  # noqa: F401
+        # Message full-text index maintenance
+        from . import search  # noqa: F401
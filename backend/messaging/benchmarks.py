@@ -0,0 +1,110 @@
+"""
+CareNest Pro - Messaging Benchmark Helpers
+Description: Seeding and socket plumbing shared by the messaging benchmark commands.
+"""
+
+import itertools
+import random
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .models import Conversation, ConversationParticipant, Message
+from .search import index_messages
+
+
+def chat_socket(token):
+    """An (unconnected) test socket to ChatConsumer through the full ASGI stack."""
+    from channels.testing import WebsocketCommunicator
+
+    from backend.asgi import application
+
+    return WebsocketCommunicator(
+        application, f'/ws/chat/?token={token}',
+        headers=[(b'origin', b'http://localhost'), (b'host', b'localhost')],
+    )
+
+
+def seed_conversations(count):
+    """`count` two-person conversations; returns [(conversation_id, sender_token, recipient_token)]."""
+    User = get_user_model()
+    users = User.objects.bulk_create([
+        User(
+            email=f'fanout-{n}@example.com', username=f'fanout_{n}',
+            first_name='Fan', last_name=str(n), user_type='client' if n % 2 else 'caregiver',
+        )
+        for n in range(count * 2)
+    ])
+    conversations = Conversation.objects.bulk_create([Conversation() for _ in range(count)])
+    ConversationParticipant.objects.bulk_create([
+        ConversationParticipant(conversation=conversation, user=user)
+        for index, conversation in enumerate(conversations)
+        for user in users[index * 2:index * 2 + 2]
+    ])
+    return [
+        (
+            conversation.id,
+            str(AccessToken.for_user(users[index * 2])),
+            str(AccessToken.for_user(users[index * 2 + 1])),
+        )
+        for index, conversation in enumerate(conversations)
+    ]
+
+
+def corpus_vocabulary(size, rng):
+    """`size` distinct pronounceable words; earlier words are drawn more often."""
+    syllables = [c + v for c in 'bdfgklmnprstvz' for v in 'aeiou']
+    words = []
+    seen = set()
+    while len(words) < size:
+        word = ''.join(rng.choices(syllables, k=rng.randint(2, 4)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+
+def seed_message_corpus(messages, conversations, vocabulary, batch_size=20000, seed=0, progress=None):
+    """
+    A synthetic message corpus: `conversations` two-person conversations in a
+    ring (conversation n joins users n and n+1, so everyone is in two) and
+    `messages` messages spread round-robin over them, with word frequencies
+    following Zipf's law over `vocabulary`. Rows and index entries are written
+    in bulk (bypassing signals). Returns the users.
+    """
+    rng = random.Random(seed)
+    User = get_user_model()
+    users = User.objects.bulk_create([
+        User(
+            email=f'corpus-{n}@example.com', username=f'corpus_{n}',
+            first_name='Corpus', last_name=str(n), user_type='client' if n % 2 else 'caregiver',
+        )
+        for n in range(conversations)
+    ], batch_size=1000)
+    threads = Conversation.objects.bulk_create([Conversation() for _ in range(conversations)], batch_size=1000)
+    ConversationParticipant.objects.bulk_create([
+        ConversationParticipant(conversation=thread, user=user)
+        for index, thread in enumerate(threads)
+        for user in (users[index], users[(index + 1) % conversations])
+    ], batch_size=1000)
+
+    cum_weights = list(itertools.accumulate(1 / rank for rank in range(1, len(vocabulary) + 1)))
+    written = 0
+    while written < messages:
+        batch = [
+            Message(
+                conversation=threads[n % conversations],
+                # Both participants take turns writing
+                sender=users[(n % conversations + n // conversations % 2) % conversations],
+                content=' '.join(rng.choices(vocabulary, cum_weights=cum_weights, k=rng.randint(3, 20))),
+            )
+            for n in range(written, min(messages, written + batch_size))
+        ]
+        with transaction.atomic():
+            Message.objects.bulk_create(batch)
+            index_messages(batch)
+        written += len(batch)
+        if progress:
+            progress(written)
+    return users
@@ -1,13 +1,21 @@
-import json
+import asyncio
+import time
+from channels.consumer import get_handler_name
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.contrib.auth import get_user_model
-from .models import Conversation, Message, UserOnlineStatus
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from api.codec import JSONCodecMixin
+from . import presence
+from .inbox import mark_conversation_read
+from .models import ConversationParticipant, Message
+from .typing_indicators import TypingCoalescer
 from django.utils import timezone
 
 User = get_user_model()
 
-class ChatConsumer(AsyncWebsocketConsumer):
+class ChatConsumer(JSONCodecMixin, AsyncWebsocketConsumer):
     async def connect(self):
         self.user = self.scope['user']
         
@@ -22,8 +30,14 @@ class ChatConsumer(AsyncWebsocketConsumer):
             self.channel_name
         )
         
-        # Set user as online
-        await self.set_online_status(True)
+        # Take a presence reference (other tabs keep theirs)
+        await self.presence_connect()
+        self.heartbeat_due = time.monotonic() + presence.presence_ttl() / 3
+        
+        # Conversations joined on this socket, and their typing state
+        self.joined_conversations = set()
+        self.typing = TypingCoalescer()
+        self.typing_timers = {}
         
         await self.accept()
     
@@ -35,11 +49,32 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 self.channel_name
             )
             
-            # Set user as offline
-            await self.set_online_status(False)
+            # Nobody keeps seeing a typist whose socket is gone
+            for timer in self.typing_timers.values():
+                timer.cancel()
+            for conversation_id in self.typing.active():
+                await self.publish_typing(conversation_id, False)
+            
+            # Release this connection's presence reference
+            await self.presence_disconnect()
+    
+    async def dispatch(self, message):
+        # channels hops to the sync thread for close_old_connections() before
+        # every handler, serializing each keystroke and fanned-out frame of
+        # every socket. All ORM access here goes through database_sync_to_async,
+        # which closes stale connections around each call, so skip the hop.
+        handler = getattr(self, get_handler_name(message), None)
+        if handler is None:
+            raise ValueError(f"No handler for message type {message['type']}")
+        await handler(message)
     
     async def receive(self, text_data):
-        data = json.loads(text_data)
+        # Any frame is a heartbeat; idle clients send {"action": "heartbeat"}
+        if time.monotonic() >= self.heartbeat_due:
+            self.heartbeat_due = time.monotonic() + presence.presence_ttl() / 3
+            await self.presence_heartbeat()
+        
+        data = await self.decode_json(text_data)
         action = data.get('action')
         
         if action == 'send_message':
@@ -59,60 +94,85 @@ class ChatConsumer(AsyncWebsocketConsumer):
         if not conversation_id or not content:
             return
         
-        # Save message to database
-        message = await self.save_message(conversation_id, content)
+        # One thread hop: persist, bump the conversation, resolve recipients
+        result = await self.persist_message(conversation_id, content)
+        if result is None:
+            return
+        payload, recipient_ids = result
         
-        if message:
-            # Get conversation room
-            conversation_room = f"conversation_{conversation_id}"
-            
-            # Send to conversation room
+        # Encode the message once; both frames embed the same JSON and are
+        # sent verbatim by every receiving socket
+        message_json = await self.encode_json(payload)
+        await self.channel_layer.group_send(
+            f"conversation_{conversation_id}",
+            {
+                'type': 'chat_message',
+                'text': f'{{"action": "new_message", "message": {message_json}}}'
+            }
+        )
+        
+        # Also send to recipients' personal rooms for notifications
+        notification = (
+            f'{{"action": "notification", "message": {message_json}, '
+            f'"conversation_id": {await self.encode_json(conversation_id)}}}'
+        )
+        for recipient_id in recipient_ids:
             await self.channel_layer.group_send(
-                conversation_room,
+                f"user_{recipient_id}",
                 {
-                    'type': 'chat_message',
-                    'message': await self.message_to_dict(message)
+                    'type': 'new_message_notification',
+                    'text': notification
                 }
             )
-            
-            # Also send to recipient's personal room for notifications
-            recipient = await self.get_other_participant(conversation_id, self.user.id)
-            if recipient:
-                recipient_room = f"user_{recipient.id}"
-                await self.channel_layer.group_send(
-                    recipient_room,
-                    {
-                        'type': 'new_message_notification',
-                        'message': await self.message_to_dict(message),
-                        'conversation_id': conversation_id
-                    }
-                )
     
     async def join_conversation(self, data):
         """Join a conversation room"""
         conversation_id = data.get('conversation_id')
-        if conversation_id:
+        if conversation_id and await self.is_participant(conversation_id):
             conversation_room = f"conversation_{conversation_id}"
             await self.channel_layer.group_add(
                 conversation_room,
                 self.channel_name
             )
+            self.joined_conversations.add(str(conversation_id))
     
     async def handle_typing(self, data):
-        """Handle typing indicators"""
+        """Handle typing indicators (state changes only; see messaging.typing_indicators)"""
         conversation_id = data.get('conversation_id')
-        is_typing = data.get('is_typing', False)
-        
-        if conversation_id:
-            conversation_room = f"conversation_{conversation_id}"
-            await self.channel_layer.group_send(
-                conversation_room,
-                {
-                    'type': 'typing_indicator',
-                    'user_id': self.user.id,
-                    'is_typing': is_typing
-                }
-            )
+        # Only in conversations joined on this socket, where membership was checked
+        if conversation_id is None or str(conversation_id) not in self.joined_conversations:
+            return
+        conversation_id = str(conversation_id)
+        await self.apply_typing(conversation_id, self.typing.input(conversation_id, data.get('is_typing', False)))
+    
+    async def apply_typing(self, conversation_id, decision):
+        if decision.deadline is not None:
+            timer = self.typing_timers.get(conversation_id)
+            # An earlier timer stays: due() hands back the later deadline when it fires
+            if timer is None or timer.when() > decision.deadline:
+                if timer is not None:
+                    timer.cancel()
+                # The coalescer's clock is time.monotonic(), the same as loop.time()
+                self.typing_timers[conversation_id] = asyncio.get_running_loop().call_at(
+                    decision.deadline, self.typing_due, conversation_id
+                )
+        if decision.publish is not None:
+            await self.publish_typing(conversation_id, decision.publish)
+    
+    def typing_due(self, conversation_id):
+        self.typing_timers.pop(conversation_id, None)
+        asyncio.ensure_future(self.apply_typing(conversation_id, self.typing.due(conversation_id)))
+    
+    async def publish_typing(self, conversation_id, is_typing):
+        user_id = str(self.user.id)
+        await self.channel_layer.group_send(
+            f"conversation_{conversation_id}",
+            {
+                'type': 'typing_indicator',
+                'user_id': user_id,
+                'text': await self.encode_json({'action': 'typing', 'user_id': user_id, 'is_typing': is_typing})
+            }
+        )
     
     async def mark_messages_read(self, data):
         """Mark messages as read"""
@@ -126,97 +186,85 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 conversation_room,
                 {
                     'type': 'messages_read',
-                    'user_id': self.user.id,
+                    'user_id': str(self.user.id),
                     'conversation_id': conversation_id
                 }
             )
     
     async def chat_message(self, event):
-        """Receive chat message"""
-        await self.send(text_data=json.dumps({
-            'action': 'new_message',
-            'message': event['message']
-        }))
+        """Receive chat message (pre-encoded by the sender)"""
+        await self.send(text_data=event['text'])
     
     async def new_message_notification(self, event):
-        """Receive new message notification"""
-        await self.send(text_data=json.dumps({
-            'action': 'notification',
-            'message': event['message'],
-            'conversation_id': event['conversation_id']
-        }))
+        """Receive new message notification (pre-encoded by the sender)"""
+        await self.send(text_data=event['text'])
+    
+    async def new_notifications(self, event):
+        """Receive stored notifications (pre-encoded by notifications.outbox)"""
+        await self.send(text_data=event['text'])
     
     async def typing_indicator(self, event):
-        """Receive typing indicator"""
-        await self.send(text_data=json.dumps({
-            'action': 'typing',
-            'user_id': event['user_id'],
-            'is_typing': event['is_typing']
-        }))
+        """Receive typing indicator (pre-encoded; not echoed to the typist's own sockets)"""
+        if event['user_id'] != str(self.user.id):
+            await self.send(text_data=event['text'])
     
     async def messages_read(self, event):
         """Receive messages read notification"""
-        await self.send(text_data=json.dumps({
+        await self.send_json({
             'action': 'messages_read',
             'user_id': event['user_id'],
             'conversation_id': event['conversation_id']
-        }))
+        })
     
     @database_sync_to_async
-    def save_message(self, conversation_id, content):
+    def persist_message(self, conversation_id, content):
+        """
+        Save a message (messaging.inbox bumps the conversation in the same
+        transaction) and return (payload, other participant ids), or None
+        if the user is not a participant.
+        """
         try:
-            conversation = Conversation.objects.get(id=conversation_id)
-            message = Message.objects.create(
-                conversation=conversation,
-                sender=self.user,
-                content=content
-            )
-            # Update conversation timestamp
-            conversation.save()
-            return message
-        except Conversation.DoesNotExist:
+            with transaction.atomic():
+                member_ids = list(ConversationParticipant.objects.filter(
+                    conversation_id=conversation_id
+                ).values_list('user_id', flat=True))
+                if self.user.id not in member_ids:
+                    return None
+                message = Message.objects.create(
+                    conversation_id=conversation_id,
+                    sender=self.user,
+                    content=content
+                )
+        except (ValueError, ValidationError):
             return None
-    
-    @database_sync_to_async
-    def message_to_dict(self, message):
-        return {
+        payload = {
             'id': message.id,
-            'sender_id': message.sender.id,
-            'sender_email': message.sender.email,
+            'sender_id': str(self.user.id),
+            'sender_email': self.user.email,
             'content': message.content,
             'created_at': message.created_at.isoformat(),
             'is_read': message.is_read
         }
+        return payload, [str(user_id) for user_id in member_ids if user_id != self.user.id]
     
     @database_sync_to_async
-    def get_other_participant(self, conversation_id, user_id):
-        try:
-            conversation = Conversation.objects.get(id=conversation_id)
-            return conversation.get_other_participant(self.user)
-        except Conversation.DoesNotExist:
-            return None
+    def is_participant(self, conversation_id):
+        return ConversationParticipant.objects.filter(
+            conversation_id=conversation_id, user=self.user
+        ).exists()
     
     @database_sync_to_async
     def mark_conversation_read(self, conversation_id):
-        try:
-            conversation = Conversation.objects.get(id=conversation_id)
-            updated = conversation.messages.filter(
-                is_read=False
-            ).exclude(
-                sender=self.user
-            ).update(
-                is_read=True,
-                read_at=timezone.now()
-            )
-            return updated
-        except Conversation.DoesNotExist:
-            return 0
+        return mark_conversation_read(conversation_id, self.user)
     
     @database_sync_to_async
-    def set_online_status(self, is_online):
-        status_obj, created = UserOnlineStatus.objects.get_or_create(
-            user=self.user,
-            defaults={'is_online': is_online}
-        )
-        status_obj.is_online = is_online
-        status_obj.save()
\ No newline at end of file
+    def presence_connect(self):
+        return presence.connect(self.user.id)
+    
+    @database_sync_to_async
+    def presence_disconnect(self):
+        return presence.disconnect(self.user.id)
+    
+    @database_sync_to_async
+    def presence_heartbeat(self):
+        presence.heartbeat(self.user.id)
\ No newline at end of file
@@ -0,0 +1,64 @@
+"""
+CareNest Pro - Message History
+Description: Cursor windows over a conversation's messages and delta sync across conversations.
+
+Message ids only ever grow, so the id itself is the cursor. A page older
+than a message is a seek on `id < before` read newest-first, a page newer
+than one is a seek on `id > after` read oldest-first; both walk the
+(conversation, id) index for exactly one page plus a probe row, however
+long the thread is. sync_since() applies the same seek across every
+conversation the user belongs to, so a client coming back from a gap
+asks once for everything after the last id it holds.
+"""
+
+from .inbox import USER_PROFILE_RELATIONS
+from .models import ConversationParticipant, Message
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+# Delta sync pages are larger: they span every conversation at once
+MAX_SYNC_SIZE = 500
+
+
+def history_queryset():
+    """Messages with what MessageSerializer reads about the sender joined in."""
+    return Message.objects.select_related(
+        *(f'sender__{relation}' for relation in USER_PROFILE_RELATIONS)
+    )
+
+
+def message_window(queryset, before=None, after=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Up to `limit` messages in ascending id order, and whether more exist
+    past the window in the direction of travel: newer than `after` when
+    it is given, otherwise older than `before` (or than the latest page).
+    """
+    if before is not None:
+        queryset = queryset.filter(id__lt=before)
+    if after is not None:
+        rows = list(queryset.filter(id__gt=after).order_by('id')[:limit + 1])
+        return rows[:limit], len(rows) > limit
+    rows = list(queryset.order_by('-id')[:limit + 1])
+    return rows[:limit][::-1], len(rows) > limit
+
+
+def sync_since(user, since, limit=MAX_SYNC_SIZE):
+    """
+    Messages newer than `since` in all of the user's conversations
+    (ascending, at most `limit`), whether more remain, and the user's
+    membership state for each conversation that has new messages.
+    """
+    memberships = ConversationParticipant.objects.filter(user=user)
+    rows = list(
+        history_queryset().filter(
+            conversation_id__in=memberships.values('conversation_id'), id__gt=since
+        ).order_by('id')[:limit + 1]
+    )
+    messages = rows[:limit]
+    conversation_ids = {message.conversation_id for message in messages}
+    states = list(
+        memberships.filter(conversation_id__in=conversation_ids).values(
+            'conversation_id', 'unread_count', 'last_read_at'
+        )
+    ) if conversation_ids else []
+    return messages, len(rows) > limit, states
@@ -0,0 +1,133 @@
+"""
+CareNest Pro - Conversation Inbox
+Description: Denormalized last-message pointers and per-participant unread counters.
+
+Every new message moves Conversation.last_message/updated_at forward and
+adds one to the unread counter of the other participants
+(ConversationParticipant.unread_count), in the sender's transaction.
+Reading a conversation zeroes the reader's counter in the same
+transaction that flags the messages. The inbox is then one query for the
+conversations (last message and its sender joined in, the viewer's
+counter read from the membership row) plus one prefetch for participants,
+however many conversations are listed. rebuild_inbox() recomputes both
+from the messages for repairs after bulk writes.
+
+UNREAD_MESSAGES caches each user's unread total (api.counters) and
+follows every counter change, so the messages badge is a cache read.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, F, Max, Prefetch, Q, Sum
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from api.counters import CachedCounter
+
+from .models import Conversation, ConversationParticipant, Message
+
+# Profile relations read by UserBasicSerializer
+USER_PROFILE_RELATIONS = ('caregiver_profile', 'client_profile')
+
+
+def inbox_queryset(user):
+    """The user's active conversations, ready for ConversationSerializer in two queries."""
+    User = get_user_model()
+    return Conversation.objects.filter(
+        memberships__user=user, is_active=True
+    ).annotate(
+        viewer_unread_count=F('memberships__unread_count'),
+    ).select_related(
+        *(f'last_message__sender__{relation}' for relation in USER_PROFILE_RELATIONS)
+    ).prefetch_related(
+        Prefetch('participants', queryset=User.objects.select_related(*USER_PROFILE_RELATIONS))
+    )
+
+
+def unread_total(user):
+    """Unread messages across all of the user's conversations (one indexed SUM)."""
+    return ConversationParticipant.objects.filter(user=user).aggregate(
+        total=Sum('unread_count')
+    )['total'] or 0
+
+
+# unread_total() kept in the cache: every counter change above is applied
+# to it on commit, and rebuild_inbox() drops the users it recounts
+UNREAD_MESSAGES = CachedCounter('unread_messages', unread_total)
+
+
+def mark_conversation_read(conversation_id, user):
+    """
+    Flag the other participants' messages as read and zero the user's
+    counter. Returns the number of messages flagged (0 for non-members).
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        membership = ConversationParticipant.objects.select_for_update().filter(
+            conversation_id=conversation_id, user=user
+        )
+        # Locked so the cached total drops by exactly what is zeroed here
+        unread = membership.values_list('unread_count', flat=True).first()
+        if unread is None:
+            return 0
+        membership.update(unread_count=0, last_read_at=now)
+        UNREAD_MESSAGES.add({user.pk: -unread})
+        return Message.objects.filter(
+            conversation_id=conversation_id, is_read=False
+        ).exclude(sender=user).update(is_read=True, read_at=now)
+
+
+def rebuild_inbox(conversation_ids=None):
+    """Recompute last_message and unread counters from the messages; returns conversations touched."""
+    conversations = Conversation.objects.all()
+    if conversation_ids is not None:
+        conversations = conversations.filter(id__in=conversation_ids)
+    conversations = conversations.annotate(latest_id=Max('messages__id'))
+
+    touched = 0
+    with transaction.atomic():
+        for conversation in conversations.iterator():
+            Conversation.objects.filter(id=conversation.id).update(last_message_id=conversation.latest_id)
+            # Unread messages per sender; each member's count is everyone else's
+            by_sender = dict(
+                Message.objects.filter(conversation_id=conversation.id, is_read=False)
+                .values_list('sender_id').annotate(n=Count('id')).order_by()
+            )
+            total = sum(by_sender.values())
+            memberships = ConversationParticipant.objects.filter(conversation_id=conversation.id)
+            user_ids = list(memberships.values_list('user_id', flat=True))
+            for user_id in user_ids:
+                memberships.filter(user_id=user_id).update(unread_count=total - by_sender.get(user_id, 0))
+            UNREAD_MESSAGES.invalidate(user_ids)
+            touched += 1
+    return touched
+
+
+# =============================================================================
+# SIGNAL RECEIVERS (connected in MessagingConfig.ready)
+# =============================================================================
+
+@receiver(post_save, sender=Message)
+def message_saved(sender, instance, created, raw=False, **kwargs):
+    if raw or not created:
+        return
+    with transaction.atomic():
+        # Only ever move forward, so out-of-order commits keep the newest
+        Conversation.objects.filter(id=instance.conversation_id).filter(
+            Q(last_message__isnull=True) | Q(last_message_id__lt=instance.id)
+        ).update(last_message=instance, updated_at=timezone.now())
+        if not instance.is_read:
+            ConversationParticipant.add_unread(instance.conversation_id, instance.sender_id, 1)
+
+
+@receiver(post_delete, sender=Message)
+def message_deleted(sender, instance, **kwargs):
+    if not instance.is_read:
+        ConversationParticipant.add_unread(instance.conversation_id, instance.sender_id, -1)
+    # SET_NULL already cleared the pointer if this was the newest message
+    Conversation.objects.filter(id=instance.conversation_id, last_message__isnull=True).update(
+        last_message_id=Message.objects.filter(
+            conversation_id=instance.conversation_id
+        ).order_by('-id').values('id')[:1]
+    )
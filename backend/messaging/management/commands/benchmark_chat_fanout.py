@@ -0,0 +1,163 @@
+import asyncio
+import multiprocessing
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from api.benchmarks import format_summary, scratch_database, summarize
+from messaging.benchmarks import chat_socket, seed_conversations
+
+CONNECT_BATCH = 200
+
+
+def _socket_plan(pairs, processes, devices):
+    """
+    Per process: [(role, conversation_id, token)]. A conversation's sender
+    and its recipient's devices live in different processes whenever there
+    is more than one, so every delivery crosses the channel layer.
+    """
+    plan = [[] for _ in range(processes)]
+    for index, (conversation_id, sender_token, recipient_token) in enumerate(pairs):
+        plan[index % processes].append(('sender', conversation_id, sender_token))
+        for device in range(devices):
+            plan[(index + 1 + device) % processes].append(('receiver', conversation_id, recipient_token))
+    return plan
+
+
+async def _run_worker(sockets, messages, spread, barrier, timeout):
+    communicators = []
+    errors = 0
+    for start in range(0, len(sockets), CONNECT_BATCH):
+        batch = []
+        for role, conversation_id, token in sockets[start:start + CONNECT_BATCH]:
+            communicator = chat_socket(token)
+            batch.append((role, conversation_id, communicator))
+        results = await asyncio.gather(*(c.connect(timeout=timeout) for _, _, c in batch))
+        for (role, conversation_id, communicator), (connected, _) in zip(batch, results):
+            if connected:
+                communicators.append((role, conversation_id, communicator))
+            else:
+                errors += 1
+
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, barrier.wait)
+
+    senders = [(cid, c) for role, cid, c in communicators if role == 'sender']
+    # Open-loop load: senders are staggered evenly over `spread` seconds per round
+    gap = spread / max(1, len(senders))
+
+    async def send(position, conversation_id, communicator):
+        for round_ in range(messages):
+            await asyncio.sleep(max(0, started + round_ * spread + position * gap - time.monotonic()))
+            await communicator.send_json_to({
+                'action': 'send_message',
+                'conversation_id': conversation_id,
+                'content': repr(time.time()),
+            })
+
+    async def receive(communicator):
+        latencies = []
+        deadline = time.monotonic() + timeout + spread * messages
+        while len(latencies) < messages:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                event = await communicator.receive_json_from(timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+            if event.get('action') == 'notification':
+                latencies.append(time.time() - float(event['message']['content']))
+        return latencies
+
+    receivers = [asyncio.ensure_future(receive(c)) for role, _, c in communicators if role == 'receiver']
+    started = time.monotonic()
+    await asyncio.gather(*(send(position, cid, c) for position, (cid, c) in enumerate(senders)))
+    latencies = [latency for result in await asyncio.gather(*receivers) for latency in result]
+
+    await asyncio.gather(*(c.disconnect() for _, _, c in communicators), return_exceptions=True)
+    return latencies, errors
+
+
+def _worker(sockets, messages, spread, barrier, timeout, results):
+    # Each process opens its own database connections
+    connections.close_all()
+    try:
+        results.put(asyncio.run(_run_worker(sockets, messages, spread, barrier, timeout)))
+    except Exception as exc:  # report instead of hanging the parent
+        results.put(([], f"{type(exc).__name__}: {exc}"))
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        "Open thousands of authenticated chat sockets across worker processes on a scratch "
+        "database and measure message fan-out latency through the channel layer."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--conversations', type=int, default=1000)
+        parser.add_argument('--devices', type=int, default=1, help="Sockets per recipient (fan-out width).")
+        parser.add_argument('--messages', type=int, default=3, help="Messages sent per conversation.")
+        parser.add_argument('--spread', type=float, default=10.0,
+                            help="Seconds over which each round of messages is spread (0 = burst).")
+        parser.add_argument('--processes', type=int, default=4)
+        parser.add_argument('--timeout', type=float, default=60.0)
+        parser.add_argument('--max-p99-ms', type=float, default=1000.0)
+
+    def handle(self, *args, **options):
+        processes = options['processes']
+        layer = settings.CHANNEL_LAYERS['default']['BACKEND']
+        if processes > 1 and layer.endswith('InMemoryChannelLayer'):
+            raise CommandError(
+                "The in-memory channel layer cannot cross processes; set REDIS_URL or use --processes 1"
+            )
+
+        with scratch_database():
+            pairs = seed_conversations(options['conversations'])
+            plan = _socket_plan(pairs, processes, options['devices'])
+            expected = options['conversations'] * options['devices'] * options['messages']
+            self.stdout.write(
+                f"{sum(len(sockets) for sockets in plan)} sockets in {processes} processes "
+                f"({layer.rsplit('.', 1)[-1]}), {expected} deliveries expected"
+            )
+
+            connections.close_all()
+            context = multiprocessing.get_context('fork')
+            barrier = context.Barrier(processes)
+            results = context.Queue()
+            workers = [
+                context.Process(
+                    target=_worker,
+                    args=(sockets, options['messages'], options['spread'], barrier, options['timeout'], results),
+                )
+                for sockets in plan
+            ]
+            started = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            wait = options['timeout'] * 3 + options['spread'] * options['messages']
+            outcomes = [results.get(timeout=wait) for _ in workers]
+            for worker in workers:
+                worker.join()
+            elapsed = time.perf_counter() - started
+
+        latencies = [latency for worker_latencies, _ in outcomes for latency in worker_latencies]
+        failures = [error for _, error in outcomes if isinstance(error, str)]
+        refused = sum(error for _, error in outcomes if isinstance(error, int))
+        summary = summarize(latencies)
+        self.stdout.write(
+            f"delivered={len(latencies)}/{expected} refused_sockets={refused} wall={elapsed:.1f}s"
+        )
+        self.stdout.write(format_summary(summary))
+
+        if failures:
+            raise CommandError("Worker failed: " + "; ".join(failures))
+        if refused or len(latencies) < expected:
+            raise CommandError(f"Lost deliveries: {expected - len(latencies)}, refused sockets: {refused}")
+        if summary['p99'] > options['max_p99_ms']:
+            raise CommandError(f"p99 {summary['p99']:.2f}ms exceeds {options['max_p99_ms']}ms")
+        self.stdout.write(self.style.SUCCESS("All messages delivered; fan-out latency within bound"))
@@ -0,0 +1,56 @@
+import asyncio
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from api.benchmarks import format_summary, scratch_database, summarize
+from messaging.benchmarks import chat_socket, seed_conversations
+
+
+async def _measure(pairs, messages, timeout):
+    """Closed loop per pair: send, wait for the recipient's notification, repeat."""
+    async def run_pair(conversation_id, sender_token, recipient_token):
+        sender, recipient = chat_socket(sender_token), chat_socket(recipient_token)
+        await sender.connect(timeout=timeout)
+        await recipient.connect(timeout=timeout)
+        latencies = []
+        for _ in range(messages):
+            started = time.perf_counter()
+            await sender.send_json_to({'action': 'send_message', 'conversation_id': conversation_id, 'content': 'ping'})
+            while (await recipient.receive_json_from(timeout=timeout)).get('action') != 'notification':
+                pass
+            latencies.append(time.perf_counter() - started)
+        await sender.disconnect()
+        await recipient.disconnect()
+        return latencies
+
+    results = await asyncio.gather(*(run_pair(*pair) for pair in pairs))
+    return [latency for latencies in results for latency in latencies]
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure per-message ChatConsumer send latency (sender frame in, recipient "
+        "notification out) through the full ASGI stack on a scratch database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pairs', type=int, default=10, help="Concurrent sender/recipient pairs.")
+        parser.add_argument('--messages', type=int, default=100, help="Messages per pair, sent one at a time.")
+        parser.add_argument('--timeout', type=float, default=10.0)
+        parser.add_argument('--max-p99-ms', type=float, default=100.0)
+
+    def handle(self, *args, **options):
+        with scratch_database():
+            pairs = seed_conversations(options['pairs'])
+            try:
+                latencies = asyncio.run(_measure(pairs, options['messages'], options['timeout']))
+            finally:
+                connections.close_all()
+
+        summary = summarize(latencies)
+        self.stdout.write(format_summary(summary))
+        if summary['p99'] > options['max_p99_ms']:
+            raise CommandError(f"p99 {summary['p99']:.2f}ms exceeds {options['max_p99_ms']}ms")
+        self.stdout.write(self.style.SUCCESS("Send latency within bound"))
@@ -0,0 +1,96 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api.benchmarks import format_summary, scratch_database, summarize
+from messaging.benchmarks import corpus_vocabulary, seed_message_corpus
+from messaging.models import Message
+from messaging.search import MESSAGE_TEXT_INDEX
+from messaging.views import ConversationViewSet
+
+# Query terms are drawn from these vocabulary rank bands
+TERM_BANDS = {'common': (0, 50), 'medium': (50, 1000), 'rare': (1000, None)}
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic message corpus on a scratch database and measure "
+        "GET /conversations/search/ latency per query class, optionally against "
+        "the previous unindexed content__icontains scan."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--messages', type=int, default=10_000_000)
+        parser.add_argument('--conversations', type=int, default=20_000)
+        parser.add_argument('--vocabulary', type=int, default=20_000)
+        parser.add_argument('--queries', type=int, default=300, help="Searches per query class.")
+        parser.add_argument('--baseline', type=int, default=5,
+                            help="Searches timed with the old icontains scan (0 to skip).")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--max-p99-ms', type=float, default=100.0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        vocabulary = corpus_vocabulary(options['vocabulary'], rng)
+
+        with scratch_database():
+            if not MESSAGE_TEXT_INDEX.available():
+                raise CommandError("This database has no full-text support")
+
+            started = time.perf_counter()
+            step = max(1, options['messages'] // 10)
+
+            def progress(written):
+                if written % step < 20000 or written == options['messages']:
+                    self.stdout.write(f"  seeded {written} messages ({time.perf_counter() - started:.0f}s)")
+
+            users = seed_message_corpus(
+                options['messages'], options['conversations'], vocabulary,
+                seed=options['seed'], progress=progress,
+            )
+
+            view = ConversationViewSet.as_view({'get': 'search'}, throttle_classes=[])
+            factory = APIRequestFactory()
+            queries = []
+            for band, (start, stop) in TERM_BANDS.items():
+                words = vocabulary[start:stop]
+                for _ in range(options['queries']):
+                    terms = rng.sample(words, 2 if rng.random() < 0.3 else 1)
+                    queries.append((band, rng.choice(users), ' '.join(terms)))
+            rng.shuffle(queries)
+
+            latencies = {band: [] for band in TERM_BANDS}
+            matched = 0
+            for band, user, text in queries:
+                request = factory.get('/api/messaging/conversations/search/', {'q': text})
+                force_authenticate(request, user=user)
+                began = time.perf_counter()
+                response = view(request)
+                response.render()
+                latencies[band].append(time.perf_counter() - began)
+                if response.status_code != 200:
+                    raise CommandError(f"Search for {text!r} returned {response.status_code}")
+                matched += bool(response.data['results'])
+
+            baseline = []
+            for band, user, text in queries[:options['baseline']]:
+                began = time.perf_counter()
+                list(Message.objects.filter(conversation__participants=user, content__icontains=text))
+                baseline.append(time.perf_counter() - began)
+
+        self.stdout.write(
+            f"{options['messages']} messages, {options['conversations']} conversations, "
+            f"{matched}/{len(queries)} searches with results"
+        )
+        for band, samples in latencies.items():
+            self.stdout.write(f"{band:>8}: {format_summary(summarize(samples))}")
+        overall = summarize([sample for samples in latencies.values() for sample in samples])
+        self.stdout.write(f"{'all':>8}: {format_summary(overall)}")
+        if baseline:
+            self.stdout.write(f"icontains: {format_summary(summarize(baseline))}")
+
+        if overall['p99'] > options['max_p99_ms']:
+            raise CommandError(f"p99 {overall['p99']:.2f}ms exceeds {options['max_p99_ms']}ms")
+        self.stdout.write(self.style.SUCCESS("Message search latency within bound"))
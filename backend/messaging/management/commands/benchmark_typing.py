@@ -0,0 +1,149 @@
+import asyncio
+import random
+import time
+from collections import Counter
+
+from channels.layers import get_channel_layer
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from api.benchmarks import scratch_database
+from messaging.benchmarks import chat_socket, seed_conversations
+from messaging.typing_indicators import TYPING_EXPIRY
+
+CONNECT_BATCH = 200
+
+
+def _instrument_layer(layer, counts):
+    """
+    Count the channel layer's group_send calls by event type. The in-memory
+    layer also sweeps every channel and group for expired messages on each
+    send and receive, which at thousands of sockets starves the simulation
+    itself; nothing expires within a run, so the sweep is switched off.
+    """
+    patched = {name: layer.__dict__.get(name) for name in ('group_send', '_clean_expired')}
+    original = layer.group_send
+
+    async def group_send(group, message):
+        counts[message['type']] += 1
+        return await original(group, message)
+
+    layer.group_send = group_send
+    if hasattr(layer, '_clean_expired'):
+        layer._clean_expired = lambda: None
+    return patched
+
+
+def _restore_layer(layer, patched):
+    for name, value in patched.items():
+        if value is None:
+            layer.__dict__.pop(name, None)
+        else:
+            setattr(layer, name, value)
+
+
+async def _typist(communicator, conversation_id, seconds, gap, rng, frames):
+    """Bursts of keystrokes, each ended by an explicit stop or by going silent."""
+    ends = time.monotonic() + seconds
+    while time.monotonic() < ends:
+        burst_ends = min(ends, time.monotonic() + rng.uniform(1, 5))
+        while time.monotonic() < burst_ends:
+            await communicator.send_json_to({'action': 'typing', 'conversation_id': conversation_id, 'is_typing': True})
+            frames['typing'] += 1
+            await asyncio.sleep(rng.expovariate(1 / gap))
+        if rng.random() < 0.5:
+            await communicator.send_json_to({'action': 'typing', 'conversation_id': conversation_id, 'is_typing': False})
+            frames['typing'] += 1
+        await asyncio.sleep(rng.uniform(0.5, 4))
+
+
+async def _listener(communicator, until, received):
+    """Collect typing frames until `until`; returns the last state seen."""
+    state = False
+    while True:
+        remaining = until - time.monotonic()
+        if remaining <= 0:
+            return state
+        try:
+            event = await communicator.receive_json_from(timeout=remaining)
+        except asyncio.TimeoutError:
+            return state
+        if event.get('action') == 'typing':
+            received['typing'] += 1
+            state = event['is_typing']
+
+
+async def _run(pairs, seconds, gap, seed):
+    layer = get_channel_layer()
+    counts = Counter()
+    patched = _instrument_layer(layer, counts)
+    sockets = []
+    try:
+        for start in range(0, len(pairs), CONNECT_BATCH):
+            batch = []
+            for conversation_id, typist_token, listener_token in pairs[start:start + CONNECT_BATCH]:
+                batch.append((conversation_id, chat_socket(typist_token), chat_socket(listener_token)))
+            sockets.extend(batch)
+            await asyncio.gather(*(c.connect(timeout=30) for _, typist, listener in batch for c in (typist, listener)))
+            for conversation_id, typist, listener in batch:
+                for communicator in (typist, listener):
+                    await communicator.send_json_to({'action': 'join_conversation', 'conversation_id': conversation_id})
+        # Let the joins land before anyone types
+        await asyncio.sleep(1)
+
+        counts.clear()
+        frames, received = Counter(), Counter()
+        rng = random.Random(seed)
+        # Typists stop after `seconds`; silent ones must still be expired for the listeners
+        until = time.monotonic() + seconds + 4 + TYPING_EXPIRY + 2
+        listeners = [asyncio.ensure_future(_listener(listener, until, received)) for _, _, listener in sockets]
+        await asyncio.gather(*(
+            _typist(typist, conversation_id, seconds, gap, random.Random(rng.random()), frames)
+            for conversation_id, typist, _ in sockets
+        ))
+        final_states = await asyncio.gather(*listeners)
+    finally:
+        await asyncio.gather(*(c.disconnect() for _, t, l in sockets for c in (t, l)), return_exceptions=True)
+        _restore_layer(layer, patched)
+    return frames['typing'], counts['typing_indicator'], received['typing'], sum(final_states)
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulate active typists (one listener each) through the full ASGI stack on a "
+        "scratch database and compare typing frames received with channel-layer sends."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--typists', type=int, default=1000)
+        parser.add_argument('--seconds', type=float, default=20.0, help="How long each typist keeps typing.")
+        parser.add_argument('--gap-ms', type=float, default=200.0, help="Mean time between keystrokes.")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--min-reduction', type=float, default=5.0,
+                            help="Required ratio of typing frames in to channel-layer sends.")
+
+    def handle(self, *args, **options):
+        with scratch_database():
+            pairs = seed_conversations(options['typists'])
+            try:
+                frames_in, sends, delivered, stuck = asyncio.run(
+                    _run(pairs, options['seconds'], options['gap_ms'] / 1000, options['seed'])
+                )
+            finally:
+                connections.close_all()
+
+        # Before coalescing every frame was a group_send, delivered to both sockets in the room
+        reduction = frames_in / max(1, sends)
+        self.stdout.write(
+            f"typists={options['typists']} typing frames in={frames_in} "
+            f"({frames_in / options['seconds']:.0f}/s)"
+        )
+        self.stdout.write(
+            f"channel-layer sends: {sends} (was {frames_in}, {reduction:.1f}x fewer); "
+            f"socket deliveries: {delivered} (was {frames_in * 2})"
+        )
+        if stuck:
+            raise CommandError(f"{stuck} listeners still show a typist after every typist stopped")
+        if reduction < options['min_reduction']:
+            raise CommandError(f"Reduction {reduction:.1f}x is below {options['min_reduction']}x")
+        self.stdout.write(self.style.SUCCESS("Typing indicators coalesced; no indicator left stuck"))
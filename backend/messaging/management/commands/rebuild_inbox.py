@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from messaging.inbox import rebuild_inbox
+
+
+class Command(BaseCommand):
+    help = "Recompute conversation last-message pointers and per-participant unread counters from the messages."
+
+    def handle(self, *args, **options):
+        touched = rebuild_inbox()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt inbox state for {touched} conversations"))
@@ -0,0 +1,81 @@
+"""
+CareNest Pro - WebSocket Authentication
+Description: Resolves scope['user'] for WebSocket connections from a JWT.
+
+Browsers cannot set headers on a WebSocket handshake, so the access token
+is taken from the first of:
+
+- the `token` query string parameter (?token=<access>);
+- an `Authorization: Bearer <access>` header (native / server clients);
+- the dj-rest-auth JWT cookie (JWT_AUTH_COOKIE).
+
+Tokens are validated exactly like the REST API's JWTAuthentication.
+Without a valid token the session user from AuthMiddlewareStack is kept
+(AnonymousUser for most socket clients), and ChatConsumer refuses the
+connection.
+"""
+
+from urllib.parse import parse_qs
+
+from channels.auth import AuthMiddlewareStack
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+
+
+def _header(scope, name):
+    for key, value in scope.get('headers', ()):
+        if key == name:
+            return value.decode('latin1')
+    return None
+
+
+def get_scope_token(scope):
+    """The raw access token presented by a WebSocket handshake, if any."""
+    query = parse_qs(scope.get('query_string', b'').decode())
+    if query.get('token'):
+        return query['token'][0]
+
+    authorization = _header(scope, b'authorization')
+    if authorization:
+        parts = authorization.split()
+        if len(parts) == 2 and parts[0] in settings.SIMPLE_JWT.get('AUTH_HEADER_TYPES', ('Bearer',)):
+            return parts[1]
+
+    cookie_name = getattr(settings, 'REST_AUTH', {}).get('JWT_AUTH_COOKIE')
+    cookies = _header(scope, b'cookie')
+    if cookie_name and cookies:
+        for pair in cookies.split(';'):
+            key, _, value = pair.strip().partition('=')
+            if key == cookie_name and value:
+                return value
+    return None
+
+
+@database_sync_to_async
+def get_token_user(raw_token):
+    authentication = JWTAuthentication()
+    try:
+        validated = authentication.get_validated_token(raw_token)
+        return authentication.get_user(validated)
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return None
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+    """Set scope['user'] from a valid access token."""
+
+    async def __call__(self, scope, receive, send):
+        raw_token = get_scope_token(scope)
+        if raw_token:
+            user = await get_token_user(raw_token)
+            if user is not None:
+                scope = dict(scope, user=user)
+        return await super().__call__(scope, receive, send)
+
+
+def JWTAuthMiddlewareStack(inner):
+    """Session auth first, then a JWT (when presented) takes precedence."""
+    return AuthMiddlewareStack(JWTAuthMiddleware(inner))
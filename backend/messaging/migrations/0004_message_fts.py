@@ -0,0 +1,47 @@
+# Generated by Django 5.2.9 on 2026-10-17 08:05
+
+from django.db import migrations
+
+from api.fulltext import FullTextIndex
+
+
+def text_index(schema_editor):
+    # Mirrors messaging.search.MESSAGE_TEXT_INDEX at the time of this migration
+    return FullTextIndex(
+        'messaging_message_fts',
+        columns=[('content', 'A')],
+        scope_column='conversation',
+        using=schema_editor.connection.alias,
+    )
+
+
+def create_index(apps, schema_editor):
+    index = text_index(schema_editor)
+    index.create(schema_editor)
+    if not index.available():
+        return
+
+    Message = apps.get_model('messaging', 'Message')
+    batch = []
+    messages = Message.objects.values_list('id', 'content', 'conversation_id')
+    for message_id, content, conversation_id in messages.iterator(chunk_size=1000):
+        batch.append((message_id, {'content': content, 'conversation': conversation_id}))
+        if len(batch) >= 1000:
+            index.index_many(batch)
+            batch = []
+    index.index_many(batch)
+
+
+def drop_index(apps, schema_editor):
+    text_index(schema_editor).drop(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0003_message_history_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
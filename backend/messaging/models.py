@@ -1,4 +1,6 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
 from django.conf import settings
 from django.utils import timezone
 
@@ -6,8 +8,17 @@ class Conversation(models.Model):
     """A conversation between two users"""
     participants = models.ManyToManyField(
         settings.AUTH_USER_MODEL,
+        through='ConversationParticipant',
         related_name='conversations'
     )
+    # Denormalized newest message (maintained by messaging.inbox)
+    last_message = models.ForeignKey(
+        'Message',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
@@ -20,9 +31,47 @@ class Conversation(models.Model):
         return f"Conversation: {' & '.join(participant_names)}"
     
     def get_other_participant(self, user):
-        """Get the other user in the conversation"""
+        """Get the other user in the conversation (uses prefetched participants when present)"""
+        if 'participants' in getattr(self, '_prefetched_objects_cache', {}):
+            return next((p for p in self.participants.all() if p.pk != user.pk), None)
         return self.participants.exclude(id=user.id).first()
 
+class ConversationParticipant(models.Model):
+    """Membership of a user in a conversation, with their unread counter"""
+    # Same table and integer key as the former auto-created M2M table
+    id = models.AutoField(primary_key=True)
+    conversation = models.ForeignKey(
+        Conversation,
+        on_delete=models.CASCADE,
+        related_name='memberships'
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='conversation_memberships'
+    )
+    unread_count = models.PositiveIntegerField(default=0)
+    last_read_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'messaging_conversation_participants'
+        unique_together = [('conversation', 'user')]
+    
+    def __str__(self):
+        return f"{self.user_id} in conversation {self.conversation_id} ({self.unread_count} unread)"
+    
+    @classmethod
+    def add_unread(cls, conversation_id, sender_id, delta):
+        """Shift the unread counter of every participant except the sender (never below zero)."""
+        counter = F('unread_count') + delta if delta > 0 else Greatest(F('unread_count') + delta, 0)
+        members = cls.objects.filter(conversation_id=conversation_id).exclude(user_id=sender_id)
+        updated = members.update(unread_count=counter)
+        if updated:
+            # Imported here: inbox imports this module
+            from .inbox import UNREAD_MESSAGES
+            UNREAD_MESSAGES.add({user_id: delta for user_id in members.values_list('user_id', flat=True)})
+        return updated
+
 class Message(models.Model):
     """Individual message in a conversation"""
     conversation = models.ForeignKey(
@@ -55,6 +104,10 @@ class Message(models.Model):
     
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            # History windows and delta sync seek on message id within a conversation
+            models.Index(fields=['conversation', 'id'], name='message_conversation_id_idx'),
+        ]
     
     def __str__(self):
         return f"Message from {self.sender.email}: {self.content[:50]}..."
@@ -63,7 +116,12 @@ class Message(models.Model):
         if not self.is_read:
             self.is_read = True
             self.read_at = timezone.now()
-            self.save()
+            with transaction.atomic():
+                # Guarded so a concurrent mark-read can't decrement twice
+                if Message.objects.filter(pk=self.pk, is_read=False).update(
+                    is_read=True, read_at=self.read_at
+                ):
+                    ConversationParticipant.add_unread(self.conversation_id, self.sender_id, -1)
 
 class UserOnlineStatus(models.Model):
     """Track user online status for messaging"""
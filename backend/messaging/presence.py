@@ -0,0 +1,209 @@
+"""
+CareNest Pro - Presence
+Description: Who is online, from connection reference counts with heartbeat TTLs.
+
+Every open ChatConsumer holds one reference on its user's entry in the
+default cache (`presence:<user id>`, an integer count), so closing one
+tab of several changes nothing. The entry expires PRESENCE_TTL seconds
+after its last heartbeat: sockets heartbeat on client frames, REST
+clients through set_online, and connections lost without a disconnect
+(a killed worker, a dropped network) age out instead of pinning users
+online. A user is online while their entry exists. With the default
+process-local cache this only spans one process; multi-process
+deployments should point CACHES at Redis.
+
+UserOnlineStatus is the durable mirror (admin, last seen). Online/offline
+transitions are queued in memory and written in one bulk upsert every
+PRESENCE_FLUSH_INTERVAL seconds by a daemon thread started on first use.
+A flush re-reads the cache, so rows end up with the current state in
+whatever order processes flush, and turns rows whose entries expired
+offline.
+"""
+
+import logging
+import threading
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import close_old_connections, connection
+
+from .models import UserOnlineStatus
+
+logger = logging.getLogger(__name__)
+
+CACHE_ALIAS = 'default'
+KEY_PREFIX = 'presence'
+RECONCILE_BATCH_SIZE = 1000
+
+
+def presence_ttl():
+    return getattr(settings, 'PRESENCE_TTL', 90)
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def _key(user_id):
+    return f'{KEY_PREFIX}:{user_id}'
+
+
+# =============================================================================
+# CONNECTIONS AND HEARTBEATS
+# =============================================================================
+
+def connect(user_id):
+    """Take a reference for a new connection; True if the user came online."""
+    cache, key, ttl = _cache(), _key(user_id), presence_ttl()
+    cache.add(key, 0, timeout=ttl)
+    try:
+        count = cache.incr(key)
+    except ValueError:
+        # Expired between add() and incr()
+        cache.set(key, 1, timeout=ttl)
+        count = 1
+    # incr() keeps the old expiry; the new connection counts as a heartbeat
+    cache.touch(key, ttl)
+    if count == 1:
+        _changed(user_id)
+        return True
+    return False
+
+
+def disconnect(user_id):
+    """Release a connection's reference; True if that was the user's last one."""
+    cache, key = _cache(), _key(user_id)
+    try:
+        count = cache.decr(key)
+    except ValueError:
+        # Already expired
+        return False
+    if count > 0:
+        return False
+    # A connect racing this delete is restored by that socket's next heartbeat
+    cache.delete(key)
+    _changed(user_id)
+    return True
+
+
+def heartbeat(user_id, connected=True):
+    """
+    Keep the user's entry alive for another TTL. A socket (`connected`)
+    whose entry expired re-takes its reference; a REST client holds none.
+    """
+    cache, key, ttl = _cache(), _key(user_id), presence_ttl()
+    if cache.touch(key, ttl):
+        return
+    if cache.add(key, 1 if connected else 0, timeout=ttl):
+        _changed(user_id)
+
+
+def go_offline(user_id):
+    """REST sign-off: end a heartbeat-only presence; open sockets keep the user online."""
+    cache, key = _cache(), _key(user_id)
+    if cache.get(key, 0) <= 0 and cache.delete(key):
+        _changed(user_id)
+
+
+# =============================================================================
+# READS
+# =============================================================================
+
+def online_user_ids(user_ids):
+    """The subset of `user_ids` that is online, in one cache round trip."""
+    user_ids = {str(user_id) for user_id in user_ids}
+    if not user_ids:
+        return set()
+    found = _cache().get_many([_key(user_id) for user_id in user_ids])
+    return {key.split(':', 1)[1] for key in found}
+
+
+def is_online(user_id):
+    return _key(user_id) in _cache().get_many([_key(user_id)])
+
+
+# =============================================================================
+# DATABASE MIRROR
+# =============================================================================
+
+_pending = set()
+_pending_guard = threading.Lock()
+_flusher = None
+_flusher_guard = threading.Lock()
+
+
+def _changed(user_id):
+    interval = getattr(settings, 'PRESENCE_FLUSH_INTERVAL', 15)
+    with _pending_guard:
+        _pending.add(str(user_id))
+    if interval:
+        start_presence_flusher(interval)
+    else:
+        flush_presence()
+
+
+def flush_presence(reconcile=False):
+    """
+    Write queued transitions to UserOnlineStatus in one upsert and, with
+    `reconcile`, turn rows whose cache entry expired offline. Returns
+    {'written': n, 'expired': n}.
+    """
+    global _pending
+    with _pending_guard:
+        user_ids, _pending = _pending, set()
+
+    written = 0
+    if user_ids:
+        online = online_user_ids(user_ids)
+        # Users deleted since their transition have no row to write
+        existing = get_user_model().objects.filter(id__in=user_ids).values_list('id', flat=True)
+        rows = [UserOnlineStatus(user_id=user_id, is_online=str(user_id) in online) for user_id in existing]
+        UserOnlineStatus.objects.bulk_create(
+            rows, update_conflicts=True, unique_fields=['user'], update_fields=['is_online', 'last_seen']
+        )
+        written = len(rows)
+
+    expired = 0
+    if reconcile:
+        # Materialized first: the loop writes the rows it would be iterating
+        online_rows = list(UserOnlineStatus.objects.filter(is_online=True).values_list('user_id', flat=True))
+        for start in range(0, len(online_rows), RECONCILE_BATCH_SIZE):
+            expired += _expire_rows(online_rows[start:start + RECONCILE_BATCH_SIZE])
+    return {'written': written, 'expired': expired}
+
+
+def _expire_rows(user_ids):
+    online = online_user_ids(user_ids)
+    gone = [user_id for user_id in user_ids if str(user_id) not in online]
+    if not gone:
+        return 0
+    return UserOnlineStatus.objects.filter(user_id__in=gone, is_online=True).update(is_online=False)
+
+
+def _flush_forever(interval, stop):
+    while not stop.wait(interval):
+        try:
+            close_old_connections()
+            flush_presence(reconcile=True)
+        except Exception:
+            logger.exception("Presence flush failed")
+        finally:
+            connection.close()
+
+
+def start_presence_flusher(interval):
+    """
+    Flush every `interval` seconds on a daemon thread (once per process).
+    Returns the threading.Event that stops it.
+    """
+    global _flusher
+    with _flusher_guard:
+        if _flusher is None:
+            stop = threading.Event()
+            thread = threading.Thread(
+                target=_flush_forever, args=(interval, stop), name='presence-flusher', daemon=True,
+            )
+            thread.start()
+            _flusher = stop
+        return _flusher
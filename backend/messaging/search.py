@@ -0,0 +1,81 @@
+"""
+CareNest Pro - Message Search
+Description: Full-text index over message content, scoped to the reader's conversations.
+
+MESSAGE_TEXT_INDEX (an api.fulltext index keyed by message id: FTS5 on
+SQLite, a GIN tsvector table on PostgreSQL) is created and backfilled by
+migration 0004 and kept current by the receivers below, in the same
+transaction as the message write. Each entry carries its conversation id
+as the index scope, so search_messages() only visits messages in the
+user's own conversations rather than every match in the corpus, ranks
+them and returns a highlighted snippet per hit. On databases without
+full-text support it falls back to a substring scan over the same
+conversations, newest first.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from api.fulltext import FullTextIndex
+
+from .history import history_queryset
+from .models import ConversationParticipant, Message
+
+SEARCH_PAGE_SIZE = 20
+MAX_SEARCH_PAGE_SIZE = 100
+
+# Created by migration 0004
+MESSAGE_TEXT_INDEX = FullTextIndex(
+    'messaging_message_fts', columns=[('content', 'A')], scope_column='conversation', prefix_terms=False,
+)
+
+
+def search_messages(user, text, limit=SEARCH_PAGE_SIZE, offset=0):
+    """
+    The user's messages matching `text`, best first: a list of
+    (message, snippet) pairs and whether more matches follow. Snippets
+    wrap matched terms in api.fulltext.HIGHLIGHT_START/END; they are None
+    when the full-text index is unavailable.
+    """
+    conversation_ids = list(
+        ConversationParticipant.objects.filter(user=user).values_list('conversation_id', flat=True)
+    )
+    hits = MESSAGE_TEXT_INDEX.search(
+        text, limit=limit + 1, offset=offset, snippet_column='content', scopes=conversation_ids,
+    )
+    if hits is None:
+        messages = list(
+            history_queryset().filter(
+                conversation_id__in=conversation_ids, content__icontains=text
+            ).order_by('-id')[offset:offset + limit + 1]
+        )
+        return [(message, None) for message in messages[:limit]], len(messages) > limit
+
+    has_more = len(hits) > limit
+    hits = hits[:limit]
+    messages = history_queryset().in_bulk([hit.key for hit in hits])
+    # A hit whose message was deleted after the search simply drops out
+    return [(messages[hit.key], hit.snippet) for hit in hits if hit.key in messages], has_more
+
+
+def index_messages(messages):
+    MESSAGE_TEXT_INDEX.index_many(
+        (message.id, {'content': message.content, 'conversation': message.conversation_id})
+        for message in messages
+    )
+
+
+# =============================================================================
+# SIGNAL RECEIVERS (connected in MessagingConfig.ready)
+# =============================================================================
+
+@receiver(post_save, sender=Message)
+def message_text_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and 'content' not in update_fields):
+        return
+    index_messages([instance])
+
+
+@receiver(post_delete, sender=Message)
+def message_text_deleted(sender, instance, **kwargs):
+    MESSAGE_TEXT_INDEX.remove([instance.id])
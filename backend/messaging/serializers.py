@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import Conversation, Message, UserOnlineStatus
+from . import presence
+from .models import Conversation, ConversationParticipant, Message, UserOnlineStatus
 from django.contrib.auth import get_user_model
 from profiles.serializers import CaregiverProfileSerializer, ClientProfileSerializer
 
@@ -58,15 +59,20 @@ class ConversationSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
     
     def get_last_message(self, obj):
-        last_msg = obj.messages.last()
-        if last_msg:
-            return MessageSerializer(last_msg, context=self.context).data
+        # Denormalized pointer (see messaging.inbox)
+        if obj.last_message_id:
+            return MessageSerializer(obj.last_message, context=self.context).data
         return None
     
     def get_unread_count(self, obj):
+        # Annotated by inbox_queryset(); single conversations read the membership row
+        if hasattr(obj, 'viewer_unread_count'):
+            return obj.viewer_unread_count
         request = self.context.get('request')
         if request and hasattr(request, 'user'):
-            return obj.messages.filter(is_read=False).exclude(sender=request.user).count()
+            return ConversationParticipant.objects.filter(
+                conversation=obj, user=request.user
+            ).values_list('unread_count', flat=True).first() or 0
         return 0
     
     def get_other_user(self, obj):
@@ -80,7 +86,7 @@ class ConversationSerializer(serializers.ModelSerializer):
 class CreateMessageSerializer(serializers.Serializer):
     """Serializer for creating new messages"""
     content = serializers.CharField(max_length=2000)
-    recipient_id = serializers.IntegerField(required=False)
+    recipient_id = serializers.UUIDField(required=False)
     conversation_id = serializers.IntegerField(required=False)
     booking_id = serializers.IntegerField(required=False)
     
@@ -115,8 +121,13 @@ class CreateMessageSerializer(serializers.Serializer):
 
 class OnlineStatusSerializer(serializers.ModelSerializer):
     user_info = UserBasicSerializer(source='user', read_only=True)
+    # Live state; the row itself is only flushed periodically
+    is_online = serializers.SerializerMethodField()
     
     class Meta:
         model = UserOnlineStatus
         fields = ['user', 'user_info', 'is_online', 'last_seen']
-        read_only_fields = ['last_seen']
\ No newline at end of file
+        read_only_fields = ['last_seen']
+    
+    def get_is_online(self, obj):
+        return presence.is_online(obj.user_id)
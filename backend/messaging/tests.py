@@ -1,3 +1,125 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Max
+from django.test import TransactionTestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from profiles.models import CaregiverProfile, ClientProfile
+
+from .models import Conversation, ConversationParticipant, Message
+
+User = get_user_model()
+
+
+class InboxCounterTests(TransactionTestCase):
+    """
+    The denormalized inbox (last_message, unread_count and the cached
+    unread total) always equals what the messages themselves say.
+    TransactionTestCase, so the cached totals' on_commit updates run.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.me = User.objects.create_user(email='me@example.com', password=None, user_type='client')
+        ClientProfile.objects.create(user=self.me, first_name='Me', last_name='Client')
+        self.api = self.api_for(self.me)
+        self.others = []
+
+    def api_for(self, user):
+        api = APIClient()
+        api.force_authenticate(user)
+        return api
+
+    def add_caregiver(self):
+        n = len(self.others)
+        caregiver = User.objects.create_user(
+            email=f'caregiver-{n}@example.com', password=None, user_type='caregiver',
+        )
+        CaregiverProfile.objects.create(user=caregiver, first_name='Caregiver', last_name=str(n))
+        self.others.append(caregiver)
+        return caregiver
+
+    def send(self, sender, content, recipient=None, conversation=None):
+        data = {'content': content}
+        if conversation is not None:
+            data['conversation_id'] = conversation.id
+        else:
+            data['recipient_id'] = str(recipient.id)
+        response = self.api_for(sender).post('/api/messaging/messages/', data, format='json')
+        self.assertEqual(response.status_code, 201)
+        return Message.objects.get(pk=response.data['id'])
+
+    def unread_for(self, user, **filters):
+        return Message.objects.filter(
+            conversation__participants=user, is_read=False, **filters
+        ).exclude(sender=user).count()
+
+    def assert_counters_match_messages(self):
+        for conversation in Conversation.objects.annotate(latest_id=Max('messages__id')):
+            self.assertEqual(conversation.last_message_id, conversation.latest_id)
+        for membership in ConversationParticipant.objects.all():
+            self.assertEqual(
+                membership.unread_count,
+                self.unread_for(membership.user, conversation=membership.conversation_id),
+            )
+        for user in [self.me, *self.others]:
+            response = self.api_for(user).get('/api/messaging/unread-count/')
+            self.assertEqual(response.data['unread_count'], self.unread_for(user))
+
+    def test_send(self):
+        caregiver = self.add_caregiver()
+        first = self.send(self.me, 'Hello', recipient=caregiver)
+        self.send(caregiver, 'Hi', conversation=first.conversation)
+        self.send(caregiver, 'When works?', conversation=first.conversation)
+        self.send(self.me, 'Hello', recipient=self.add_caregiver())
+        self.assert_counters_match_messages()
+
+    def test_mark_read(self):
+        caregiver = self.add_caregiver()
+        conversation = self.send(self.me, 'Hello', recipient=caregiver).conversation
+        self.send(caregiver, 'Hi', conversation=conversation)
+        self.send(caregiver, 'When works?', conversation=conversation)
+
+        response = self.api.post(f'/api/messaging/conversations/{conversation.id}/mark-read/')
+        self.assertEqual(response.data['marked_read'], 2)
+        self.assert_counters_match_messages()
+
+        # Marking one message, then marking it again, moves the counter once
+        message = Message.objects.get(conversation=conversation, sender=self.me)
+        message.mark_as_read()
+        Message.objects.get(pk=message.pk).mark_as_read()
+        self.assert_counters_match_messages()
+
+    def test_delete(self):
+        caregiver = self.add_caregiver()
+        conversation = self.send(self.me, 'Hello', recipient=caregiver).conversation
+        read = self.send(caregiver, 'Hi', conversation=conversation)
+        self.api.post(f'/api/messaging/conversations/{conversation.id}/mark-read/')
+        unread = self.send(caregiver, 'When works?', conversation=conversation)
+        latest = self.send(caregiver, 'Tomorrow?', conversation=conversation)
+
+        # Newest (unread): the pointer falls back to the previous message
+        latest.delete()
+        self.assert_counters_match_messages()
+        Message.objects.get(pk=read.pk).delete()
+        self.assert_counters_match_messages()
+        unread.delete()
+        self.assert_counters_match_messages()
+
+    def test_inbox_query_count(self):
+        def add_conversations(count):
+            for _ in range(count):
+                caregiver = self.add_caregiver()
+                conversation = self.send(self.me, 'Hello', recipient=caregiver).conversation
+                self.send(caregiver, 'Hi', conversation=conversation)
+
+        add_conversations(2)
+        with self.assertNumQueries(2):
+            small = self.api.get('/api/messaging/conversations/')
+        add_conversations(18)
+        with self.assertNumQueries(2):
+            large = self.api.get('/api/messaging/conversations/')
+
+        self.assertEqual((len(small.data), len(large.data)), (2, 20))
+        self.assertTrue(all(row['unread_count'] == 1 for row in large.data))
+        self.assertTrue(all(row['last_message']['content'] == 'Hi' for row in large.data))
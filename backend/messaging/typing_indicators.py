@@ -0,0 +1,93 @@
+"""
+CareNest Pro - Typing Indicators
+Description: Debounces and coalesces a socket's typing events per conversation.
+
+Clients report typing on every keystroke; receivers only need to know
+when someone starts or stops. TypingCoalescer turns the keystroke stream
+of one socket into state changes:
+
+- repeats of the current state are dropped, except that continued typing
+  re-announces itself every TYPING_REFRESH seconds so receivers can time
+  out a typist whose stop was lost;
+- changes are rate-capped to one per TYPING_MIN_INTERVAL, and a change
+  arriving sooner is held back and replaced by any later one, so a
+  flapping client publishes only its latest state;
+- a typist silent for TYPING_EXPIRY seconds is published as stopped.
+
+The coalescer is plain state; the consumer publishes what input() and
+due() return and calls due() again at the returned deadline.
+"""
+
+import time
+from collections import namedtuple
+
+TYPING_MIN_INTERVAL = 0.5
+TYPING_REFRESH = 3.0
+TYPING_EXPIRY = 6.0
+
+# `publish` is the state to broadcast now (or None); `deadline` is when due() must run next (or None)
+TypingDecision = namedtuple('TypingDecision', ['publish', 'deadline'])
+
+
+class _Conversation:
+    __slots__ = ('typing', 'last_input', 'published', 'published_at')
+
+    def __init__(self):
+        self.typing = False
+        self.last_input = 0.0
+        self.published = False
+        self.published_at = float('-inf')
+
+
+class TypingCoalescer:
+
+    def __init__(self, min_interval=TYPING_MIN_INTERVAL, refresh=TYPING_REFRESH, expiry=TYPING_EXPIRY,
+                 clock=time.monotonic):
+        self.min_interval = min_interval
+        self.refresh = refresh
+        self.expiry = expiry
+        self.clock = clock
+        self._conversations = {}
+
+    def input(self, conversation_id, is_typing):
+        """A typing event from the client."""
+        now = self.clock()
+        state = self._conversations.setdefault(conversation_id, _Conversation())
+        state.typing = bool(is_typing)
+        state.last_input = now
+        return self._evaluate(conversation_id, state, now, keystroke=True)
+
+    def due(self, conversation_id):
+        """Re-evaluate at (or after) a deadline returned earlier."""
+        state = self._conversations.get(conversation_id)
+        if state is None:
+            return TypingDecision(None, None)
+        return self._evaluate(conversation_id, state, self.clock(), keystroke=False)
+
+    def active(self):
+        """Conversations currently published as typing."""
+        return [conversation_id for conversation_id, state in self._conversations.items() if state.published]
+
+    def _evaluate(self, conversation_id, state, now, keystroke):
+        wanted = state.typing and now < state.last_input + self.expiry
+        publish = None
+        deadline = None
+
+        if wanted != state.published:
+            if now - state.published_at >= self.min_interval:
+                publish = wanted
+            else:
+                deadline = state.published_at + self.min_interval
+        elif wanted and keystroke and now - state.published_at >= self.refresh:
+            publish = True
+
+        if publish is not None:
+            state.published = publish
+            state.published_at = now
+        if state.published and state.typing:
+            expires = state.last_input + self.expiry
+            deadline = expires if deadline is None else min(deadline, expires)
+        if deadline is None and not state.published:
+            # Settled as not typing (stopped or expired): nothing left to track
+            del self._conversations[conversation_id]
+        return TypingDecision(publish, deadline)
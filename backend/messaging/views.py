@@ -8,7 +8,13 @@ from django.contrib.auth import get_user_model
 
 from notifications.utils import NotificationService
 
+from . import presence
+from .history import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, MAX_SYNC_SIZE, history_queryset, message_window, sync_since
+)
+from .inbox import UNREAD_MESSAGES, inbox_queryset, mark_conversation_read as mark_read
 from .models import Conversation, Message, UserOnlineStatus
+from .search import MAX_SEARCH_PAGE_SIZE, SEARCH_PAGE_SIZE, search_messages
 from .serializers import (
     ConversationSerializer, MessageSerializer,
     CreateMessageSerializer, OnlineStatusSerializer
@@ -23,8 +29,7 @@ class ConversationViewSet(viewsets.ModelViewSet):
     pagination_class = None
     
     def get_queryset(self):
-        user = self.request.user
-        return Conversation.objects.filter(participants=user, is_active=True)
+        return inbox_queryset(self.request.user)
     
     def list(self, request, *args, **kwargs):
         """Override list to properly handle pagination"""
@@ -40,42 +45,127 @@ class ConversationViewSet(viewsets.ModelViewSet):
     
     @action(detail=True, methods=['get'])
     def messages(self, request, pk=None):
-        """Get all messages in a conversation"""
+        """
+        A window of the conversation's messages, oldest first.
+
+        Without cursors this is the latest page. ?before=<message id> pages
+        back through history, ?after=<message id> fetches what arrived
+        since; `limit` caps the page. `has_more` refers to the direction
+        of travel, and next_before/next_after are the cursors to continue.
+        """
         conversation = self.get_object()
-        messages = conversation.messages.all().order_by('created_at')
-        
-        # Mark messages as read
-        if request.user != conversation.messages.last().sender:
-            conversation.messages.filter(is_read=False).exclude(sender=request.user).update(
-                is_read=True, read_at=timezone.now()
-            )
+        try:
+            before = self.get_message_id_param(request, 'before')
+            after = self.get_message_id_param(request, 'after')
+            limit = self.get_limit_param(request, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        messages, has_more = message_window(
+            history_queryset().filter(conversation=conversation), before, after, limit
+        )
         
-        page = self.paginate_queryset(messages)
-        if page is not None:
-            serializer = MessageSerializer(page, many=True, context={'request': request})
-            return self.get_paginated_response(serializer.data)
+        # Reading the tail of the thread marks it read; paging back does not
+        if before is None:
+            mark_read(conversation.id, request.user)
         
         serializer = MessageSerializer(messages, many=True, context={'request': request})
-        return Response(serializer.data)
+        return Response({
+            "results": serializer.data,
+            "has_more": has_more,
+            "next_before": messages[0].id if messages else before,
+            "next_after": messages[-1].id if messages else after,
+        })
+    
+    @action(detail=False, methods=['get'])
+    def sync(self, request):
+        """
+        Delta sync: ?since=<message id> returns the messages newer than it
+        in all of the user's conversations, oldest first, with the user's
+        unread state for each conversation they touch. Call again with
+        the returned `since` while `has_more` is true.
+        """
+        try:
+            since = self.get_message_id_param(request, 'since')
+            limit = self.get_limit_param(request, MAX_SYNC_SIZE, MAX_SYNC_SIZE)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if since is None:
+            return Response({"error": "since is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        messages, has_more, states = sync_since(request.user, since, limit)
+        serializer = MessageSerializer(messages, many=True, context={'request': request})
+        return Response({
+            "results": serializer.data,
+            "has_more": has_more,
+            "since": messages[-1].id if messages else since,
+            "conversations": [
+                {
+                    "id": state['conversation_id'],
+                    "unread_count": state['unread_count'],
+                    "last_read_at": state['last_read_at'],
+                }
+                for state in states
+            ],
+        })
+    
+    @staticmethod
+    def get_message_id_param(request, name):
+        value = request.GET.get(name)
+        if value in (None, ''):
+            return None
+        try:
+            message_id = int(value)
+        except (ValueError, TypeError):
+            raise ValueError(f"Invalid {name} parameter")
+        if message_id < 0:
+            raise ValueError(f"Invalid {name} parameter")
+        return message_id
+    
+    @staticmethod
+    def get_limit_param(request, default, maximum):
+        try:
+            limit = int(request.GET.get('limit', default))
+        except (ValueError, TypeError):
+            raise ValueError("Invalid limit parameter")
+        return max(1, min(limit, maximum))
     
     @action(detail=True, methods=['post'])
     def archive(self, request, pk=None):
         """Archive a conversation"""
         conversation = self.get_object()
         conversation.is_active = False
-        conversation.save()
+        conversation.save(update_fields=['is_active', 'updated_at'])
         return Response({"status": "archived"})
     
     @action(detail=False, methods=['get'])
     def search(self, request):
-        """Search messages by content"""
-        query = request.GET.get('q', '')
-        messages = Message.objects.filter(
-            conversation__participants=request.user,
-            content__icontains=query
-        )
-        serializer = MessageSerializer(messages, many=True)
-        return Response(serializer.data)
+        """
+        Ranked full-text search over the user's conversations.
+
+        ?q=<terms> (every word must match, stemmed), paged with
+        `limit` and `offset`. Each result carries a `snippet` of the
+        content with the matched terms highlighted.
+        """
+        query = request.GET.get('q', '').strip()
+        if not query:
+            return Response({"error": "q is required"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = self.get_limit_param(request, SEARCH_PAGE_SIZE, MAX_SEARCH_PAGE_SIZE)
+            offset = max(0, int(request.GET.get('offset', 0)))
+        except (ValueError, TypeError):
+            return Response({"error": "Invalid limit or offset parameter"}, status=status.HTTP_400_BAD_REQUEST)
+
+        hits, has_more = search_messages(request.user, query, limit, offset)
+        serializer = MessageSerializer([message for message, _ in hits], many=True, context={'request': request})
+        results = serializer.data
+        for result, (_, snippet) in zip(results, hits):
+            result['snippet'] = snippet
+        return Response({
+            "results": results,
+            "has_more": has_more,
+            "next_offset": offset + limit if has_more else None,
+        })
 
 class MessageViewSet(viewsets.ModelViewSet):
     """ViewSet for messages"""
@@ -148,10 +238,11 @@ class MessageViewSet(viewsets.ModelViewSet):
                 booking_id=data.get('booking_id')
             )
             
-            # Update conversation timestamp
-            conversation.save()
+            # Conversation timestamp, last message and unread counters are
+            # updated by messaging.inbox on save
             
-            # Send notification to recipient
+            # Queue a notification for the recipient (delivered in batches
+            # by notifications.outbox)
             notification_service = NotificationService()
             
             # Get sender name - FIXED: Use get_username() or email
@@ -162,7 +253,8 @@ class MessageViewSet(viewsets.ModelViewSet):
                 context={
                     'sender_name': sender_name,  # FIXED: Use get_username() not get_full_name()
                     'message_preview': data['content'][:50],  # First 50 chars
-                    'conversation_id': conversation.id
+                    'conversation_id': conversation.id,
+                    'sender_id': request.user.id
                 }
             )
             
@@ -219,14 +311,7 @@ def start_conversation(request):
 @permission_classes([permissions.IsAuthenticated])
 def unread_count(request):
     """Get total unread messages count for current user"""
-    count = Message.objects.filter(
-        conversation__participants=request.user,
-        is_read=False
-    ).exclude(
-        sender=request.user
-    ).count()
-    
-    return Response({"unread_count": count})
+    return Response({"unread_count": UNREAD_MESSAGES.get(request.user.pk)})
 
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
@@ -238,14 +323,7 @@ def mark_conversation_read(request, conversation_id):
         participants=request.user
     )
     
-    updated = conversation.messages.filter(
-        is_read=False
-    ).exclude(
-        sender=request.user
-    ).update(
-        is_read=True,
-        read_at=timezone.now()
-    )
+    updated = mark_read(conversation.id, request.user)
     
     return Response({"marked_read": updated})
 
@@ -259,24 +337,12 @@ class OnlineStatusViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['post'])
     def set_online(self, request):
-        """Set user as online"""
-        status_obj, created = UserOnlineStatus.objects.get_or_create(
-            user=request.user,
-            defaults={'is_online': True}
-        )
-        status_obj.is_online = True
-        status_obj.save()
-        
+        """Set user as online (a heartbeat: repeat within PRESENCE_TTL to stay online)"""
+        presence.heartbeat(request.user.id, connected=False)
         return Response({"status": "online"})
     
     @action(detail=False, methods=['post'])
     def set_offline(self, request):
-        """Set user as offline"""
-        status_obj, created = UserOnlineStatus.objects.get_or_create(
-            user=request.user,
-            defaults={'is_online': False}
-        )
-        status_obj.is_online = False
-        status_obj.save()
-        
+        """Set user as offline (open chat sockets keep the user online)"""
+        presence.go_offline(request.user.id)
         return Response({"status": "offline"})
\ No newline at end of file
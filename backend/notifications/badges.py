@@ -0,0 +1,56 @@
+"""
+CareNest Pro - Badge Counters
+Description: Cached unread counts for notifications and messages, read together for the app badges.
+
+UNREAD_NOTIFICATIONS follows every change to a user's unread
+notifications: +1 when one is saved (post_save), +n after the bulk
+inserts of the outbox and booking expiry (notifications_created), and
+-1/-n when notifications are marked read. The messages count is
+messaging.inbox.UNREAD_MESSAGES. badges() reads both in one cache round
+trip, so polling the badges costs no queries while the counters are
+cached; a missing or expired entry is recounted from the database
+(api.counters).
+"""
+
+from collections import Counter
+
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from api.counters import CachedCounter, read_counters
+from messaging.inbox import UNREAD_MESSAGES
+
+from .models import Notification
+
+
+def unread_notifications(user_id):
+    return Notification.objects.filter(user_id=user_id, is_read=False).count()
+
+
+UNREAD_NOTIFICATIONS = CachedCounter('unread_notifications', unread_notifications)
+
+
+def notifications_created(notifications):
+    """Count notifications written with bulk_create (which sends no signals)."""
+    UNREAD_NOTIFICATIONS.add(Counter(
+        notification.user_id for notification in notifications if not notification.is_read
+    ))
+
+
+def badges(user):
+    """{'notifications': unread notifications, 'messages': unread messages} for the user."""
+    counts = read_counters([UNREAD_NOTIFICATIONS, UNREAD_MESSAGES], user.pk)
+    return {
+        'notifications': counts[UNREAD_NOTIFICATIONS.name],
+        'messages': counts[UNREAD_MESSAGES.name],
+    }
+
+
+# =============================================================================
+# SIGNAL RECEIVERS (connected in NotificationsConfig.ready)
+# =============================================================================
+
+@receiver(post_save, sender=Notification)
+def notification_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and not instance.is_read:
+        UNREAD_NOTIFICATIONS.add({instance.user_id: 1})
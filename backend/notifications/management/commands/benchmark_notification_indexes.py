@@ -0,0 +1,179 @@
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, models
+from django.utils import timezone
+
+from api.benchmarks import format_summary, scratch_database, summarize, timed
+from notifications.models import Notification
+from notifications.retention import DEFAULT_BATCH_SIZE, prune_notifications
+from profiles.models import ProfileNotification
+
+TYPES = [choice for choice, _ in Notification.NOTIFICATION_TYPES]
+PAGE_SIZE = 20
+RETENTION_DAYS = 30
+
+
+@contextmanager
+def _backdated(*models_):
+    """Let bulk_create keep the created_at values it is given."""
+    fields = [model._meta.get_field('created_at') for model in models_]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def _seed(users, rows, unread_fraction, days, rng):
+    """`rows` notifications and as many profile notifications spread over `users` and `days`."""
+    User = get_user_model()
+    user_ids = [user.id for user in User.objects.bulk_create(
+        User(email=f'notified-{n}@example.com', username=f'notified-{n}', user_type='client')
+        for n in range(users)
+    )]
+    now = timezone.now()
+    with _backdated(Notification, ProfileNotification):
+        for model in (Notification, ProfileNotification):
+            for start in range(0, rows, 10000):
+                batch = []
+                for _ in range(min(10000, rows - start)):
+                    age = rng.random() * days
+                    batch.append(model(
+                        user_id=rng.choice(user_ids),
+                        notification_type=rng.choice(TYPES),
+                        title='Benchmark notification',
+                        message='Your booking request was accepted.',
+                        # Recent notifications are the unread ones
+                        is_read=age > days * unread_fraction,
+                        created_at=now - timedelta(days=age),
+                    ))
+                model.objects.bulk_create(batch)
+    return user_ids
+
+
+# (name, index its plan must use, query for one user, how the endpoint consumes it)
+QUERIES = [
+    ('feed page', 'notification_feed_idx',
+     lambda user_id: Notification.objects.filter(user_id=user_id)[:PAGE_SIZE], list),
+    ('feed by type', 'notification_type_feed_idx',
+     lambda user_id: Notification.objects.filter(user_id=user_id, notification_type='booking')[:PAGE_SIZE], list),
+    ('unread page', 'notification_unread_idx',
+     lambda user_id: Notification.objects.filter(user_id=user_id, is_read=False)[:PAGE_SIZE], list),
+    # The badge counter's recount (notifications.badges.unread_notifications)
+    ('unread count', 'notification_unread_idx',
+     lambda user_id: Notification.objects.filter(user_id=user_id, is_read=False), lambda qs: qs.count()),
+    ('profile feed page', 'profile_notif_feed_idx',
+     lambda user_id: ProfileNotification.objects.filter(user_id=user_id)[:PAGE_SIZE], list),
+    # One retention batch's selection (notifications.retention), not per user
+    ('prune batch', 'notification_read_age_idx',
+     lambda user_id: Notification.objects.filter(
+         is_read=True, created_at__lt=timezone.now() - timedelta(days=RETENTION_DAYS)
+     ).order_by('created_at').values_list('id', flat=True)[:DEFAULT_BATCH_SIZE], list),
+]
+
+
+def _measure(user_ids, queries, rng):
+    """Latency summary per query, each over `queries` random users."""
+    results = {}
+    for name, _, query, consume in QUERIES:
+        results[name] = summarize([
+            timed(consume, query(rng.choice(user_ids)))[1] for _ in range(queries)
+        ])
+    return results
+
+
+@contextmanager
+def _without_new_indexes():
+    """Swap the feed/unread/retention indexes for the plain FK index they replaced."""
+    plain = {model: models.Index(fields=['user'], name=f'bench_{model._meta.model_name}_user'[:30])
+             for model in (Notification, ProfileNotification)}
+    with connection.schema_editor() as editor:
+        for model, index in plain.items():
+            for existing in model._meta.indexes:
+                editor.remove_index(model, existing)
+            editor.add_index(model, index)
+    try:
+        yield
+    finally:
+        with connection.schema_editor() as editor:
+            for model, index in plain.items():
+                editor.remove_index(model, index)
+                for existing in model._meta.indexes:
+                    editor.add_index(model, existing)
+
+
+def _analyze():
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed notifications and profile notifications on a scratch database and time the feed, "
+        "unread and unread-count queries with the composite/partial indexes and with only the "
+        "foreign key index; fails if a query does not use its index or p99 exceeds the bound."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200000,
+                            help="Rows per table (the production target is 50M; scale to the machine).")
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--unread-fraction', type=float, default=0.1,
+                            help="Share of each user's history (the most recent) that is unread.")
+        parser.add_argument('--days', type=int, default=365, help="Age of the oldest notification.")
+        parser.add_argument('--queries', type=int, default=300, help="Timed queries per measurement.")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--max-p99-ms', type=float, default=5.0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        with scratch_database():
+            user_ids = _seed(options['users'], options['rows'], options['unread_fraction'], options['days'], rng)
+            _analyze()
+            self.stdout.write(f"{options['rows']} rows per table, {options['users']} users")
+
+            missing = []
+            for name, index, query, _ in QUERIES:
+                plan = query(user_ids[0]).explain()
+                if index not in plan:
+                    missing.append(f"{name} ({plan})")
+
+            indexed = _measure(user_ids, options['queries'], rng)
+            with _without_new_indexes():
+                _analyze()
+                plain = _measure(user_ids, options['queries'], rng)
+            _analyze()
+
+            read_before = Notification.objects.filter(is_read=True).count()
+            metrics = prune_notifications(days=RETENTION_DAYS)
+            left_old = Notification.objects.filter(
+                is_read=True, created_at__lt=timezone.now() - timedelta(days=RETENTION_DAYS)
+            ).count()
+            unread_left = Notification.objects.filter(is_read=False).count()
+
+        slow = []
+        for name, *_ in QUERIES:
+            self.stdout.write(f"{name:>18} indexed: {format_summary(indexed[name])}")
+            self.stdout.write(f"{'':>18}  FK only: {format_summary(plain[name])}  "
+                              f"({plain[name]['mean'] / indexed[name]['mean']:.1f}x)")
+            if indexed[name]['p99'] > options['max_p99_ms']:
+                slow.append(name)
+        self.stdout.write(
+            f"Pruned {metrics['notifications']} of {read_before} read notifications and "
+            f"{metrics['profile_notifications']} profile notifications in {metrics['batches']} batches, "
+            f"{metrics['seconds']:.3f}s ({metrics['per_second']:.0f}/s); {unread_left} unread kept"
+        )
+
+        if missing:
+            raise CommandError(f"Queries not using their index: {'; '.join(missing)}")
+        if left_old:
+            raise CommandError(f"{left_old} read notifications past retention were left")
+        if slow:
+            raise CommandError(f"p99 above {options['max_p99_ms']}ms for: {', '.join(slow)}")
+        self.stdout.write(self.style.SUCCESS("Every query uses its index; latency within bound"))
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications.outbox import DEFAULT_BATCH_SIZE, drain_outbox
+
+
+class Command(BaseCommand):
+    help = "Deliver queued notifications: coalesce, store, push them to connected sockets and email them."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--max-batches', type=int, default=None, help="Stop after this many batches.")
+        parser.add_argument('--loop', type=float, default=0, metavar='SECONDS',
+                            help="Keep draining every SECONDS instead of exiting after one pass.")
+
+    def handle(self, *args, **options):
+        while True:
+            metrics = drain_outbox(batch_size=options['batch_size'], max_batches=options['max_batches'])
+            self.stdout.write(self.style.SUCCESS(
+                f"Delivered {metrics['entries']} queued notifications as {metrics['notifications']} "
+                f"in {metrics['batches']} batches, {metrics['pushed']} pushes, {metrics['emailed']} emails, "
+                f"{metrics['seconds']:.3f}s ({metrics['per_second']:.0f}/s)"
+            ))
+            if not options['loop']:
+                break
+            time.sleep(options['loop'])
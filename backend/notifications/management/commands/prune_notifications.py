@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications.retention import DEFAULT_BATCH_SIZE, prune_notifications
+
+
+class Command(BaseCommand):
+    help = "Delete read notifications and profile notifications older than the retention period."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help="Retention in days (default: NOTIFICATION_RETENTION_DAYS).")
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--max-batches', type=int, default=None, help="Stop after this many batches.")
+        parser.add_argument('--loop', type=int, default=0, metavar='SECONDS',
+                            help="Keep pruning every SECONDS instead of exiting after one pass.")
+
+    def handle(self, *args, **options):
+        while True:
+            metrics = prune_notifications(
+                days=options['days'], batch_size=options['batch_size'], max_batches=options['max_batches']
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f"Pruned {metrics['notifications']} notifications and {metrics['profile_notifications']} "
+                f"profile notifications in {metrics['batches']} batches, {metrics['seconds']:.3f}s "
+                f"({metrics['per_second']:.0f}/s)"
+            ))
+            if not options['loop']:
+                break
+            time.sleep(options['loop'])
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.9 on 2026-10-17 09:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_delete_notificationtemplate_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('notification_type', models.CharField(choices=[('message', 'New Message'), ('booking', 'Booking Update'), ('review', 'New Review'), ('system', 'System Notification')], max_length=20)),
+                ('title', models.CharField(max_length=200)),
+                ('message', models.TextField()),
+                ('related_object_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('related_object_type', models.CharField(blank=True, max_length=50, null=True)),
+                ('coalesce_key', models.CharField(blank=True, default='', max_length=100)),
+                ('actor', models.CharField(blank=True, default='', max_length=150)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -15,7 +15,8 @@ class Notification(models.Model):
         ('system', 'System Notification'),
     )
     
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
+    # Indexed by the feed indexes below, which lead with user
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications', db_index=False)
     notification_type = models.CharField(max_length=20, choices=NOTIFICATION_TYPES)
     title = models.CharField(max_length=200)
     message = models.TextField()
@@ -29,6 +30,19 @@ class Notification(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # A user's feed, newest first (and filtered by type)
+            models.Index(fields=['user', '-created_at'], name='notification_feed_idx'),
+            models.Index(fields=['user', 'notification_type', '-created_at'], name='notification_type_feed_idx'),
+            # Unread feed and unread counts read only the unread rows
+            models.Index(
+                fields=['user', '-created_at'],
+                condition=models.Q(is_read=False),
+                name='notification_unread_idx',
+            ),
+            # Retention prunes read notifications oldest first
+            models.Index(fields=['created_at'], condition=models.Q(is_read=True), name='notification_read_age_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.email}: {self.title}"
@@ -37,7 +51,13 @@ class Notification(models.Model):
         if not self.is_read:
             self.is_read = True
             self.read_at = timezone.now()
-            self.save()
+            # Guarded so a concurrent mark-read can't decrement twice
+            if Notification.objects.filter(pk=self.pk, is_read=False).update(
+                is_read=True, read_at=self.read_at
+            ):
+                # Imported here: badges imports this module
+                from .badges import UNREAD_NOTIFICATIONS
+                UNREAD_NOTIFICATIONS.add({self.user_id: -1})
 
 
 class NotificationPreference(models.Model):
@@ -48,4 +68,25 @@ class NotificationPreference(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
-        return f"Preferences for {self.user.email}"
\ No newline at end of file
+        return f"Preferences for {self.user.email}"
+
+class NotificationOutbox(models.Model):
+    """
+    A notification waiting for delivery. Requests write these cheaply;
+    notifications.outbox drains them into Notification rows in batches
+    and deletes them.
+    """
+    # No index on user: the outbox stays small and is read in id order
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+', db_index=False)
+    notification_type = models.CharField(max_length=20, choices=Notification.NOTIFICATION_TYPES)
+    title = models.CharField(max_length=200)
+    message = models.TextField()
+    related_object_id = models.PositiveIntegerField(blank=True, null=True)
+    related_object_type = models.CharField(max_length=50, blank=True, null=True)
+    # Entries for the same user and key drained together become one notification
+    coalesce_key = models.CharField(max_length=100, blank=True, default='')
+    actor = models.CharField(max_length=150, blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"Outbox {self.id} for user {self.user_id}: {self.title}"
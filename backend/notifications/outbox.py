@@ -0,0 +1,260 @@
+"""
+CareNest Pro - Notification Outbox
+Description: Queues notifications in the request and delivers them in batches.
+
+enqueue() writes one narrow NotificationOutbox row in the caller's
+transaction (so a rolled-back request notifies nobody) and nothing else.
+drain_outbox() delivers in bounded batches, each its own short
+transaction: lock up to `batch_size` entries (skipping rows another
+drainer holds), merge entries for the same user and coalesce key into one
+notification ("3 new messages from Ann"), write them with one bulk INSERT
+and delete the entries. After each batch commits, one query reads every
+recipient's address and NotificationPreference: recipients who are online
+and have push notifications enabled get one socket frame with their new
+notifications, and recipients with email notifications enabled get one
+email (users without a stored preference get the model defaults).
+
+Who drains depends on NOTIFICATION_OUTBOX_WORKER:
+- 'thread' (default): a daemon thread started on first enqueue drains
+  NOTIFICATION_OUTBOX_LINGER seconds after each enqueue, so bursts
+  coalesce, and every POLL_INTERVAL seconds for entries other processes
+  left behind;
+- 'inline': drain right after the enqueuing transaction commits, in the
+  same thread (tests and scripts, no broker);
+- 'external': only the drain_notification_outbox Celery task or the
+  drain_notification_outbox management command.
+"""
+
+import logging
+import threading
+import time
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMessage, get_connection
+from django.db import close_old_connections, connection, transaction
+
+from api.codec import dumps
+
+from .badges import notifications_created
+from .models import Notification, NotificationOutbox
+from .serializers import NotificationSerializer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+POLL_INTERVAL = 30
+
+# Title of a coalesced notification, by type
+COALESCED_TITLES = {
+    'message': "{count} new messages from {actor}",
+}
+DEFAULT_COALESCED_TITLE = "{count} new notifications"
+
+
+def outbox_worker():
+    return getattr(settings, 'NOTIFICATION_OUTBOX_WORKER', 'thread')
+
+
+def enqueue(user, notification_type, title, message, related_object_type=None,
+            related_object_id=None, coalesce_key='', actor=''):
+    """Queue a notification for `user` (a User or user id); returns the outbox entry."""
+    entry = NotificationOutbox.objects.create(
+        user_id=getattr(user, 'pk', user),
+        notification_type=notification_type,
+        title=title,
+        message=message,
+        related_object_type=related_object_type,
+        related_object_id=related_object_id,
+        coalesce_key=coalesce_key,
+        actor=actor,
+    )
+    transaction.on_commit(_enqueued)
+    return entry
+
+
+def _enqueued():
+    worker = outbox_worker()
+    if worker == 'inline':
+        drain_outbox()
+    elif worker == 'thread':
+        start_outbox_worker(getattr(settings, 'NOTIFICATION_OUTBOX_LINGER', 1.0))
+        _wake.set()
+
+
+# =============================================================================
+# DRAINING
+# =============================================================================
+
+def _coalesce(entries):
+    """Notifications for a batch of entries (in id order), merging same user and key."""
+    groups = {}
+    for entry in entries:
+        key = (entry.user_id, entry.coalesce_key) if entry.coalesce_key else ('entry', entry.id)
+        groups.setdefault(key, []).append(entry)
+
+    notifications = []
+    for group in groups.values():
+        latest = group[-1]
+        title = latest.title
+        if len(group) > 1:
+            template = COALESCED_TITLES.get(latest.notification_type, DEFAULT_COALESCED_TITLE)
+            title = template.format(count=len(group), actor=latest.actor)
+        notifications.append(Notification(
+            user_id=latest.user_id,
+            notification_type=latest.notification_type,
+            title=title[:200],
+            message=latest.message,
+            related_object_type=latest.related_object_type,
+            related_object_id=latest.related_object_id,
+        ))
+    return notifications
+
+
+def _recipients(user_ids):
+    """
+    {user_id: (email address, email enabled, push enabled)} from one query.
+    A user without a NotificationPreference row joins NULLs, which count
+    as enabled like the model defaults.
+    """
+    rows = get_user_model().objects.filter(pk__in=user_ids).values_list(
+        'pk', 'email',
+        'notification_preferences__email_notifications', 'notification_preferences__push_notifications',
+    )
+    return {pk: (address, email is not False, push is not False) for pk, address, email, push in rows}
+
+
+def _push(by_user, recipients):
+    """One frame per online recipient with push enabled; returns the number sent."""
+    # Imported here: messaging depends on notifications, not the other way round
+    from messaging.presence import online_user_ids
+
+    online = online_user_ids(by_user)
+    if not online:
+        return 0
+
+    layer = get_channel_layer()
+    sent = 0
+    for user_id, items in by_user.items():
+        _, _, enabled = recipients.get(user_id, ('', False, False))
+        if str(user_id) not in online or not enabled:
+            continue
+        text = dumps({'action': 'notifications', 'notifications': NotificationSerializer(items, many=True).data})
+        async_to_sync(layer.group_send)(f"user_{user_id}", {'type': 'new_notifications', 'text': text})
+        sent += 1
+    return sent
+
+
+def _email(by_user, recipients):
+    """One email per recipient with email enabled, over one connection; returns the number sent."""
+    messages = []
+    for user_id, items in by_user.items():
+        address, enabled, _ = recipients.get(user_id, ('', False, False))
+        if not enabled or not address:
+            continue
+        subject = items[0].title if len(items) == 1 else DEFAULT_COALESCED_TITLE.format(count=len(items))
+        body = "\n\n".join(f"{item.title}\n{item.message}" for item in items)
+        messages.append(EmailMessage(subject, body, to=[address]))
+    if not messages:
+        return 0
+    return get_connection().send_messages(messages) or 0
+
+
+def _deliver(notifications, metrics):
+    """Push and email a committed batch; a failing channel does not stop the other."""
+    by_user = {}
+    for notification in notifications:
+        by_user.setdefault(notification.user_id, []).append(notification)
+    try:
+        recipients = _recipients(by_user)
+    except Exception:
+        logger.exception("Looking up preferences for %d recipients failed", len(by_user))
+        return
+
+    for key, channel in (('pushed', _push), ('emailed', _email)):
+        try:
+            metrics[key] += channel(by_user, recipients)
+        except Exception:
+            # The notifications are stored; clients catch up from the API
+            logger.exception("Delivering %d notifications (%s) failed", len(notifications), key)
+
+
+def drain_outbox(batch_size=DEFAULT_BATCH_SIZE, max_batches=None):
+    """
+    Deliver queued notifications. Returns throughput metrics: entries,
+    notifications, pushed, emailed, batches, seconds, per_second (entries).
+    """
+    metrics = {'entries': 0, 'notifications': 0, 'pushed': 0, 'emailed': 0, 'batches': 0}
+    started = time.perf_counter()
+
+    while max_batches is None or metrics['batches'] < max_batches:
+        with transaction.atomic():
+            entries = list(
+                NotificationOutbox.objects.select_for_update(skip_locked=True).order_by('id')[:batch_size]
+            )
+            if not entries:
+                break
+            notifications = Notification.objects.bulk_create(_coalesce(entries), batch_size=1000)
+            notifications_created(notifications)
+            NotificationOutbox.objects.filter(id__in=[entry.id for entry in entries]).delete()
+
+        metrics['batches'] += 1
+        metrics['entries'] += len(entries)
+        metrics['notifications'] += len(notifications)
+        _deliver(notifications, metrics)
+        if len(entries) < batch_size:
+            break
+
+    metrics['seconds'] = time.perf_counter() - started
+    metrics['per_second'] = metrics['entries'] / metrics['seconds'] if metrics['seconds'] else 0
+    if metrics['entries']:
+        logger.info(
+            "Delivered %(entries)d queued notifications as %(notifications)d in %(batches)d batches, "
+            "%(pushed)d pushes, %(emailed)d emails (%(seconds).3fs, %(per_second).0f/s)", metrics
+        )
+    return metrics
+
+
+# =============================================================================
+# IN-PROCESS WORKER
+# =============================================================================
+
+_wake = threading.Event()
+_worker = None
+_worker_guard = threading.Lock()
+
+
+def _work_forever(linger, stop):
+    while not stop.is_set():
+        if _wake.wait(POLL_INTERVAL):
+            # Let the rest of a burst arrive so it coalesces
+            stop.wait(linger)
+        if stop.is_set():
+            break
+        _wake.clear()
+        try:
+            close_old_connections()
+            drain_outbox()
+        except Exception:
+            logger.exception("Notification outbox drain failed")
+        finally:
+            connection.close()
+
+
+def start_outbox_worker(linger):
+    """
+    Drain on a daemon thread (once per process), `linger` seconds after
+    each enqueue. Returns the threading.Event that stops it.
+    """
+    global _worker
+    with _worker_guard:
+        if _worker is None:
+            stop = threading.Event()
+            thread = threading.Thread(
+                target=_work_forever, args=(linger, stop), name='notification-outbox', daemon=True,
+            )
+            thread.start()
+            _worker = stop
+        return _worker
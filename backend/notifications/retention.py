@@ -0,0 +1,80 @@
+"""
+CareNest Pro - Notification Retention
+Description: Deletes read notifications older than the retention period in bounded batches.
+
+prune_notifications() trims Notification and profiles.ProfileNotification
+oldest first, each batch its own short transaction: pick up to
+`batch_size` read rows created before the cutoff (a range scan of the
+partial read-by-age index, which only holds read rows) and delete them
+by id. Unread notifications are never pruned, so the cached unread
+badges (notifications.badges) stay correct without invalidation.
+
+It runs from the prune_notifications management command (cron, or
+--loop) or the prune_notifications Celery task (CELERY_BEAT_SCHEDULE).
+"""
+
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from profiles.models import ProfileNotification
+
+from .models import Notification
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+
+# Metrics key for each pruned model
+PRUNED_MODELS = {
+    'notifications': Notification,
+    'profile_notifications': ProfileNotification,
+}
+
+
+def retention_days():
+    return getattr(settings, 'NOTIFICATION_RETENTION_DAYS', 90)
+
+
+def prune_notifications(days=None, batch_size=DEFAULT_BATCH_SIZE, max_batches=None):
+    """
+    Delete read notifications older than `days` (NOTIFICATION_RETENTION_DAYS
+    by default). Returns metrics: deleted rows per model, batches, seconds,
+    per_second.
+    """
+    cutoff = timezone.now() - timedelta(days=retention_days() if days is None else days)
+    metrics = {'batches': 0, 'deleted': 0}
+    started = time.perf_counter()
+
+    for key, model in PRUNED_MODELS.items():
+        metrics[key] = 0
+        while max_batches is None or metrics['batches'] < max_batches:
+            with transaction.atomic():
+                ids = list(
+                    model.objects.filter(is_read=True, created_at__lt=cutoff)
+                    .order_by('created_at').values_list('id', flat=True)[:batch_size]
+                )
+                if not ids:
+                    break
+                # Nothing references notifications and no delete signals are
+                # connected, so this is one DELETE without a collector pass
+                model.objects.filter(id__in=ids).delete()
+
+            metrics['batches'] += 1
+            metrics[key] += len(ids)
+            if len(ids) < batch_size:
+                break
+        metrics['deleted'] += metrics[key]
+
+    metrics['seconds'] = time.perf_counter() - started
+    metrics['per_second'] = metrics['deleted'] / metrics['seconds'] if metrics['seconds'] else 0
+    if metrics['deleted']:
+        logger.info(
+            "Pruned %(notifications)d notifications and %(profile_notifications)d profile notifications "
+            "in %(batches)d batches (%(seconds).3fs, %(per_second).0f/s)", metrics
+        )
+    return metrics
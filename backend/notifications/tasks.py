@@ -0,0 +1,17 @@
+# notifications/tasks.py
+from celery import shared_task
+
+from . import retention
+from .outbox import drain_outbox
+
+
+@shared_task
+def drain_notification_outbox():
+    """Deliver queued notifications (scheduled by CELERY_BEAT_SCHEDULE)."""
+    return drain_outbox()
+
+
+@shared_task
+def prune_notifications():
+    """Delete read notifications past the retention period (scheduled by CELERY_BEAT_SCHEDULE)."""
+    return retention.prune_notifications()
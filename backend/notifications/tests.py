@@ -1,3 +1,192 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from messaging import presence
+
+from . import outbox
+from .models import Notification, NotificationPreference
+from .retention import prune_notifications
+
+User = get_user_model()
+
+
+@override_settings(NOTIFICATION_OUTBOX_WORKER='inline')
+class NotificationBadgeTests(TransactionTestCase):
+    """
+    The cached notifications badge equals the unread count in the database
+    after every write path. TransactionTestCase, so the counters'
+    on_commit updates run.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='user@example.com', password=None, user_type='client')
+        self.other = User.objects.create_user(email='other@example.com', password=None, user_type='client')
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def notify(self, user=None, **fields):
+        return Notification.objects.create(
+            user=user or self.user, notification_type='system', title='Update', message='Something changed', **fields
+        )
+
+    def assert_badge_matches_unread(self):
+        unread = Notification.objects.filter(user=self.user, is_read=False).count()
+        self.assertEqual(self.api.get('/api/notifications/badges/').data['notifications'], unread)
+        response = self.api.get('/api/notifications/notifications/unread_count/')
+        self.assertEqual(response.data['unread_count'], unread)
+
+    def test_create(self):
+        self.assert_badge_matches_unread()
+        self.notify()
+        self.notify(is_read=True)
+        self.notify(user=self.other)
+        self.assert_badge_matches_unread()
+
+        response = self.api.post('/api/notifications/create/', {'title': 'Hi', 'message': 'Hello'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assert_badge_matches_unread()
+
+    def test_outbox_bulk_create(self):
+        self.assert_badge_matches_unread()
+        for _ in range(3):
+            outbox.enqueue(self.user, 'system', 'Update', 'Something changed')
+        outbox.enqueue(self.other, 'system', 'Update', 'Something changed')
+        self.assert_badge_matches_unread()
+
+    def test_mark_read(self):
+        notification = self.notify()
+        self.notify()
+        self.assert_badge_matches_unread()
+
+        # Marking the same notification twice only counts once
+        for _ in range(2):
+            self.api.post(f'/api/notifications/notifications/{notification.id}/mark_read/')
+            self.assert_badge_matches_unread()
+
+        ids = [self.notify().id, self.notify().id, self.notify(user=self.other).id]
+        response = self.api.post(
+            '/api/notifications/notifications/mark_as_read/', {'notification_ids': ids}, format='json'
+        )
+        self.assertEqual(response.data['marked_read'], 2)
+        self.assert_badge_matches_unread()
+
+    def test_mark_all_read(self):
+        for _ in range(3):
+            self.notify()
+        self.notify(user=self.other)
+        self.assert_badge_matches_unread()
+
+        response = self.api.post('/api/notifications/notifications/mark_as_read/', {'mark_all': True}, format='json')
+        self.assertEqual(response.data['marked_read'], 3)
+        self.assert_badge_matches_unread()
+
+    def test_retention_pruning(self):
+        old = timezone.now() - timedelta(days=60)
+        for is_read in (True, True, False):
+            Notification.objects.filter(pk=self.notify(is_read=is_read).pk).update(created_at=old)
+        self.notify()
+        self.assert_badge_matches_unread()
+
+        metrics = prune_notifications(days=30)
+        self.assertEqual(metrics['notifications'], 2)
+        self.assertEqual(Notification.objects.filter(user=self.user).count(), 2)
+        self.assert_badge_matches_unread()
+
+    def test_cold_cache(self):
+        for _ in range(2):
+            self.notify()
+        self.assert_badge_matches_unread()
+
+        # Writes while the entry is missing are counted on the next read
+        cache.clear()
+        self.notify()
+        Notification.objects.filter(user=self.user).first().mark_as_read()
+        self.assert_badge_matches_unread()
+
+        cache.clear()
+        self.assert_badge_matches_unread()
+        with self.assertNumQueries(0):
+            self.api.get('/api/notifications/badges/')
+
+
+@override_settings(NOTIFICATION_OUTBOX_WORKER='external', PRESENCE_FLUSH_INTERVAL=0)
+class OutboxDeliveryTests(TransactionTestCase):
+    """drain_outbox() pushes and emails only the recipients whose preferences allow it."""
+
+    def setUp(self):
+        cache.clear()
+        self.users = {}
+
+    def make_user(self, name, **preferences):
+        user = User.objects.create_user(email=f'{name}@example.com', password=None, user_type='client')
+        if preferences:
+            NotificationPreference.objects.create(user=user, **preferences)
+        self.users[name] = user
+        return user
+
+    def listen(self, user):
+        """Mark `user` online and return a channel receiving their frames."""
+        presence.connect(user.id)
+        layer = get_channel_layer()
+        channel = async_to_sync(layer.new_channel)()
+        async_to_sync(layer.group_add)(f'user_{user.id}', channel)
+        return channel
+
+    def test_email_follows_email_notifications(self):
+        self.make_user('default')
+        self.make_user('opted_in', email_notifications=True)
+        self.make_user('opted_out', email_notifications=False)
+        self.make_user('push_muted', push_notifications=False)
+        for user in self.users.values():
+            outbox.enqueue(user, 'system', 'Update', 'Something changed')
+        outbox.enqueue(self.users['default'], 'system', 'Reminder', 'Tomorrow at 9')
+
+        metrics = outbox.drain_outbox()
+
+        self.assertEqual(metrics['emailed'], 3)
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            ['default@example.com', 'opted_in@example.com', 'push_muted@example.com'],
+        )
+        default, = [message for message in mail.outbox if message.to == ['default@example.com']]
+        self.assertEqual(default.subject, '2 new notifications')
+        # Opting out of email still stores the notification
+        self.assertEqual(Notification.objects.filter(user=self.users['opted_out']).count(), 1)
+
+    def test_push_follows_push_notifications(self):
+        online = self.make_user('online')
+        muted = self.make_user('muted', push_notifications=False, email_notifications=False)
+        self.make_user('offline')
+        channel = self.listen(online)
+        self.listen(muted)
+        for user in self.users.values():
+            outbox.enqueue(user, 'system', 'Update', 'Something changed')
+
+        metrics = outbox.drain_outbox()
+
+        self.assertEqual((metrics['pushed'], metrics['emailed']), (1, 2))
+        frame = async_to_sync(get_channel_layer().receive)(channel)
+        self.assertEqual(frame['type'], 'new_notifications')
+
+    def test_preferences_read_once_per_batch(self):
+        def drain_queries(count):
+            for n in range(count):
+                user = self.make_user(f'user-{len(self.users)}', email_notifications=n % 2 == 0)
+                self.listen(user)
+                outbox.enqueue(user, 'system', 'Update', 'Something changed')
+            with CaptureQueriesContext(connection) as queries:
+                outbox.drain_outbox()
+            return len(queries)
+
+        self.assertEqual(drain_queries(2), drain_queries(12))
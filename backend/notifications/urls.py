@@ -9,6 +9,7 @@ router.register(r'preferences', views.NotificationPreferenceViewSet, basename='n
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('badges/', views.badges, name='badges'),
     path('create/', views.create_notification, name='create-notification'),
     path('test/', views.test_notification, name='test-notification'),
 ]
\ No newline at end of file
@@ -1,24 +1,33 @@
 # notifications/utils.py
-from django.utils import timezone
-from .models import Notification
+import logging
+
+from .outbox import enqueue
+
+logger = logging.getLogger(__name__)
 
 class NotificationService:
     def send_new_message_notification(self, user, context):
-        """Send notification for new message"""
+        """
+        Queue a notification for a new message (delivered by
+        notifications.outbox; a burst from one sender in one conversation
+        arrives as one "N new messages from X" notification)
+        """
         sender_name = context.get('sender_name', 'Someone')
         message_preview = context.get('message_preview', '')
-        
+        conversation_id = context.get('conversation_id')
+
         try:
-            notification = Notification.objects.create(
-                user=user,
+            return enqueue(
+                user,
                 notification_type='message',
                 title=f"New message from {sender_name}",
                 message=f"{sender_name}: {message_preview}",
                 related_object_type='conversation',
-                related_object_id=context.get('conversation_id')
+                related_object_id=conversation_id,
+                coalesce_key=f"conversation:{conversation_id}:{context.get('sender_id', sender_name)}",
+                actor=sender_name,
             )
-            print(f"✓ Notification sent to {user.email}: {notification.title}")
-            return notification
-        except Exception as e:
-            print(f"✗ Failed to send notification: {e}")
-            return None
\ No newline at end of file
+        except Exception:
+            # A lost notification must not fail the message itself
+            logger.exception("Failed to queue notification for user %s", user.pk)
+            return None
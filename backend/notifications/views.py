@@ -6,6 +6,7 @@ from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 
+from .badges import UNREAD_NOTIFICATIONS, badges as read_badges
 from .models import Notification, NotificationPreference
 from .serializers import (
     NotificationSerializer, NotificationPreferenceSerializer,
@@ -52,6 +53,7 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
                     is_read=True,
                     read_at=timezone.now()
                 )
+                UNREAD_NOTIFICATIONS.add({request.user.pk: -updated})
                 return Response({"marked_read": updated})
             else:
                 # Mark specific notifications as read
@@ -65,6 +67,7 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
                         is_read=True,
                         read_at=timezone.now()
                     )
+                    UNREAD_NOTIFICATIONS.add({request.user.pk: -updated})
                     return Response({"marked_read": updated})
                 else:
                     return Response(
@@ -77,11 +80,7 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=False, methods=['get'])
     def unread_count(self, request):
         """Get unread notification count"""
-        count = Notification.objects.filter(
-            user=request.user,
-            is_read=False
-        ).count()
-        return Response({"unread_count": count})
+        return Response({"unread_count": UNREAD_NOTIFICATIONS.get(request.user.pk)})
     
     @action(detail=True, methods=['post'])
     def mark_read(self, request, pk=None):
@@ -111,6 +110,13 @@ class NotificationPreferenceViewSet(viewsets.ModelViewSet):
         serializer.save(user=self.request.user)
 
 
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def badges(request):
+    """Unread notification and message counts in one call (cached counters)"""
+    return Response(read_badges(request.user))
+
+
 # Simple utility view to create notifications
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
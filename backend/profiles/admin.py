@@ -10,7 +10,7 @@ from django.utils.html import format_html
 from .models import (
     CaregiverProfile, ClientProfile, Appointment, 
     Availability, Review, ProfileNotification, 
-    CareLog, Payment, ProfileAttachment
+    CareLog, Payment, ProfileAttachment, CaregiverSearchDocument, Specialty
 )
 
 # =============================================================================
@@ -190,4 +190,24 @@ class ProfileAttachmentAdmin(admin.ModelAdmin):
     
     @admin.display(description='Caregiver')
     def caregiver_display(self, obj):
-        return obj.caregiver.full_name
\ No newline at end of file
+        return obj.caregiver.full_name
+
+@admin.register(CaregiverSearchDocument)
+class CaregiverSearchDocumentAdmin(admin.ModelAdmin):
+    """Read-only view of the discovery read model (rebuilt from source tables)."""
+    list_display = ('full_name', 'city', 'hourly_rate', 'average_rating', 'total_reviews', 'is_active', 'updated_at')
+    list_filter = ('is_active', 'is_available', 'is_verified', 'city')
+    search_fields = ('full_name', 'city')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(Specialty)
+class SpecialtyAdmin(admin.ModelAdmin):
+    """Specialties are derived from caregiver profiles; only display names are editable."""
+    list_display = ('name', 'slug', 'created_at')
+    search_fields = ('name', 'slug')
+    readonly_fields = ('slug',)
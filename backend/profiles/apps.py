@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ProfilesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'profiles'
+
+    def ready(self):
+        # Discovery read-model, specialty taxonomy, rating and rollup receivers
+        from . import documents, ratings, rollups, specialties  # noqa: F401
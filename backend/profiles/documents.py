@@ -0,0 +1,216 @@
+"""
+CareNest Pro - Discovery Read Model Sync
+Description: Keeps CaregiverSearchDocument rows in step with their sources.
+
+Discovery reads only the flattened CaregiverSearchDocument table. The
+receivers below rebuild a caregiver's document whenever something that
+feeds a search card changes: the profile itself, the owning User (name
+fallback, account deactivation), reviews (rating) and availability
+(weekday mask). Bulk writes that bypass signals must call
+sync_caregiver_documents() themselves, and multi-row writes can wrap
+themselves in batch_document_sync() to fold per-row syncs into one.
+
+Every sync also re-indexes the profile's searchable text (bio,
+specialties, city, location) in CAREGIVER_TEXT_INDEX, keyed by the
+document id, so the discovery `q=` search never needs a full rebuild,
+and bumps the `discovery` response-cache stamp.
+"""
+
+import threading
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from api.cache import bump_version
+from api.fulltext import FullTextIndex
+
+from .models import Availability, CaregiverProfile, CaregiverSearchDocument, Review
+
+User = get_user_model()
+
+HEADLINE_LENGTH = 160
+
+# Created by migration 0006; weights run from 'A' (strongest) to 'D'
+CAREGIVER_TEXT_INDEX = FullTextIndex(
+    'profiles_caregiversearch_fts',
+    columns=[('specialties', 'A'), ('city', 'A'), ('location', 'B'), ('bio', 'C')],
+)
+
+DOCUMENT_FIELDS = [
+    'user_id', 'full_name', 'first_name', 'last_name', 'headline', 'bio', 'city', 'profile_image', 'specialties',
+    'is_verified', 'is_featured', 'is_available', 'available_days', 'is_active',
+    'hourly_rate', 'experience_years', 'average_rating', 'total_reviews',
+    'latitude', 'longitude', 'geohash',
+]
+
+
+def document_values(profile, user, available_days):
+    """Field values of the search document for a profile and its user."""
+    if profile.first_name and profile.last_name:
+        full_name = f"{profile.first_name} {profile.last_name}"
+    else:
+        full_name = user.username or ''
+
+    return {
+        'user_id': user.id,
+        'full_name': full_name,
+        'first_name': profile.first_name,
+        'last_name': profile.last_name,
+        'headline': (profile.bio or '')[:HEADLINE_LENGTH],
+        'bio': profile.bio or '',
+        'city': profile.city,
+        'profile_image': profile.profile_image.name if profile.profile_image else '',
+        'specialties': profile.specialties or [],
+        'is_verified': profile.id_verified,
+        'is_featured': profile.is_featured,
+        'is_available': profile.is_available,
+        'available_days': available_days,
+        'is_active': profile.is_active and user.is_active,
+        'hourly_rate': profile.hourly_rate,
+        'experience_years': profile.experience_years,
+        'average_rating': profile.average_rating,
+        'total_reviews': profile.total_reviews,
+        'latitude': profile.latitude,
+        'longitude': profile.longitude,
+        'geohash': profile.geohash,
+    }
+
+
+def text_values(profile):
+    """Searchable text of a profile, per full-text index column."""
+    specialties = profile.specialties or []
+    if not isinstance(specialties, list):
+        specialties = [specialties]
+    return {
+        'specialties': ' '.join(str(specialty) for specialty in specialties),
+        'city': profile.city or '',
+        'location': profile.location or '',
+        'bio': profile.bio or '',
+    }
+
+
+def available_days_by_profile(profile_ids):
+    """Weekday bitmask per profile from active recurring availability, in one query."""
+    masks = {profile_id: 0 for profile_id in profile_ids}
+    rows = Availability.objects.filter(
+        caregiver_id__in=profile_ids,
+        is_active=True,
+        day_of_week__isnull=False,
+    ).values_list('caregiver_id', 'day_of_week').distinct()
+    for profile_id, day in rows:
+        masks[profile_id] |= 1 << day
+    return masks
+
+
+def sync_caregiver_documents(profile_ids):
+    """Rebuild the search documents of the given caregiver profiles."""
+    profile_ids = list(profile_ids)
+    if not profile_ids:
+        return
+
+    profiles = CaregiverProfile.objects.filter(id__in=profile_ids).select_related('user')
+    masks = available_days_by_profile(profile_ids)
+    existing = dict(
+        CaregiverSearchDocument.objects.filter(profile_id__in=profile_ids).values_list('profile_id', 'id')
+    )
+
+    now = timezone.now()
+    to_create = []
+    to_update = []
+    texts = {}
+    for profile in profiles:
+        texts[profile.id] = text_values(profile)
+        values = document_values(profile, profile.user, masks.get(profile.id, 0))
+        document = CaregiverSearchDocument(profile_id=profile.id, updated_at=now, **values)
+        if profile.id in existing:
+            document.id = existing[profile.id]
+            to_update.append(document)
+        else:
+            to_create.append(document)
+
+    if to_create:
+        CaregiverSearchDocument.objects.bulk_create(to_create)
+    if to_update:
+        CaregiverSearchDocument.objects.bulk_update(to_update, DOCUMENT_FIELDS + ['updated_at'])
+
+    CAREGIVER_TEXT_INDEX.index_many(
+        (document.id, texts[document.profile_id]) for document in to_create + to_update
+    )
+    bump_version('discovery')
+
+
+_batch = threading.local()
+
+
+@contextmanager
+def batch_document_sync():
+    """
+    Collect sync_caregiver_document() calls made inside the block (including
+    from signal receivers) and run them as one bulk sync on exit.
+    Nested blocks join the outermost one.
+    """
+    if getattr(_batch, 'profile_ids', None) is not None:
+        yield
+        return
+    _batch.profile_ids = set()
+    try:
+        yield
+        profile_ids = _batch.profile_ids
+    finally:
+        _batch.profile_ids = None
+    sync_caregiver_documents(profile_ids)
+
+
+def sync_caregiver_document(profile_id):
+    pending = getattr(_batch, 'profile_ids', None)
+    if pending is not None:
+        pending.add(profile_id)
+        return
+    sync_caregiver_documents([profile_id])
+
+
+def rebuild_search_documents(batch_size=1000):
+    """Rebuild every document (used by the rebuild_search_documents command)."""
+    ids = list(CaregiverProfile.objects.values_list('id', flat=True))
+    for start in range(0, len(ids), batch_size):
+        sync_caregiver_documents(ids[start:start + batch_size])
+    return len(ids)
+
+
+# =============================================================================
+# SIGNAL RECEIVERS (connected in ProfilesConfig.ready)
+# =============================================================================
+
+@receiver(post_save, sender=CaregiverProfile)
+def caregiver_profile_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    sync_caregiver_document(instance.pk)
+
+
+@receiver(post_delete, sender=CaregiverSearchDocument)
+def caregiver_document_deleted(sender, instance, **kwargs):
+    CAREGIVER_TEXT_INDEX.remove([instance.pk])
+    bump_version('discovery')
+
+
+@receiver(post_save, sender=User)
+def caregiver_user_saved(sender, instance, raw=False, **kwargs):
+    if raw or instance.user_type != 'caregiver':
+        return
+    profile_id = CaregiverProfile.objects.filter(user=instance).values_list('id', flat=True).first()
+    if profile_id:
+        sync_caregiver_document(profile_id)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+@receiver(post_save, sender=Availability)
+@receiver(post_delete, sender=Availability)
+def caregiver_related_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    sync_caregiver_document(instance.caregiver_id)
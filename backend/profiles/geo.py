@@ -0,0 +1,144 @@
+"""
+CareNest Pro - Geospatial Helpers
+Description: Geohash spatial index used by caregiver discovery.
+
+Every caregiver profile stores the geohash of its coordinates in an indexed
+column. A radius query is answered in three steps:
+  1. pick the geohash precision whose cells are at least as large as the
+     radius, so the centre cell plus its 8 neighbours cover the whole circle;
+  2. turn each covering cell into an indexed range scan on the geohash column
+     and AND it with a lat/lng bounding box;
+  3. run an exact haversine check on the (small) set of survivors.
+Range scans (``geohash >= 'abc' AND geohash < 'abc{'``) are used instead of
+LIKE so the B-tree index is hit on both SQLite and PostgreSQL.
+"""
+
+import math
+
+from django.db.models import Q
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+# Stored precision: 9 characters is a ~4.8m x 4.8m cell
+GEOHASH_PRECISION = 9
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+# First character sorting after every base32 digit, used as an exclusive upper bound
+_RANGE_END = '{'
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    """Encode a coordinate pair into a geohash string."""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    latitude = float(latitude)
+    longitude = float(longitude)
+
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        rng, value = (lng_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(chars)
+
+
+def cell_size_degrees(precision):
+    """Return the (lat, lng) size in degrees of a geohash cell."""
+    lat_bits = (5 * precision) // 2
+    lng_bits = 5 * precision - lat_bits
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lng_bits)
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance between two points in kilometres."""
+    lat1, lng1, lat2, lng2 = map(math.radians, (float(lat1), float(lng1), float(lat2), float(lng2)))
+    dlat = lat2 - lat1
+    dlng = lng2 - lng1
+    a = math.sin(dlat / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """
+    Return (min_lat, max_lat, min_lng, max_lng) enclosing the search circle.
+    Longitude bounds are None when the box wraps the antimeridian or a pole.
+    """
+    lat_delta = radius_km / KM_PER_DEGREE
+    min_lat = max(-90.0, latitude - lat_delta)
+    max_lat = min(90.0, latitude + lat_delta)
+
+    widest_lat = max(abs(min_lat), abs(max_lat))
+    if widest_lat >= 90.0:
+        return min_lat, max_lat, None, None
+    lng_delta = radius_km / (KM_PER_DEGREE * math.cos(math.radians(widest_lat)))
+    if longitude - lng_delta < -180.0 or longitude + lng_delta > 180.0:
+        return min_lat, max_lat, None, None
+    return min_lat, max_lat, longitude - lng_delta, longitude + lng_delta
+
+
+def _cover_precision(latitude, radius_km):
+    """Largest precision whose cells are no smaller than the radius."""
+    lat_delta = radius_km / KM_PER_DEGREE
+    widest_lat = min(89.9, abs(latitude) + lat_delta)
+    lng_km_per_degree = KM_PER_DEGREE * math.cos(math.radians(widest_lat))
+
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        lat_deg, lng_deg = cell_size_degrees(precision)
+        if lat_deg * KM_PER_DEGREE >= radius_km and lng_deg * lng_km_per_degree >= radius_km:
+            return precision
+    return 0
+
+
+def covering_cells(latitude, longitude, radius_km):
+    """
+    Return the set of geohash prefixes covering the search circle,
+    or None when the radius is too large for any prefix to help.
+    """
+    precision = _cover_precision(latitude, radius_km)
+    if precision == 0:
+        return None
+
+    lat_deg, lng_deg = cell_size_degrees(precision)
+    cells = set()
+    for dlat in (-lat_deg, 0.0, lat_deg):
+        lat = min(90.0, max(-90.0, latitude + dlat))
+        for dlng in (-lng_deg, 0.0, lng_deg):
+            lng = ((longitude + dlng + 180.0) % 360.0) - 180.0
+            cells.add(encode_geohash(lat, lng, precision))
+    return cells
+
+
+def radius_filter(latitude, longitude, radius_km, field='geohash', lat_field='latitude', lng_field='longitude'):
+    """
+    Build the indexed prefilter for a radius search: geohash cell ranges
+    ANDed with the bounding box. Survivors still need an exact haversine check.
+    """
+    query = Q(**{f'{field}__isnull': False})
+
+    cells = covering_cells(latitude, longitude, radius_km)
+    if cells is not None:
+        cell_query = Q()
+        for cell in sorted(cells):
+            cell_query |= Q(**{f'{field}__gte': cell, f'{field}__lt': cell + _RANGE_END})
+        query &= cell_query
+
+    min_lat, max_lat, min_lng, max_lng = bounding_box(latitude, longitude, radius_km)
+    query &= Q(**{f'{lat_field}__gte': min_lat, f'{lat_field}__lte': max_lat})
+    if min_lng is not None:
+        query &= Q(**{f'{lng_field}__gte': min_lng, f'{lng_field}__lte': max_lng})
+    return query
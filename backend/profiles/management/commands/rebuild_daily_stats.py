@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from profiles.rollups import rebuild_daily_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild the caregiver dashboard rollups (CaregiverDailyStats) from raw appointments."
+
+    def handle(self, *args, **options):
+        total = rebuild_daily_stats()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {total} caregiver daily stats rows"))
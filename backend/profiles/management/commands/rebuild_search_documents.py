@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from profiles.documents import rebuild_search_documents
+
+
+class Command(BaseCommand):
+    help = "Rebuild the caregiver discovery read model (CaregiverSearchDocument) from source tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = rebuild_search_documents(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {total} caregiver search documents"))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from profiles.ratings import recompute_ratings
+
+
+class Command(BaseCommand):
+    help = "Reconcile caregiver rating aggregates (rating_sum, total_reviews, average_rating) with their reviews."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true', help="Report drift without writing.")
+
+    def handle(self, *args, **options):
+        drifted = recompute_ratings(batch_size=options['batch_size'], dry_run=options['dry_run'])
+        verb = "Found" if options['dry_run'] else "Repaired"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {len(drifted)} caregiver profiles with drifted ratings"))
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.9 on 2026-10-17 07:05
+
+from django.db import migrations, models
+
+from profiles.geo import encode_geohash
+
+
+def backfill_geohash(apps, schema_editor):
+    CaregiverProfile = apps.get_model('profiles', 'CaregiverProfile')
+    profiles = CaregiverProfile.objects.filter(
+        latitude__isnull=False, longitude__isnull=False
+    ).only('id', 'latitude', 'longitude')
+
+    batch = []
+    for profile in profiles.iterator(chunk_size=2000):
+        profile.geohash = encode_geohash(profile.latitude, profile.longitude)
+        batch.append(profile)
+        if len(batch) >= 2000:
+            CaregiverProfile.objects.bulk_update(batch, ['geohash'])
+            batch = []
+    if batch:
+        CaregiverProfile.objects.bulk_update(batch, ['geohash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0002_remove_caregiverprofile_uuid_remove_payment_uuid_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='caregiverprofile',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Spatial index key derived from latitude/longitude.', max_length=12, null=True),
+        ),
+        migrations.RunPython(backfill_geohash, migrations.RunPython.noop),
+    ]
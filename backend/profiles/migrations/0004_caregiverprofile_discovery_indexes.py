@@ -0,0 +1,27 @@
+# Generated by Django 5.2.9 on 2026-10-17 07:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0003_caregiverprofile_geohash'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='caregiverprofile',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['average_rating', 'total_reviews', 'id'], name='caregiver_recommended_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='caregiverprofile',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['hourly_rate', 'id'], name='caregiver_rate_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='caregiverprofile',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['experience_years', 'id'], name='caregiver_experience_idx'),
+        ),
+    ]
@@ -0,0 +1,121 @@
+# Generated by Django 5.2.9 on 2026-10-17 07:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_search_documents(apps, schema_editor):
+    CaregiverProfile = apps.get_model('profiles', 'CaregiverProfile')
+    CaregiverSearchDocument = apps.get_model('profiles', 'CaregiverSearchDocument')
+    Availability = apps.get_model('profiles', 'Availability')
+
+    masks = {}
+    rows = Availability.objects.filter(
+        is_active=True, day_of_week__isnull=False
+    ).values_list('caregiver_id', 'day_of_week').distinct()
+    for profile_id, day in rows:
+        masks[profile_id] = masks.get(profile_id, 0) | (1 << day)
+
+    documents = []
+    for profile in CaregiverProfile.objects.select_related('user').iterator(chunk_size=1000):
+        user = profile.user
+        if profile.first_name and profile.last_name:
+            full_name = f"{profile.first_name} {profile.last_name}"
+        else:
+            full_name = user.username or ''
+        documents.append(CaregiverSearchDocument(
+            profile_id=profile.id,
+            user_id=user.id,
+            full_name=full_name,
+            headline=(profile.bio or '')[:160],
+            city=profile.city,
+            profile_image=profile.profile_image.name if profile.profile_image else '',
+            specialties=profile.specialties or [],
+            is_verified=profile.id_verified,
+            is_featured=profile.is_featured,
+            is_available=profile.is_available,
+            available_days=masks.get(profile.id, 0),
+            is_active=profile.is_active and user.is_active,
+            hourly_rate=profile.hourly_rate,
+            experience_years=profile.experience_years,
+            average_rating=profile.average_rating,
+            total_reviews=profile.total_reviews,
+            latitude=profile.latitude,
+            longitude=profile.longitude,
+            geohash=profile.geohash,
+        ))
+    CaregiverSearchDocument.objects.bulk_create(documents, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0004_caregiverprofile_discovery_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CaregiverSearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.UUIDField(db_index=True)),
+                ('full_name', models.CharField(max_length=255)),
+                ('headline', models.CharField(blank=True, max_length=160)),
+                ('city', models.CharField(blank=True, max_length=100, null=True)),
+                ('profile_image', models.CharField(blank=True, max_length=255)),
+                ('specialties', models.JSONField(blank=True, default=list)),
+                ('is_verified', models.BooleanField(default=False)),
+                ('is_featured', models.BooleanField(default=False)),
+                ('is_available', models.BooleanField(default=True)),
+                ('available_days', models.PositiveSmallIntegerField(default=0, help_text='Bitmask of weekdays with active availability (Monday = bit 0).')),
+                ('is_active', models.BooleanField(default=True)),
+                ('hourly_rate', models.DecimalField(decimal_places=2, max_digits=8)),
+                ('experience_years', models.PositiveIntegerField(default=1)),
+                ('average_rating', models.DecimalField(decimal_places=2, default=0.0, max_digits=3)),
+                ('total_reviews', models.PositiveIntegerField(default=0)),
+                ('latitude', models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True)),
+                ('longitude', models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True)),
+                ('geohash', models.CharField(blank=True, db_index=True, max_length=12, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Caregiver Search Document',
+                'verbose_name_plural': 'Caregiver Search Documents',
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='caregiverprofile',
+            name='caregiver_recommended_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='caregiverprofile',
+            name='caregiver_rate_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='caregiverprofile',
+            name='caregiver_experience_idx',
+        ),
+        migrations.AlterField(
+            model_name='caregiverprofile',
+            name='geohash',
+            field=models.CharField(blank=True, editable=False, help_text='Spatial index key derived from latitude/longitude.', max_length=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='caregiversearchdocument',
+            name='profile',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='search_document', to='profiles.caregiverprofile'),
+        ),
+        migrations.AddIndex(
+            model_name='caregiversearchdocument',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['average_rating', 'total_reviews', 'id'], name='search_recommended_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='caregiversearchdocument',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['hourly_rate', 'id'], name='search_rate_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='caregiversearchdocument',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['experience_years', 'id'], name='search_experience_idx'),
+        ),
+        migrations.RunPython(backfill_search_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.9 on 2026-10-17 09:12
+
+from django.db import migrations
+
+from api.fulltext import FullTextIndex
+
+
+def text_index(schema_editor):
+    # Mirrors profiles.documents.CAREGIVER_TEXT_INDEX at the time of this migration
+    return FullTextIndex(
+        'profiles_caregiversearch_fts',
+        columns=[('specialties', 'A'), ('city', 'A'), ('location', 'B'), ('bio', 'C')],
+        using=schema_editor.connection.alias,
+    )
+
+
+def create_index(apps, schema_editor):
+    index = text_index(schema_editor)
+    index.create(schema_editor)
+    if not index.available():
+        return
+
+    CaregiverSearchDocument = apps.get_model('profiles', 'CaregiverSearchDocument')
+    documents = CaregiverSearchDocument.objects.select_related('profile').only(
+        'id', 'profile__specialties', 'profile__city', 'profile__location', 'profile__bio'
+    )
+
+    batch = []
+    for document in documents.iterator(chunk_size=1000):
+        profile = document.profile
+        specialties = profile.specialties or []
+        if not isinstance(specialties, list):
+            specialties = [specialties]
+        batch.append((document.id, {
+            'specialties': ' '.join(str(specialty) for specialty in specialties),
+            'city': profile.city or '',
+            'location': profile.location or '',
+            'bio': profile.bio or '',
+        }))
+        if len(batch) >= 1000:
+            index.index_many(batch)
+            batch = []
+    index.index_many(batch)
+
+
+def drop_index(apps, schema_editor):
+    text_index(schema_editor).drop(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0005_caregiversearchdocument'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
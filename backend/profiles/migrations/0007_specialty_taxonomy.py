@@ -0,0 +1,74 @@
+# Generated by Django 5.2.9 on 2026-10-17 07:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from profiles.specialties import normalize_specialties
+
+
+def backfill_specialties(apps, schema_editor):
+    CaregiverProfile = apps.get_model('profiles', 'CaregiverProfile')
+    Specialty = apps.get_model('profiles', 'Specialty')
+    CaregiverSpecialty = apps.get_model('profiles', 'CaregiverSpecialty')
+
+    specialty_ids = {}
+    links = []
+    for profile_id, values in CaregiverProfile.objects.values_list('id', 'specialties').iterator(chunk_size=2000):
+        for slug, name in normalize_specialties(values).items():
+            if slug not in specialty_ids:
+                specialty_ids[slug] = Specialty.objects.get_or_create(slug=slug, defaults={'name': name})[0].id
+            links.append(CaregiverSpecialty(profile_id=profile_id, specialty_id=specialty_ids[slug]))
+        if len(links) >= 2000:
+            CaregiverSpecialty.objects.bulk_create(links, ignore_conflicts=True)
+            links = []
+    CaregiverSpecialty.objects.bulk_create(links, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0006_caregiversearch_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Specialty',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slug', models.SlugField(max_length=100, unique=True)),
+                ('name', models.CharField(max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Specialty',
+                'verbose_name_plural': 'Specialties',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='CaregiverSpecialty',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='specialty_links', to='profiles.caregiverprofile')),
+                ('specialty', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='caregiver_links', to='profiles.specialty')),
+            ],
+            options={
+                'verbose_name': 'Caregiver Specialty',
+                'verbose_name_plural': 'Caregiver Specialties',
+            },
+        ),
+        migrations.AddField(
+            model_name='caregiverprofile',
+            name='specialty_tags',
+            field=models.ManyToManyField(blank=True, help_text='Normalized copy of `specialties` used for filtering.', related_name='caregivers', through='profiles.CaregiverSpecialty', to='profiles.specialty'),
+        ),
+        migrations.AddIndex(
+            model_name='caregiverspecialty',
+            index=models.Index(fields=['specialty', 'profile'], name='specialty_profile_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='caregiverspecialty',
+            constraint=models.UniqueConstraint(fields=('profile', 'specialty'), name='unique_caregiver_specialty'),
+        ),
+        migrations.RunPython(backfill_specialties, migrations.RunPython.noop),
+    ]
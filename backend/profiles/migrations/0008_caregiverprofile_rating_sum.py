@@ -0,0 +1,32 @@
+# Generated by Django 5.2.9 on 2026-10-17 07:19
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_rating_sum(apps, schema_editor):
+    CaregiverProfile = apps.get_model('profiles', 'CaregiverProfile')
+    Review = apps.get_model('profiles', 'Review')
+    totals = Review.objects.filter(is_visible=True).values('caregiver_id').annotate(
+        total=Sum('rating'), count=Count('id')
+    ).order_by()
+    for row in totals:
+        CaregiverProfile.objects.filter(pk=row['caregiver_id']).update(
+            rating_sum=row['total'], total_reviews=row['count']
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0007_specialty_taxonomy'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='caregiverprofile',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, help_text='Running sum of visible review ratings (average = sum / total_reviews).'),
+        ),
+        migrations.RunPython(backfill_rating_sum, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.9 on 2026-10-17 07:21
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def backfill_daily_stats(apps, schema_editor):
+    Appointment = apps.get_model('profiles', 'Appointment')
+    CaregiverDailyStats = apps.get_model('profiles', 'CaregiverDailyStats')
+
+    completed = Q(status='completed')
+    rows = Appointment.objects.values('caregiver_id', 'date').annotate(
+        earnings=Sum('total_amount', filter=completed & Q(is_paid=True)),
+        hours_worked=Sum('duration_hours', filter=completed),
+        completed_count=Count('id', filter=completed),
+        pending_count=Count('id', filter=Q(status='pending')),
+        confirmed_count=Count('id', filter=Q(status='confirmed')),
+        cancelled_count=Count('id', filter=Q(status='cancelled')),
+    ).order_by()
+    CaregiverDailyStats.objects.bulk_create([
+        CaregiverDailyStats(
+            caregiver_id=row['caregiver_id'],
+            date=row['date'],
+            earnings=row['earnings'] or 0,
+            hours_worked=row['hours_worked'] or 0,
+            completed_count=row['completed_count'],
+            pending_count=row['pending_count'],
+            confirmed_count=row['confirmed_count'],
+            cancelled_count=row['cancelled_count'],
+        )
+        for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0008_caregiverprofile_rating_sum'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CaregiverDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('earnings', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Total of completed, paid appointments.', max_digits=12)),
+                ('hours_worked', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=8)),
+                ('completed_count', models.IntegerField(default=0)),
+                ('pending_count', models.IntegerField(default=0)),
+                ('confirmed_count', models.IntegerField(default=0)),
+                ('cancelled_count', models.IntegerField(default=0)),
+                ('caregiver', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='profiles.caregiverprofile')),
+            ],
+            options={
+                'verbose_name': 'Caregiver Daily Stats',
+                'verbose_name_plural': 'Caregiver Daily Stats',
+                'constraints': [models.UniqueConstraint(fields=('caregiver', 'date'), name='unique_caregiver_daily_stats')],
+            },
+        ),
+        migrations.RunPython(backfill_daily_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.9 on 2026-10-17 09:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0009_caregiverdailystats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='profilenotification',
+            index=models.Index(fields=['user', '-created_at'], name='profile_notif_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='profilenotification',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['user', '-created_at'], name='profile_notif_unread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='profilenotification',
+            index=models.Index(condition=models.Q(('is_read', True)), fields=['created_at'], name='profile_notif_read_age_idx'),
+        ),
+        # Dropped once the feed indexes (which lead with user) exist
+        migrations.AlterField(
+            model_name='profilenotification',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='profile_notifications', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.9 on 2026-10-17 09:31
+
+from django.db import migrations, models
+
+
+def backfill_card_names(apps, schema_editor):
+    CaregiverProfile = apps.get_model('profiles', 'CaregiverProfile')
+    CaregiverSearchDocument = apps.get_model('profiles', 'CaregiverSearchDocument')
+
+    profiles = {
+        profile_id: (first_name, last_name, bio)
+        for profile_id, first_name, last_name, bio in CaregiverProfile.objects.values_list(
+            'id', 'first_name', 'last_name', 'bio'
+        ).iterator(chunk_size=1000)
+    }
+    documents = []
+    for document in CaregiverSearchDocument.objects.iterator(chunk_size=1000):
+        first_name, last_name, bio = profiles.get(document.profile_id, (None, None, ''))
+        document.first_name, document.last_name, document.bio = first_name, last_name, bio or ''
+        documents.append(document)
+    CaregiverSearchDocument.objects.bulk_update(
+        documents, ['first_name', 'last_name', 'bio'], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0010_profilenotification_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='caregiversearchdocument',
+            name='bio',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='caregiversearchdocument',
+            name='first_name',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='caregiversearchdocument',
+            name='last_name',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.RunPython(backfill_card_names, migrations.RunPython.noop),
+    ]
@@ -8,15 +8,18 @@ Care Logs, and Transactional Payment Tracking.
 """
 
 import uuid
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils.translation import gettext_lazy as _
-from django.db.models import Avg, Count
+from django.db.models import Case, Count, F, FloatField, Sum, Value, When
+from django.db.models.functions import Cast
 from decimal import Decimal
 
+from .geo import encode_geohash
+
 User = get_user_model()
 
 # =============================================================================
@@ -97,6 +100,13 @@ class CaregiverProfile(models.Model):
         blank=True, 
         help_text=_("List of care types (e.g. Elderly, Childcare, Post-Op)")
     )
+    specialty_tags = models.ManyToManyField(
+        'Specialty',
+        through='CaregiverSpecialty',
+        related_name='caregivers',
+        blank=True,
+        help_text=_("Normalized copy of `specialties` used for filtering.")
+    )
     
     # Location Data
     location = models.CharField(max_length=255, blank=True, null=True)
@@ -104,6 +114,13 @@ class CaregiverProfile(models.Model):
     postal_code = models.CharField(max_length=20, blank=True, null=True)
     latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
     longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    geohash = models.CharField(
+        max_length=12,
+        blank=True,
+        null=True,
+        editable=False,
+        help_text=_("Spatial index key derived from latitude/longitude.")
+    )
     
     # Verification & Trust
     is_featured = models.BooleanField(default=False)
@@ -119,6 +136,10 @@ class CaregiverProfile(models.Model):
     # Aggregate Stats
     average_rating = models.DecimalField(max_digits=3, decimal_places=2, default=0.00)
     total_reviews = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        help_text=_("Running sum of visible review ratings (average = sum / total_reviews).")
+    )
     profile_completion_percentage = models.PositiveIntegerField(default=0)
     
     # Status
@@ -138,21 +159,66 @@ class CaregiverProfile(models.Model):
     def __str__(self):
         return self.full_name
 
+    def save(self, *args, **kwargs):
+        # Keep the spatial index key in step with the coordinates
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = encode_geohash(self.latitude, self.longitude)
+        else:
+            self.geohash = None
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'geohash'}
+        super().save(*args, **kwargs)
+
     @property
     def full_name(self):
         if self.first_name and self.last_name:
             return f"{self.first_name} {self.last_name}"
         return self.user.username
 
+    @staticmethod
+    def average_from_sum(rating_sum, total_reviews):
+        if not total_reviews:
+            return Decimal('0.00')
+        return (Decimal(rating_sum) / total_reviews).quantize(Decimal('0.01'))
+
     def update_rating(self):
-        """Recalculate average rating based on Review model."""
+        """
+        Recalculate the rating aggregates from scratch. Review writes keep
+        them current incrementally (apply_rating_delta); this is for repairs.
+        """
         stats = self.reviews.filter(is_visible=True).aggregate(
-            avg=Avg('rating'), 
+            total=Sum('rating'),
             count=Count('id')
         )
-        self.average_rating = stats['avg'] or 0.00
+        self.rating_sum = stats['total'] or 0
         self.total_reviews = stats['count'] or 0
-        self.save()
+        self.average_rating = self.average_from_sum(self.rating_sum, self.total_reviews)
+        self.save(update_fields=['rating_sum', 'total_reviews', 'average_rating', 'updated_at'])
+
+    @classmethod
+    def apply_rating_delta(cls, profile_id, rating_delta, count_delta):
+        """
+        Shift the running rating aggregates of one profile in a single
+        atomic UPDATE. Every right-hand side reads the pre-update row, so
+        concurrent review writes cannot lose each other's deltas. This
+        bypasses save() and post_save.
+        """
+        if not rating_delta and not count_delta:
+            return
+        new_sum = F('rating_sum') + rating_delta
+        new_count = F('total_reviews') + count_delta
+        cls.objects.filter(pk=profile_id).update(
+            rating_sum=new_sum,
+            total_reviews=new_count,
+            average_rating=Case(
+                When(total_reviews__gt=-count_delta, then=Cast(new_sum, FloatField()) / new_count),
+                default=Value(0.0),
+                output_field=FloatField(),
+            ),
+            updated_at=timezone.now(),
+        )
 
 # =============================================================================
 # 2. CLIENT PROFILE
@@ -271,7 +337,47 @@ class Appointment(models.Model):
         if self.duration_hours and self.hourly_rate_at_booking:
             self.total_amount = self.duration_hours * self.hourly_rate_at_booking
         
-        super().save(*args, **kwargs)
+        # Move the dashboard rollups from what the stored row contributed
+        # to what this row contributes, in the same transaction as the save
+        if not self._state.adding and not hasattr(self, '_stored_stats'):
+            stored = type(self).objects.filter(pk=self.pk).first()
+            self._stored_stats = stored.stats_contribution() if stored else (None, {})
+        old_key, old_stats = getattr(self, '_stored_stats', (None, {}))
+        new_key, new_stats = self.stats_contribution()
+        with transaction.atomic():
+            if old_key == new_key:
+                CaregiverDailyStats.apply_delta(*new_key, {
+                    field: new_stats[field] - old_stats.get(field, 0) for field in new_stats
+                })
+            else:
+                if old_key is not None:
+                    CaregiverDailyStats.apply_delta(*old_key, {
+                        field: -amount for field, amount in old_stats.items()
+                    })
+                CaregiverDailyStats.apply_delta(*new_key, new_stats)
+            super().save(*args, **kwargs)
+        self._stored_stats = (new_key, new_stats)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Partial loads (.only()/.defer()) resolve the snapshot lazily in save()
+        if not instance.get_deferred_fields():
+            instance._stored_stats = instance.stats_contribution()
+        return instance
+
+    def stats_contribution(self):
+        """((caregiver, date), {stat: amount}) this appointment adds to CaregiverDailyStats."""
+        completed = self.status == AppointmentStatus.COMPLETED
+        key = (self.caregiver_id, self._meta.get_field('date').to_python(self.date))
+        return key, {
+            'earnings': Decimal(str(self.total_amount or 0)) if completed and self.is_paid else Decimal('0'),
+            'hours_worked': Decimal(str(self.duration_hours or 0)) if completed else Decimal('0'),
+            'completed_count': int(completed),
+            'pending_count': int(self.status == AppointmentStatus.PENDING),
+            'confirmed_count': int(self.status == AppointmentStatus.CONFIRMED),
+            'cancelled_count': int(self.status == AppointmentStatus.CANCELLED),
+        }
 
     def __str__(self):
         return f"Apt #{self.id} | {self.date} | {self.status}"
@@ -337,10 +443,38 @@ class Review(models.Model):
     caregiver_response = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Partial loads (.only()/.defer()) resolve the snapshot lazily in save()
+        if not instance.get_deferred_fields():
+            instance._stored_rating = instance.rating_contribution()
+        return instance
+
+    def rating_contribution(self):
+        """(caregiver, rating, count) this review adds to the profile aggregates."""
+        if not self.is_visible or not self.rating:
+            return (self.caregiver_id, 0, 0)
+        return (self.caregiver_id, self.rating, 1)
+
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        # Trigger aggregate update on profile
-        self.caregiver.update_rating()
+        # Shift the profile aggregates by the difference between what the
+        # stored row contributed and what this row will contribute; done
+        # before the row itself so post_save receivers see fresh ratings.
+        if not self._state.adding and not hasattr(self, '_stored_rating'):
+            stored = type(self).objects.filter(pk=self.pk).first()
+            self._stored_rating = stored.rating_contribution() if stored else (None, 0, 0)
+        old_caregiver, old_rating, old_count = getattr(self, '_stored_rating', (None, 0, 0))
+        new_caregiver, new_rating, new_count = self.rating_contribution()
+        with transaction.atomic():
+            if old_caregiver == new_caregiver:
+                CaregiverProfile.apply_rating_delta(new_caregiver, new_rating - old_rating, new_count - old_count)
+            else:
+                if old_caregiver is not None:
+                    CaregiverProfile.apply_rating_delta(old_caregiver, -old_rating, -old_count)
+                CaregiverProfile.apply_rating_delta(new_caregiver, new_rating, new_count)
+            super().save(*args, **kwargs)
+        self._stored_rating = (new_caregiver, new_rating, new_count)
 
 # =============================================================================
 # 6. NOTIFICATION SYSTEM
@@ -350,10 +484,12 @@ class ProfileNotification(models.Model):
     """
     Internal notification bus for UI alerts.
     """
+    # Indexed by the feed indexes below, which lead with user
     user = models.ForeignKey(
         User, 
         on_delete=models.CASCADE, 
-        related_name='profile_notifications'
+        related_name='profile_notifications',
+        db_index=False
     )
     notification_type = models.CharField(
         max_length=50, 
@@ -372,6 +508,21 @@ class ProfileNotification(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # A user's feed newest first; unread rows on their own for mark-all-read
+            models.Index(fields=['user', '-created_at'], name='profile_notif_feed_idx'),
+            models.Index(
+                fields=['user', '-created_at'],
+                condition=models.Q(is_read=False),
+                name='profile_notif_unread_idx',
+            ),
+            # Retention prunes read notifications oldest first
+            models.Index(
+                fields=['created_at'],
+                condition=models.Q(is_read=True),
+                name='profile_notif_read_age_idx',
+            ),
+        ]
 
 # =============================================================================
 # 7. MEDICAL CARE LOGS
@@ -452,4 +603,185 @@ class ProfileAttachment(models.Model):
     file = models.FileField(upload_to='caregiver_profiles/certs/')
     is_verified = models.BooleanField(default=False)
     expiry_date = models.DateField(null=True, blank=True)
-    uploaded_at = models.DateTimeField(auto_now_add=True)
\ No newline at end of file
+    uploaded_at = models.DateTimeField(auto_now_add=True)
+
+# =============================================================================
+# 10. DISCOVERY READ MODEL
+# =============================================================================
+
+class CaregiverSearchDocument(models.Model):
+    """
+    Flattened marketplace card for caregiver discovery.
+    Holds only what a search result needs plus precomputed sort keys, so
+    discovery is a single indexed scan with no joins. Rows are maintained
+    by profiles.documents from CaregiverProfile, User, Review and
+    Availability writes - never edit them directly.
+    """
+    profile = models.OneToOneField(
+        CaregiverProfile,
+        on_delete=models.CASCADE,
+        related_name='search_document'
+    )
+    user_id = models.UUIDField(db_index=True)
+
+    # Card fields
+    full_name = models.CharField(max_length=255)
+    first_name = models.CharField(max_length=100, blank=True, null=True)
+    last_name = models.CharField(max_length=100, blank=True, null=True)
+    headline = models.CharField(max_length=160, blank=True)
+    bio = models.TextField(blank=True)
+    city = models.CharField(max_length=100, blank=True, null=True)
+    profile_image = models.CharField(max_length=255, blank=True)
+    specialties = models.JSONField(default=list, blank=True)
+    is_verified = models.BooleanField(default=False)
+    is_featured = models.BooleanField(default=False)
+    is_available = models.BooleanField(default=True)
+    available_days = models.PositiveSmallIntegerField(
+        default=0,
+        help_text=_("Bitmask of weekdays with active availability (Monday = bit 0).")
+    )
+
+    # Filter & sort keys
+    is_active = models.BooleanField(default=True)
+    hourly_rate = models.DecimalField(max_digits=8, decimal_places=2)
+    experience_years = models.PositiveIntegerField(default=1)
+    average_rating = models.DecimalField(max_digits=3, decimal_places=2, default=0.00)
+    total_reviews = models.PositiveIntegerField(default=0)
+    latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    geohash = models.CharField(max_length=12, blank=True, null=True, db_index=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _("Caregiver Search Document")
+        verbose_name_plural = _("Caregiver Search Documents")
+        # Keyset indexes for marketplace discovery sorts (scanned backward for DESC)
+        indexes = [
+            models.Index(
+                fields=['average_rating', 'total_reviews', 'id'],
+                condition=models.Q(is_active=True),
+                name='search_recommended_idx',
+            ),
+            models.Index(
+                fields=['hourly_rate', 'id'],
+                condition=models.Q(is_active=True),
+                name='search_rate_idx',
+            ),
+            models.Index(
+                fields=['experience_years', 'id'],
+                condition=models.Q(is_active=True),
+                name='search_experience_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"Search document: {self.full_name}"
+
+# =============================================================================
+# 11. SPECIALTY TAXONOMY
+# =============================================================================
+
+class Specialty(models.Model):
+    """
+    Normalized care specialty used for faceted discovery.
+    Rows are derived from CaregiverProfile.specialties by
+    profiles.specialties; the JSON list stays the editable source.
+    """
+    slug = models.SlugField(max_length=100, unique=True)
+    name = models.CharField(max_length=100)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("Specialty")
+        verbose_name_plural = _("Specialties")
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+
+class CaregiverSpecialty(models.Model):
+    """Through table linking caregivers to their specialties."""
+    profile = models.ForeignKey(
+        CaregiverProfile,
+        on_delete=models.CASCADE,
+        related_name='specialty_links'
+    )
+    specialty = models.ForeignKey(
+        Specialty,
+        on_delete=models.CASCADE,
+        related_name='caregiver_links'
+    )
+
+    class Meta:
+        verbose_name = _("Caregiver Specialty")
+        verbose_name_plural = _("Caregiver Specialties")
+        constraints = [
+            models.UniqueConstraint(fields=['profile', 'specialty'], name='unique_caregiver_specialty'),
+        ]
+        # Serves both the AND filter and facet counts as an index-only scan
+        indexes = [
+            models.Index(fields=['specialty', 'profile'], name='specialty_profile_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.profile_id} - {self.specialty_id}"
+
+# =============================================================================
+# 12. DASHBOARD ROLLUPS
+# =============================================================================
+
+class CaregiverDailyStats(models.Model):
+    """
+    Per-caregiver, per-day appointment rollup read by the dashboard.
+    Appointment.save() and the pre_delete receiver in profiles.rollups
+    shift these counters atomically on every status transition, so the
+    dashboard never aggregates raw appointments.
+    """
+    STAT_FIELDS = (
+        'earnings', 'hours_worked', 'completed_count',
+        'pending_count', 'confirmed_count', 'cancelled_count',
+    )
+
+    caregiver = models.ForeignKey(
+        CaregiverProfile,
+        on_delete=models.CASCADE,
+        related_name='daily_stats'
+    )
+    date = models.DateField()
+    earnings = models.DecimalField(
+        max_digits=12, decimal_places=2, default=Decimal('0.00'),
+        help_text=_("Total of completed, paid appointments.")
+    )
+    hours_worked = models.DecimalField(max_digits=8, decimal_places=2, default=Decimal('0.00'))
+    completed_count = models.IntegerField(default=0)
+    pending_count = models.IntegerField(default=0)
+    confirmed_count = models.IntegerField(default=0)
+    cancelled_count = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = _("Caregiver Daily Stats")
+        verbose_name_plural = _("Caregiver Daily Stats")
+        constraints = [
+            models.UniqueConstraint(fields=['caregiver', 'date'], name='unique_caregiver_daily_stats'),
+        ]
+
+    def __str__(self):
+        return f"{self.caregiver_id} | {self.date}"
+
+    @classmethod
+    def apply_delta(cls, caregiver_id, date, delta):
+        """Add `delta` ({field: amount}) to one caregiver-day row, creating it on first use."""
+        delta = {field: amount for field, amount in delta.items() if amount}
+        if not delta:
+            return
+        changes = {field: F(field) + amount for field, amount in delta.items()}
+        if cls.objects.filter(caregiver_id=caregiver_id, date=date).update(**changes):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(caregiver_id=caregiver_id, date=date, **delta)
+        except IntegrityError:
+            # Created concurrently; the row exists now
+            cls.objects.filter(caregiver_id=caregiver_id, date=date).update(**changes)
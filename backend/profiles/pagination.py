@@ -0,0 +1,129 @@
+"""
+CareNest Pro - Keyset (cursor) Pagination
+Description: Constant-time deep paging for the caregiver marketplace.
+
+A cursor is an opaque token holding the sort key of the last row served.
+The next page is fetched with a WHERE clause that seeks past that key on
+an index matching the ordering, instead of an OFFSET that makes the
+database walk and discard every earlier row. Every ordering ends with a
+unique tiebreaker so the sequence is total and stable while profiles are
+updated between requests.
+"""
+
+import base64
+import json
+from decimal import Decimal
+from uuid import UUID
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a malformed or mismatched cursor."""
+
+
+def encode_cursor(payload):
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise InvalidCursor("Malformed cursor")
+    if not isinstance(payload, dict) or not isinstance(payload.get('after'), list):
+        raise InvalidCursor("Malformed cursor")
+    return payload
+
+
+def _to_json(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+class KeysetPaginator:
+    """
+    Seek-based paginator for a queryset.
+
+    `ordering` is a list of field names in order_by() syntax; the last one
+    must be unique (normally the primary key).
+    """
+
+    def __init__(self, ordering, page_size):
+        self.ordering = list(ordering)
+        self.page_size = page_size
+
+    def key(self, obj):
+        return [_to_json(getattr(obj, field.lstrip('-'))) for field in self.ordering]
+
+    def seek_filter(self, values):
+        """
+        Q matching rows strictly after `values` in the ordering, expanded as
+        (a > x) OR (a = x AND b > y) OR ... so mixed directions work.
+        """
+        if len(values) != len(self.ordering):
+            raise InvalidCursor("Cursor does not match the requested sort")
+
+        query = Q()
+        equal = {}
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            query |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return query
+
+    def clean_key(self, model, values):
+        """
+        A cursor's key converted to the ordering fields' types; raises
+        InvalidCursor when its length or any value does not fit.
+        """
+        if len(values) != len(self.ordering):
+            raise InvalidCursor("Cursor does not match the requested sort")
+        cleaned = []
+        for field, value in zip(self.ordering, values):
+            if value is None or isinstance(value, (bool, list, dict)):
+                raise InvalidCursor("Malformed cursor")
+            try:
+                cleaned.append(model._meta.get_field(field.lstrip('-')).to_python(value))
+            except (FieldDoesNotExist, ValidationError):
+                raise InvalidCursor("Malformed cursor")
+        return cleaned
+
+    def paginate(self, queryset, after=None):
+        """Return (rows, next_key); next_key is None on the last page."""
+        queryset = queryset.order_by(*self.ordering)
+        if after is not None:
+            queryset = queryset.filter(self.seek_filter(self.clean_key(queryset.model, after)))
+
+        rows = list(queryset[:self.page_size + 1])
+        if len(rows) > self.page_size:
+            rows = rows[:self.page_size]
+            return rows, self.key(rows[-1])
+        return rows, None
+
+
+def paginate_sorted(items, key, page_size, after=None):
+    """
+    Keyset pagination over an in-memory list already sorted by `key`
+    (used for rankings computed in Python, e.g. distance).
+    """
+    if after is not None:
+        # Keys computed in Python are all numbers
+        if not all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in after):
+            raise InvalidCursor("Malformed cursor")
+        if items and len(after) != len(key(items[0])):
+            raise InvalidCursor("Cursor does not match the requested sort")
+        after = tuple(after)
+        items = [item for item in items if tuple(key(item)) > after]
+
+    if len(items) > page_size:
+        page = items[:page_size]
+        return page, list(key(page[-1]))
+    return items, None
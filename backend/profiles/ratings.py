@@ -0,0 +1,63 @@
+"""
+CareNest Pro - Rating Aggregates
+Description: Running rating_sum / total_reviews / average_rating upkeep.
+
+Review.save() shifts the caregiver's aggregates by the delta between the
+stored and the new row (CaregiverProfile.apply_rating_delta); deletes are
+handled by the pre_delete receiver below, which also covers cascades from
+Appointment or ClientProfile deletion. Writes that bypass both
+(queryset.update(), raw SQL) can leave drift behind, which
+recompute_ratings() reconciles in bulk.
+"""
+
+from django.db.models import Count, Sum
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+
+from .documents import sync_caregiver_documents
+from .models import CaregiverProfile, Review
+
+
+def recompute_ratings(batch_size=1000, dry_run=False):
+    """
+    Rebuild every profile's rating aggregates from the visible reviews with
+    one grouped query, writing only the profiles that drifted. Returns the
+    ids of the drifted profiles.
+    """
+    actual = {
+        row['caregiver_id']: (row['total'], row['count'])
+        for row in Review.objects.filter(is_visible=True).values('caregiver_id').annotate(
+            total=Sum('rating'), count=Count('id')
+        ).order_by()
+    }
+
+    drifted = []
+    profiles = CaregiverProfile.objects.only('id', 'rating_sum', 'total_reviews', 'average_rating')
+    for profile in profiles.iterator(chunk_size=batch_size):
+        rating_sum, total_reviews = actual.get(profile.id, (0, 0))
+        average_rating = CaregiverProfile.average_from_sum(rating_sum, total_reviews)
+        if (profile.rating_sum, profile.total_reviews, profile.average_rating) != (rating_sum, total_reviews, average_rating):
+            profile.rating_sum = rating_sum
+            profile.total_reviews = total_reviews
+            profile.average_rating = average_rating
+            drifted.append(profile)
+
+    if not dry_run:
+        for start in range(0, len(drifted), batch_size):
+            batch = drifted[start:start + batch_size]
+            CaregiverProfile.objects.bulk_update(batch, ['rating_sum', 'total_reviews', 'average_rating'])
+            # bulk_update skips post_save, so refresh discovery explicitly
+            sync_caregiver_documents([profile.id for profile in batch])
+    return [profile.id for profile in drifted]
+
+
+# =============================================================================
+# SIGNAL RECEIVERS (connected in ProfilesConfig.ready)
+# =============================================================================
+
+@receiver(pre_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    # Runs inside the delete transaction, before the documents post_delete
+    # receiver re-syncs the caregiver's card
+    caregiver_id, rating, count = getattr(instance, '_stored_rating', instance.rating_contribution())
+    CaregiverProfile.apply_rating_delta(caregiver_id, -rating, -count)
@@ -0,0 +1,110 @@
+"""
+CareNest Pro - Dashboard Rollups
+Description: Reads and repairs the CaregiverDailyStats rollup table.
+
+Appointment.save() keeps the rollups current on every status transition
+(including today's row), and the pre_delete receiver below retracts
+deleted appointments, so the dashboard only ever sums a handful of
+caregiver-day rows. rebuild_daily_stats() recomputes rows from raw
+appointments for repairs after bulk writes that bypass save().
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+
+from .models import Appointment, AppointmentStatus, CaregiverDailyStats
+
+# Days covered by each dashboard chart range, ending today
+CHART_RANGES = {
+    'week': 7,
+    'month': 30,
+}
+
+
+def dashboard_totals(profile, today):
+    """All-time totals plus upcoming bookings from the rollups, in one query."""
+    totals = CaregiverDailyStats.objects.filter(caregiver=profile).aggregate(
+        total_earnings=Sum('earnings'),
+        hours_worked=Sum('hours_worked'),
+        upcoming=Sum(F('pending_count') + F('confirmed_count'), filter=Q(date__gte=today)),
+    )
+    return {
+        'total_earnings': totals['total_earnings'] or Decimal('0'),
+        'hours_worked': totals['hours_worked'] or Decimal('0'),
+        'upcoming': totals['upcoming'] or 0,
+    }
+
+
+def dashboard_series(profile, today, days):
+    """One point per day for the last `days` days, zero-filled, from one query."""
+    start = today - timedelta(days=days - 1)
+    rows = {
+        row['date']: row
+        for row in CaregiverDailyStats.objects.filter(
+            caregiver=profile, date__range=(start, today)
+        ).values('date', 'earnings', 'hours_worked', 'completed_count')
+    }
+
+    series = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        row = rows.get(day, {})
+        series.append({
+            'date': day.isoformat(),
+            'earnings': float(row.get('earnings', 0)),
+            'hours_worked': float(row.get('hours_worked', 0)),
+            'completed': row.get('completed_count', 0),
+        })
+    return series
+
+
+def rebuild_daily_stats(caregiver_ids=None):
+    """Recompute rollup rows from raw appointments; returns the number of rows written."""
+    appointments = Appointment.objects.all()
+    existing = CaregiverDailyStats.objects.all()
+    if caregiver_ids is not None:
+        appointments = appointments.filter(caregiver_id__in=caregiver_ids)
+        existing = existing.filter(caregiver_id__in=caregiver_ids)
+
+    completed = Q(status=AppointmentStatus.COMPLETED)
+    rows = appointments.values('caregiver_id', 'date').annotate(
+        earnings=Sum('total_amount', filter=completed & Q(is_paid=True)),
+        hours_worked=Sum('duration_hours', filter=completed),
+        completed_count=Count('id', filter=completed),
+        pending_count=Count('id', filter=Q(status=AppointmentStatus.PENDING)),
+        confirmed_count=Count('id', filter=Q(status=AppointmentStatus.CONFIRMED)),
+        cancelled_count=Count('id', filter=Q(status=AppointmentStatus.CANCELLED)),
+    ).order_by()
+
+    stats = [
+        CaregiverDailyStats(
+            caregiver_id=row['caregiver_id'],
+            date=row['date'],
+            earnings=row['earnings'] or Decimal('0'),
+            hours_worked=row['hours_worked'] or Decimal('0'),
+            completed_count=row['completed_count'],
+            pending_count=row['pending_count'],
+            confirmed_count=row['confirmed_count'],
+            cancelled_count=row['cancelled_count'],
+        )
+        for row in rows
+    ]
+    with transaction.atomic():
+        existing.delete()
+        CaregiverDailyStats.objects.bulk_create(stats, batch_size=1000)
+    return len(stats)
+
+
+# =============================================================================
+# SIGNAL RECEIVERS (connected in ProfilesConfig.ready)
+# =============================================================================
+
+@receiver(pre_delete, sender=Appointment)
+def appointment_deleted(sender, instance, **kwargs):
+    key, stats = getattr(instance, '_stored_stats', None) or instance.stats_contribution()
+    CaregiverDailyStats.apply_delta(*key, {field: -amount for field, amount in stats.items()})
@@ -0,0 +1,149 @@
+"""
+CareNest Pro - Weekly Schedule Writes
+Description: Validated, diff-based bulk replacement of recurring availability.
+
+A weekly schedule is parsed and checked for overlaps entirely in memory,
+then applied to any number of caregivers in one transaction with a fixed
+number of statements: one read of the current recurring rows, then a
+bulk_update (re-activated or re-timed rows), a bulk_create and a targeted
+delete for whatever is left. Readers never observe a half-written week.
+One-off (specific_date) availability is left untouched.
+"""
+
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils.dateparse import parse_time
+
+from .documents import batch_document_sync, sync_caregiver_document
+from .models import Availability, DayOfWeek
+
+DAY_NAMES = {label.lower(): value for value, label in DayOfWeek.choices}
+
+
+class ScheduleError(ValueError):
+    """Raised when a submitted weekly schedule is invalid."""
+
+
+def _parse_day(value):
+    if isinstance(value, int) and value in DayOfWeek.values:
+        return value
+    if isinstance(value, str):
+        if value.isdigit() and int(value) in DayOfWeek.values:
+            return int(value)
+        if value.strip().lower() in DAY_NAMES:
+            return DAY_NAMES[value.strip().lower()]
+    raise ScheduleError(f"Invalid day: {value!r}")
+
+
+def _parse_time(value):
+    try:
+        parsed = parse_time(str(value).split('.')[0]) if value else None
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ScheduleError(f"Invalid time: {value!r}")
+    return parsed
+
+
+def parse_weekly_schedule(slots):
+    """
+    Validate the frontend schedule format
+    ([{"day": "Monday", "start": "09:00", "end": "17:00", "active": true}, ...])
+    and return the sorted active (day_of_week, start_time, end_time) slots.
+    """
+    if not isinstance(slots, list):
+        raise ScheduleError("schedule must be a list of slots")
+
+    parsed = []
+    for slot in slots:
+        if not isinstance(slot, dict):
+            raise ScheduleError("Each slot must be an object")
+        if not slot.get('active'):
+            continue
+        day = _parse_day(slot.get('day'))
+        start = _parse_time(slot.get('start'))
+        end = _parse_time(slot.get('end'))
+        if start >= end:
+            raise ScheduleError(f"{DayOfWeek(day).label}: start must be before end")
+        parsed.append((day, start, end))
+
+    parsed.sort()
+    for previous, current in zip(parsed, parsed[1:]):
+        if previous[0] == current[0] and current[1] < previous[2]:
+            raise ScheduleError(
+                f"{DayOfWeek(current[0]).label}: {current[1]:%H:%M}-{current[2]:%H:%M} "
+                f"overlaps {previous[1]:%H:%M}-{previous[2]:%H:%M}"
+            )
+    return parsed
+
+
+def replace_weekly_schedules(schedules):
+    """
+    Make each caregiver's active recurring availability exactly the given
+    slots. `schedules` maps profile id to parsed slots (see
+    parse_weekly_schedule). Returns {'created', 'updated', 'deleted'} counts.
+    """
+    profile_ids = list(schedules)
+    if not profile_ids:
+        return {'created': 0, 'updated': 0, 'deleted': 0}
+
+    with transaction.atomic(), batch_document_sync():
+        existing = defaultdict(list)
+        rows = Availability.objects.select_for_update().filter(
+            caregiver_id__in=profile_ids,
+            day_of_week__isnull=False,
+            specific_date__isnull=True,
+        ).order_by('id')
+        for row in rows:
+            existing[row.caregiver_id].append(row)
+
+        to_update = []
+        to_create = []
+        to_delete = []
+        for profile_id, slots in schedules.items():
+            current = existing.get(profile_id, [])
+            by_slot = {}
+            spare = []
+            for row in current:
+                key = (row.day_of_week, row.start_time, row.end_time)
+                if key in by_slot:
+                    spare.append(row)
+                else:
+                    by_slot[key] = row
+
+            missing = []
+            for slot in slots:
+                row = by_slot.pop(slot, None)
+                if row is None:
+                    missing.append(slot)
+                elif not row.is_active:
+                    row.is_active = True
+                    to_update.append(row)
+            # Unmatched rows (and exact duplicates) are re-timed before new ones are created
+            spare.extend(by_slot.values())
+            for day, start, end in missing:
+                if spare:
+                    row = spare.pop()
+                    row.day_of_week, row.start_time, row.end_time, row.is_active = day, start, end, True
+                    to_update.append(row)
+                else:
+                    to_create.append(Availability(
+                        caregiver_id=profile_id, day_of_week=day,
+                        start_time=start, end_time=end, is_active=True,
+                    ))
+            to_delete.extend(row.id for row in spare)
+
+        if to_update:
+            Availability.objects.bulk_update(to_update, ['day_of_week', 'start_time', 'end_time', 'is_active'])
+        if to_create:
+            Availability.objects.bulk_create(to_create)
+        if to_delete:
+            Availability.objects.filter(id__in=to_delete).delete()
+
+        # bulk_update/bulk_create skip the availability receivers; all
+        # syncs are folded into one at the end of batch_document_sync()
+        for profile_id in profile_ids:
+            sync_caregiver_document(profile_id)
+
+    return {'created': len(to_create), 'updated': len(to_update), 'deleted': len(to_delete)}
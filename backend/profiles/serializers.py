@@ -10,9 +10,12 @@ from datetime import datetime, date
 from django.db import transaction
 from django.utils import timezone
 from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
+from messaging.presence import is_online, online_user_ids
+
 # Importing models from the local profiles app
 from .models import (
     CaregiverProfile, 
@@ -22,7 +25,8 @@ from .models import (
     Availability, 
     Review, 
     ProfileNotification, 
-    Payment
+    Payment,
+    CaregiverSearchDocument
 )
 
 # Configuration for third-party registration if available
@@ -41,6 +45,15 @@ logger = logging.getLogger(__name__)
 # 1. CORE CAREGIVER SERIALIZATION ENGINE
 # =============================================================================
 
+class PresenceListSerializer(serializers.ListSerializer):
+    """Looks up the presence of every caregiver in the list in one cache round trip."""
+
+    def to_representation(self, data):
+        items = list(data.all() if hasattr(data, 'all') else data)
+        self.child.online_user_ids = online_user_ids(item.user_id for item in items)
+        return super().to_representation(items)
+
+
 class CaregiverProfileSerializer(serializers.ModelSerializer):
     """
     Primary Professional Identity Serializer.
@@ -60,10 +73,14 @@ class CaregiverProfileSerializer(serializers.ModelSerializer):
             'user', 'profile_completion', 'average_rating', 
             'total_reviews', 'created_at', 'updated_at', 'id_verified'
         )
+        list_serializer_class = PresenceListSerializer
 
     def get_is_online(self, obj):
-        # Placeholder for real-time status tracking via Redis/Websockets
-        return False
+        # Prefetched for the whole list by PresenceListSerializer when many=True
+        online = getattr(self, 'online_user_ids', None)
+        if online is not None:
+            return str(obj.user_id) in online
+        return is_online(obj.user_id)
 
     def get_verification_status(self, obj):
         if getattr(obj, 'id_verified', False):
@@ -153,12 +170,15 @@ class ClientProfileSerializer(serializers.ModelSerializer):
     full_name = serializers.SerializerMethodField()
     user_email = serializers.EmailField(source='user.email', read_only=True)
     user_type = serializers.CharField(source='user.user_type', read_only=True)
+    care_type = serializers.CharField(
+        source='preferred_care_type', required=False, allow_blank=True, allow_null=True
+    )
     
     class Meta:
         model = ClientProfile
         fields = [
             'id', 'user', 'user_email', 'user_type',
-            'first_name', 'last_name', 'phone_number',
+            'first_name', 'last_name', 'full_name', 'phone_number',
             'address', 'city', 'care_type', 
             'special_requirements', 'created_at', 'updated_at'
         ]
@@ -509,4 +529,36 @@ class ClientBasicSerializer(serializers.ModelSerializer):
         fields = ['id', 'first_name', 'last_name', 'full_name', 'city', 'care_type']
     
     def get_full_name(self, obj):
-        return f"{obj.first_name} {obj.last_name}"
\ No newline at end of file
+        return f"{obj.first_name} {obj.last_name}"
+
+# =============================================================================
+# 11. DISCOVERY READ MODEL
+# =============================================================================
+
+class CaregiverSearchDocumentSerializer(serializers.ModelSerializer):
+    """
+    Marketplace card built from the flattened CaregiverSearchDocument.
+    Reads only local columns, so serializing a page costs no extra queries.
+    """
+    id = serializers.UUIDField(source='profile_id', read_only=True)
+    profile_image = serializers.SerializerMethodField()
+    available_days = serializers.SerializerMethodField()
+
+    class Meta:
+        model = CaregiverSearchDocument
+        fields = [
+            'id', 'user_id', 'full_name', 'first_name', 'last_name', 'headline', 'bio',
+            'city', 'profile_image',
+            'specialties', 'hourly_rate', 'experience_years', 'average_rating',
+            'total_reviews', 'is_verified', 'is_featured', 'is_available',
+            'available_days'
+        ]
+        read_only_fields = fields
+
+    def get_profile_image(self, obj):
+        if not obj.profile_image:
+            return None
+        return default_storage.url(obj.profile_image)
+
+    def get_available_days(self, obj):
+        return [day for day in range(7) if obj.available_days & (1 << day)]
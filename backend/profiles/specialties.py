@@ -0,0 +1,126 @@
+"""
+CareNest Pro - Specialty Taxonomy
+Description: Normalized, indexed copy of CaregiverProfile.specialties.
+
+Profiles keep editing the free-form JSON list; on every save the list is
+slugified and diffed against the CaregiverSpecialty through table. Discovery
+filters with specialty_filter() (one grouped subquery per request, however
+many specialties are selected) and reports facet counts with
+specialty_facets() (one grouped query), both served by the
+(specialty, profile) index instead of scanning JSON.
+"""
+
+from django.db.models import Count
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils.text import slugify
+
+from api.cache import bump_version
+
+from .models import CaregiverProfile, CaregiverSpecialty, Specialty
+
+
+def normalize_specialties(values):
+    """Map a JSON specialties value to {slug: display name}, dropping blanks and duplicates."""
+    if not isinstance(values, list):
+        values = [values] if values else []
+    normalized = {}
+    for value in values:
+        if not isinstance(value, str):
+            continue
+        name = ' '.join(value.split())[:100]
+        slug = slugify(name)[:100]
+        if slug and slug not in normalized:
+            normalized[slug] = name
+    return normalized
+
+
+def parse_specialty_param(raw):
+    """Slugs from a comma separated `specialties` query parameter."""
+    return sorted({slugify(part.strip()) for part in raw.split(',') if slugify(part.strip())})
+
+
+def sync_profile_specialties(profile_ids):
+    """Bring the through table in line with the profiles' JSON lists."""
+    profile_ids = list(profile_ids)
+    if not profile_ids:
+        return
+
+    wanted = {
+        profile_id: normalize_specialties(values)
+        for profile_id, values in CaregiverProfile.objects.filter(
+            id__in=profile_ids
+        ).values_list('id', 'specialties')
+    }
+
+    names = {}
+    for specialties in wanted.values():
+        for slug, name in specialties.items():
+            names.setdefault(slug, name)
+    specialty_ids = dict(Specialty.objects.filter(slug__in=names).values_list('slug', 'id'))
+    missing = [Specialty(slug=slug, name=name) for slug, name in names.items() if slug not in specialty_ids]
+    if missing:
+        Specialty.objects.bulk_create(missing, ignore_conflicts=True)
+        specialty_ids = dict(Specialty.objects.filter(slug__in=names).values_list('slug', 'id'))
+
+    current = {}
+    for link_id, profile_id, specialty_id in CaregiverSpecialty.objects.filter(
+        profile_id__in=profile_ids
+    ).values_list('id', 'profile_id', 'specialty_id'):
+        current[(profile_id, specialty_id)] = link_id
+
+    target = {
+        (profile_id, specialty_ids[slug])
+        for profile_id, specialties in wanted.items()
+        for slug in specialties
+    }
+    stale = [link_id for pair, link_id in current.items() if pair not in target]
+    if stale:
+        CaregiverSpecialty.objects.filter(id__in=stale).delete()
+    added = [
+        CaregiverSpecialty(profile_id=profile_id, specialty_id=specialty_id)
+        for profile_id, specialty_id in target - current.keys()
+    ]
+    if added:
+        CaregiverSpecialty.objects.bulk_create(added, ignore_conflicts=True)
+    if stale or added:
+        # Facet counts changed
+        bump_version('discovery')
+
+
+def specialty_filter(slugs):
+    """Subquery of profile ids linked to every one of `slugs` (AND semantics)."""
+    return CaregiverSpecialty.objects.filter(
+        specialty__slug__in=slugs
+    ).values('profile_id').annotate(
+        matched=Count('specialty_id')
+    ).filter(matched=len(slugs)).values('profile_id')
+
+
+def specialty_facets(profile_ids):
+    """
+    Specialty counts over a set of profiles (a list or a values('profile_id')
+    subquery), computed with one grouped query.
+    """
+    rows = CaregiverSpecialty.objects.filter(
+        profile_id__in=profile_ids
+    ).values('specialty__slug', 'specialty__name').annotate(
+        count=Count('profile_id')
+    ).order_by('-count', 'specialty__name')
+    return [
+        {'slug': row['specialty__slug'], 'name': row['specialty__name'], 'count': row['count']}
+        for row in rows
+    ]
+
+
+# =============================================================================
+# SIGNAL RECEIVERS (connected in ProfilesConfig.ready)
+# =============================================================================
+
+@receiver(post_save, sender=CaregiverProfile)
+def caregiver_specialties_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and 'specialties' not in update_fields:
+        return
+    sync_profile_specialties([instance.pk])
@@ -1,3 +1,249 @@
+from datetime import date, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from .models import Appointment, AppointmentStatus, CaregiverDailyStats, CaregiverProfile, ClientProfile, Review
+from .ratings import recompute_ratings
+from .rollups import rebuild_daily_stats
+
+User = get_user_model()
+
+
+class RatingAggregateTests(TestCase):
+    """
+    Every review transition leaves the running aggregates exactly where a
+    full recompute_ratings() rebuild puts them.
+    """
+
+    def setUp(self):
+        self.caregiver = self.make_caregiver('caregiver@example.com')
+        self.other_caregiver = self.make_caregiver('other@example.com')
+        self.client_profile = self.make_client('client@example.com')
+
+    def make_caregiver(self, email):
+        user = User.objects.create_user(email=email, password=None, user_type='caregiver')
+        return CaregiverProfile.objects.create(user=user)
+
+    def make_client(self, email):
+        user = User.objects.create_user(email=email, password=None, user_type='client')
+        return ClientProfile.objects.create(user=user)
+
+    def review(self, rating, caregiver=None, client=None, **fields):
+        caregiver = caregiver or self.caregiver
+        client = client or self.client_profile
+        appointment = Appointment.objects.create(
+            caregiver=caregiver, client=client, service_type='Care', date=date.today(),
+            start_time=time(9), end_time=time(10), hourly_rate_at_booking=25,
+        )
+        return Review.objects.create(
+            appointment=appointment, caregiver=caregiver, client=client, rating=rating, **fields
+        )
+
+    def aggregates(self):
+        return {
+            profile.id: (profile.average_rating, profile.total_reviews, profile.rating_sum)
+            for profile in CaregiverProfile.objects.all()
+        }
+
+    def assert_matches_recompute(self, average, total_reviews, rating_sum):
+        """The incremental aggregates equal a fresh rebuild, and the rebuild changes nothing."""
+        incremental = self.aggregates()
+        self.assertEqual(recompute_ratings(dry_run=True), [])
+        recompute_ratings()
+        self.assertEqual(self.aggregates(), incremental)
+        self.assertEqual(incremental[self.caregiver.id], (Decimal(average), total_reviews, rating_sum))
+
+    def test_create(self):
+        self.review(4)
+        self.review(5)
+        self.review(3, is_visible=False)
+        self.assert_matches_recompute('4.50', 2, 9)
+
+    def test_edit_from_loaded_snapshot(self):
+        self.review(4)
+        review = Review.objects.get(pk=self.review(5).pk)
+        review.rating = 2
+        review.save()
+        self.assert_matches_recompute('3.00', 2, 6)
+
+        # A second save diffs against the first, not the row as loaded
+        review.rating = 1
+        review.save()
+        self.assert_matches_recompute('2.50', 2, 5)
+
+    def test_edit_partial_load(self):
+        self.review(4)
+        review = Review.objects.only('id', 'rating').get(pk=self.review(5).pk)
+        review.rating = 3
+        review.save()
+        self.assert_matches_recompute('3.50', 2, 7)
+
+    def test_edit_moves_review_between_caregivers(self):
+        self.review(4)
+        review = self.review(2)
+        review.caregiver = self.other_caregiver
+        review.save()
+        self.assert_matches_recompute('4.00', 1, 4)
+
+    def test_visibility_toggle(self):
+        self.review(4)
+        review = self.review(5)
+        review.is_visible = False
+        review.save()
+        self.assert_matches_recompute('4.00', 1, 4)
+
+        # Edits while hidden contribute nothing
+        review.rating = 1
+        review.save()
+        self.assert_matches_recompute('4.00', 1, 4)
+
+        review.is_visible = True
+        review.save()
+        self.assert_matches_recompute('2.50', 2, 5)
+
+    def test_delete(self):
+        self.review(4)
+        self.review(2).delete()
+        self.review(1, is_visible=False).delete()
+        self.assert_matches_recompute('4.00', 1, 4)
+
+    def test_queryset_delete(self):
+        self.review(4)
+        self.review(2)
+        Review.objects.filter(rating=4).delete()
+        self.assert_matches_recompute('2.00', 1, 2)
+
+    def test_delete_last_review(self):
+        self.review(4).delete()
+        self.assert_matches_recompute('0.00', 0, 0)
+
+    def test_cascade_from_appointment(self):
+        self.review(4)
+        self.review(5).appointment.delete()
+        self.assert_matches_recompute('4.00', 1, 4)
+
+    def test_cascade_from_client_profile(self):
+        other_client = self.make_client('other-client@example.com')
+        self.review(4)
+        self.review(1, client=other_client)
+        self.review(2, client=other_client, caregiver=self.other_caregiver)
+        other_client.delete()
+        self.assert_matches_recompute('4.00', 1, 4)
+
+
+class DailyStatsTests(TestCase):
+    """
+    Incremental CaregiverDailyStats maintenance matches a rebuild_daily_stats()
+    from raw appointments after every transition.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.caregiver_user = User.objects.create_user(
+            email='caregiver@example.com', password=None, user_type='caregiver',
+        )
+        self.caregiver = CaregiverProfile.objects.create(user=self.caregiver_user)
+        client = User.objects.create_user(email='client@example.com', password=None, user_type='client')
+        self.client_profile = ClientProfile.objects.create(user=client)
+        self.today = date.today()
+
+    def appointment(self, day, status=AppointmentStatus.PENDING, hours=2, is_paid=False):
+        return Appointment.objects.create(
+            caregiver=self.caregiver, client=self.client_profile, service_type='Care', date=day,
+            start_time=time(9), end_time=time(9 + hours), duration_hours=hours,
+            hourly_rate_at_booking=25, status=status, is_paid=is_paid,
+        )
+
+    def rollups(self):
+        """Non-empty rollup rows; a rebuild writes no row for a day that nets to zero."""
+        return {
+            (row.pop('caregiver_id'), row.pop('date')): row
+            for row in CaregiverDailyStats.objects.values('caregiver_id', 'date', *CaregiverDailyStats.STAT_FIELDS)
+            if any(row[field] for field in CaregiverDailyStats.STAT_FIELDS)
+        }
+
+    def assert_matches_rebuild(self):
+        incremental = self.rollups()
+        rebuild_daily_stats()
+        self.assertEqual(self.rollups(), incremental)
+
+    def test_status_transitions(self):
+        appointment = self.appointment(self.today)
+        self.assert_matches_rebuild()
+        for status in (AppointmentStatus.CONFIRMED, AppointmentStatus.IN_PROGRESS, AppointmentStatus.COMPLETED):
+            appointment.status = status
+            appointment.save()
+            self.assert_matches_rebuild()
+
+        appointment.is_paid = True
+        appointment.save()
+        self.assert_matches_rebuild()
+
+        other = Appointment.objects.get(pk=self.appointment(self.today).pk)
+        other.status = AppointmentStatus.CANCELLED
+        other.save()
+        self.assert_matches_rebuild()
+
+    def test_partial_load_transition(self):
+        appointment = self.appointment(self.today)
+        appointment = Appointment.objects.only('id', 'status').get(pk=appointment.pk)
+        appointment.status = AppointmentStatus.CONFIRMED
+        appointment.save()
+        self.assert_matches_rebuild()
+
+    def test_date_move_crosses_day_boundary(self):
+        appointment = self.appointment(self.today, AppointmentStatus.COMPLETED, is_paid=True)
+        self.appointment(self.today, AppointmentStatus.CONFIRMED)
+
+        appointment.date = self.today + timedelta(days=1)
+        appointment.save()
+        self.assert_matches_rebuild()
+
+        # Moved and changed in one save
+        appointment = Appointment.objects.get(pk=appointment.pk)
+        appointment.date = self.today - timedelta(days=1)
+        appointment.status = AppointmentStatus.CANCELLED
+        appointment.save()
+        self.assert_matches_rebuild()
+
+    def test_delete_after_date_move(self):
+        appointment = self.appointment(self.today, AppointmentStatus.CONFIRMED)
+        self.appointment(self.today + timedelta(days=1), AppointmentStatus.COMPLETED)
+        appointment.date = self.today + timedelta(days=1)
+        appointment.save()
+        appointment.delete()
+        self.assert_matches_rebuild()
+
+    def test_queryset_delete_across_days(self):
+        for offset in range(3):
+            self.appointment(self.today + timedelta(days=offset), AppointmentStatus.COMPLETED, is_paid=True)
+            self.appointment(self.today + timedelta(days=offset), AppointmentStatus.PENDING)
+        Appointment.objects.filter(date__gt=self.today).delete()
+        self.assert_matches_rebuild()
+
+    def test_dashboard_reads_rollups_in_bounded_queries(self):
+        for offset in range(40):
+            day = self.today - timedelta(days=offset)
+            self.appointment(day, AppointmentStatus.COMPLETED, is_paid=True)
+            self.appointment(day + timedelta(days=45), AppointmentStatus.CONFIRMED)
+        api = APIClient()
+        api.force_authenticate(self.caregiver_user)
+
+        # Profile, totals and one series query, however many appointments
+        with self.assertNumQueries(3):
+            response = api.get('/api/profiles/caregiver/dashboard_stats/', {'range': 'month'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_earnings'], 40 * 50.0)
+        self.assertEqual(response.data['hours_worked'], 40 * 2.0)
+        self.assertEqual(response.data['upcoming_appointments'], 40)
+        self.assertEqual(len(response.data['series']), 30)
+        self.assertEqual(sum(point['completed'] for point in response.data['series']), 30)
 
-# Create your tests here.
+        rebuild_daily_stats()
+        with self.assertNumQueries(3):
+            rebuilt = api.get('/api/profiles/caregiver/dashboard_stats/', {'range': 'month'})
+        self.assertEqual(rebuilt.data, response.data)
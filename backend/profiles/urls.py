@@ -35,6 +35,9 @@ urlpatterns = [
     # /api/profiles/caregiver/update_availability/
     path('caregiver/update_availability/', views.CaregiverUpdateAvailabilityView.as_view(), name='caregiver-update-availability'),
     
+    # /api/profiles/caregiver/availability/batch/ (staff: agency onboarding)
+    path('caregiver/availability/batch/', views.CaregiverAvailabilityBatchView.as_view(), name='caregiver-availability-batch'),
+    
     # /api/profiles/caregiver/complete_profile/
     path('caregiver/complete_profile/', views.CompleteCaregiverProfileView.as_view(), name='complete-caregiver-profile'),
     
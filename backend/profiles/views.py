@@ -13,18 +13,30 @@ from django.utils import timezone
 from datetime import timedelta
 import json
 import logging
+import uuid
+
+from api.cache import cache_response, conditional_response
+from messaging.presence import online_user_ids
 
 # Import the models exactly as defined in your Enterprise Schema
 from .models import (
     CaregiverProfile, ClientProfile, Appointment, 
-    Availability, Review, ProfileNotification,
+    Availability, Review, ProfileNotification, CaregiverSearchDocument,
     AppointmentStatus, NotificationType, PaymentStatus
 )
+from .documents import CAREGIVER_TEXT_INDEX
+from .geo import haversine_km, radius_filter
+from .pagination import (
+    InvalidCursor, KeysetPaginator, decode_cursor, encode_cursor, paginate_sorted
+)
+from .rollups import CHART_RANGES, dashboard_series, dashboard_totals
+from .schedules import ScheduleError, parse_weekly_schedule, replace_weekly_schedules
 from .serializers import (
     CaregiverProfileSerializer, ClientProfileSerializer,
     AppointmentSerializer, AvailabilitySerializer,
-    ReviewSerializer, NotificationSerializer
+    ReviewSerializer, NotificationSerializer, CaregiverSearchDocumentSerializer
 )
+from .specialties import parse_specialty_param, specialty_facets, specialty_filter
 
 logger = logging.getLogger(__name__)
 
@@ -98,49 +110,110 @@ class CaregiverMeView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 class CaregiverDashboardStatsView(APIView):
-    """Business Intelligence following the schema metrics."""
+    """
+    Business Intelligence following the schema metrics.
+    Reads the CaregiverDailyStats rollups only. Optional range=week|month
+    adds a zero-filled daily `series` for charts.
+    """
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request):
+        chart_range = request.GET.get('range')
+        if chart_range and chart_range not in CHART_RANGES:
+            return Response(
+                {"error": f"Invalid range parameter. Use one of: {', '.join(CHART_RANGES)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
         try:
             profile = CaregiverProfile.objects.get(user=request.user)
         except CaregiverProfile.DoesNotExist:
             return Response({"exists": False, "stats": {"total_earnings": 0, "hours_worked": 0}})
         
-        appointments = Appointment.objects.filter(caregiver=profile)
-        total_earnings = appointments.filter(status=AppointmentStatus.COMPLETED, is_paid=True).aggregate(Sum('total_amount'))['total_amount__sum'] or 0
-        total_hours = appointments.filter(status=AppointmentStatus.COMPLETED).aggregate(Sum('duration_hours'))['duration_hours__sum'] or 0
-        
-        return Response({
+        today = timezone.now().date()
+        totals = dashboard_totals(profile, today)
+        data = {
             "exists": True,
-            "total_earnings": float(total_earnings),
-            "hours_worked": float(total_hours),
+            "total_earnings": float(totals['total_earnings']),
+            "hours_worked": float(totals['hours_worked']),
             "rating": float(profile.average_rating),
             "total_reviews": profile.total_reviews,
-            "upcoming_appointments": appointments.filter(status__in=[AppointmentStatus.PENDING, AppointmentStatus.CONFIRMED], date__gte=timezone.now().date()).count()
-        })
+            "upcoming_appointments": totals['upcoming']
+        }
+        if chart_range:
+            data["range"] = chart_range
+            data["series"] = dashboard_series(profile, today, CHART_RANGES[chart_range])
+        return Response(data)
 
 class CaregiverUpdateAvailabilityView(APIView):
-    """Maps frontend day strings to DayOfWeek integer choices in the schema."""
+    """
+    Maps frontend day strings to DayOfWeek integer choices in the schema.
+    The submitted week replaces the recurring schedule atomically; only
+    the slots that differ are written.
+    """
     permission_classes = [permissions.IsAuthenticated]
     
     def patch(self, request):
         profile = get_object_or_404(CaregiverProfile, user=request.user)
-        schedule_data = request.data.get('schedule', [])
-        
-        Availability.objects.filter(caregiver=profile).delete()
-        
-        day_map = {'Monday': 0, 'Tuesday': 1, 'Wednesday': 2, 'Thursday': 3, 'Friday': 4, 'Saturday': 5, 'Sunday': 6}
-        for slot in schedule_data:
-            if slot.get('active'):
-                Availability.objects.create(
-                    caregiver=profile,
-                    day_of_week=day_map.get(slot.get('day'), 0),
-                    start_time=slot.get('start'),
-                    end_time=slot.get('end'),
-                    is_active=True
-                )
-        return Response({'status': 'Availability updated'})
+        try:
+            slots = parse_weekly_schedule(request.data.get('schedule', []))
+        except ScheduleError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        changes = replace_weekly_schedules({profile.id: slots})
+        return Response({'status': 'Availability updated', 'changes': changes})
+
+class CaregiverAvailabilityBatchView(APIView):
+    """
+    POST /api/profiles/caregiver/availability/batch/ (staff only)
+    Body: {"schedules": [{"profile_id": "<uuid>", "schedule": [...]}, ...]}
+
+    Agency onboarding: replaces the weekly schedules of many caregivers in
+    one transaction. Every schedule is validated first; any error rejects
+    the whole batch.
+    """
+    permission_classes = [permissions.IsAdminUser]
+    MAX_BATCH_SIZE = 500
+
+    def post(self, request):
+        entries = request.data.get('schedules')
+        if not isinstance(entries, list) or not entries:
+            return Response({"error": "schedules must be a non-empty list"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(entries) > self.MAX_BATCH_SIZE:
+            return Response(
+                {"error": f"At most {self.MAX_BATCH_SIZE} schedules per batch"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        schedules = {}
+        positions = {}
+        errors = {}
+        for index, entry in enumerate(entries):
+            if not isinstance(entry, dict):
+                errors[index] = "Each entry must be an object"
+                continue
+            try:
+                profile_id = uuid.UUID(str(entry.get('profile_id')))
+            except ValueError:
+                errors[index] = "Invalid profile_id"
+                continue
+            if profile_id in schedules:
+                errors[index] = "Duplicate profile_id"
+                continue
+            try:
+                schedules[profile_id] = parse_weekly_schedule(entry.get('schedule', []))
+                positions[profile_id] = index
+            except ScheduleError as e:
+                errors[index] = str(e)
+
+        known = set(CaregiverProfile.objects.filter(id__in=list(schedules)).values_list('id', flat=True))
+        for profile_id in schedules.keys() - known:
+            errors[positions[profile_id]] = "Caregiver profile not found"
+        if errors:
+            return Response({"error": "Invalid schedules", "details": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        changes = replace_weekly_schedules(schedules)
+        return Response({'status': 'Availability updated', 'caregivers': len(schedules), 'changes': changes})
 
 class CompleteCaregiverProfileView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -265,7 +338,7 @@ class NotificationViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['post'])
     def mark_all_read(self, request):
-        self.get_queryset().update(is_read=True)
+        self.get_queryset().filter(is_read=False).update(is_read=True)
         return Response({'status': 'success'})
 
 # =============================================================================
@@ -273,17 +346,81 @@ class NotificationViewSet(viewsets.ModelViewSet):
 # =============================================================================
 
 class CaregiverDiscoveryView(APIView):
+    """
+    GET /api/profiles/caregiver/discovery/
+
+    Filters: min_rate, max_rate, specialties (comma separated slugs or
+    names; a caregiver must have all of them)
+    Text search: q - matched against bio, specialties, city and location
+    through the full-text index, among the caregivers passing the other
+    filters; relevance is blended into `recommended`. `truncated` is set
+    when more than MAX_TEXT_MATCHES of them match.
+    Sorting: recommended, rating, rate_low, rate_high, experience (others
+    fall back to the default)
+    Proximity: lat, lng, radius_km (default 25) - enables sort=distance
+    (default when coordinates are given) and sort=best_match, a blend of
+    proximity and rating.
+    Paging: keyset cursors - pass the returned `next_cursor` as `cursor`.
+    page_size defaults to 20 (max 100).
+    Facets: the first page also returns `facets`, specialty counts over
+    every match.
+
+    Reads the flattened CaregiverSearchDocument read model only: one
+    indexed scan, no joins, compact cards. Responses are cached per
+    normalized query string (with ETags) until any document is re-synced;
+    each card's `is_online` is looked up live, in bulk, per request.
+    """
     permission_classes = [permissions.AllowAny]
-    
+
+    DEFAULT_RADIUS_KM = 25.0
+    MAX_RADIUS_KM = 500.0
+    # Share of the best_match score given to proximity (the rest is rating)
+    PROXIMITY_WEIGHT = 0.6
+    # Share of the recommended score given to text relevance when q is set
+    RELEVANCE_WEIGHT = 0.7
+    # Upper bound on text matches ranked per request
+    MAX_TEXT_MATCHES = 1000
+    DEFAULT_PAGE_SIZE = 20
+    MAX_PAGE_SIZE = 100
+    # Set by apply_text_query when MAX_TEXT_MATCHES cut the match set
+    text_truncated = False
+
+    # Each ordering ends on the primary key so the keyset is total; the
+    # tiebreaker follows the leading direction so one index serves it.
+    SORT_ORDERINGS = {
+        'recommended': ['-average_rating', '-total_reviews', '-id'],
+        # "Top Rated": recommended without text relevance blended in
+        'rating': ['-average_rating', '-total_reviews', '-id'],
+        'rate_low': ['hourly_rate', 'id'],
+        'rate_high': ['-hourly_rate', '-id'],
+        'experience': ['-experience_years', '-id'],
+    }
+
     def get(self, request):
+        # Presence changes far faster than the cards, so it is overlaid per
+        # request, outside the response cache, with an ETag covering both
+        response = self.get_cards(request)
+        if response.status_code != status.HTTP_200_OK:
+            return response
+        results = response.data['results']
+        online = online_user_ids(item['user_id'] for item in results)
+        return conditional_response(request, dict(
+            response.data,
+            results=[dict(item, is_online=str(item['user_id']) in online) for item in results],
+        ))
+
+    @cache_response('discovery')
+    def get_cards(self, request):
         try:
             # Parse query parameters
             min_rate = request.GET.get('min_rate')
             max_rate = request.GET.get('max_rate')
-            sort = request.GET.get('sort', 'recommended')
+            lat = request.GET.get('lat')
+            lng = request.GET.get('lng')
+            text = request.GET.get('q', '').strip()
             
             # Start with base queryset
-            qs = CaregiverProfile.objects.filter(is_active=True)
+            qs = CaregiverSearchDocument.objects.filter(is_active=True)
             
             # Apply rate filtering if provided
             if min_rate:
@@ -303,24 +440,53 @@ class CaregiverDiscoveryView(APIView):
                         {"error": "Invalid max_rate parameter"},
                         status=status.HTTP_400_BAD_REQUEST
                     )
-            
-            # Apply sorting
-            if sort == 'recommended':
-                qs = qs.order_by('-average_rating', '-total_reviews')
-            elif sort == 'rate_low':
-                qs = qs.order_by('hourly_rate')
-            elif sort == 'rate_high':
-                qs = qs.order_by('-hourly_rate')
-            elif sort == 'experience':
-                qs = qs.order_by('-experience_years')
-            
-            # Limit results
-            qs = qs[:20]
+
+            specialties = parse_specialty_param(request.GET.get('specialties', ''))
+            if specialties:
+                qs = qs.filter(profile_id__in=specialty_filter(specialties))
+
+            try:
+                page_size = int(request.GET.get('page_size', self.DEFAULT_PAGE_SIZE))
+            except (ValueError, TypeError):
+                return Response(
+                    {"error": "Invalid page_size parameter"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            page_size = max(1, min(page_size, self.MAX_PAGE_SIZE))
+
+            default_sort = 'distance' if (lat or lng) else 'recommended'
+            sort = request.GET.get('sort', default_sort)
+            proximity_sorts = ('distance', 'best_match') if (lat or lng) else ()
+            if sort not in self.SORT_ORDERINGS and sort not in proximity_sorts:
+                # Unknown sorts get the default ordering, as they always have
+                sort = default_sort
+
+            mode = self.ranking_mode(sort, bool(lat or lng), text)
+            after = self.get_cursor_position(request, sort, mode)
+            # Facets describe the whole match set, so only the first page carries them
+            with_facets = after is None
+
+            if lat or lng:
+                return self.get_nearby(request, qs, lat, lng, sort, mode, page_size, after, text, with_facets)
+
+            qs, relevance = self.apply_text_query(qs, text)
+            if mode == 'text':
+                # Relevance only exists in memory; the match set is bounded
+                candidates = [(document, None) for document in qs]
+                return self.get_ranked_page(
+                    candidates, sort, mode, page_size, after, relevance, with_facets=with_facets
+                )
+
+            paginator = KeysetPaginator(self.SORT_ORDERINGS[sort], page_size)
+            documents, next_key = paginator.paginate(qs, after)
+            facets = specialty_facets(qs.values('profile_id')) if with_facets else None
             
             # Serialize with error handling
-            serializer = CaregiverProfileSerializer(qs, many=True)
-            return Response(serializer.data)
+            serializer = CaregiverSearchDocumentSerializer(documents, many=True)
+            return self.get_page_response(sort, mode, serializer.data, next_key, facets)
             
+        except InvalidCursor as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.error(f"Caregiver discovery error: {str(e)}")
             return Response(
@@ -328,6 +494,145 @@ class CaregiverDiscoveryView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    def ranking_mode(self, sort, nearby, text):
+        """
+        How the page is ordered: 'keyset' (database seek), 'text'
+        (relevance blended in memory), 'geo' or 'geo_text' (radius
+        candidates ranked in memory). Cursors carry the mode so one
+        ordering's cursor is never applied to another's keys.
+        """
+        by_relevance = bool(text) and sort == 'recommended' and CAREGIVER_TEXT_INDEX.available()
+        if nearby:
+            return 'geo_text' if by_relevance else 'geo'
+        return 'text' if by_relevance else 'keyset'
+
+    def apply_text_query(self, qs, text):
+        """
+        Restrict the (already filtered) documents to those matching `text`.
+        Returns the queryset and a {document id: relevance in 0..1} map, or
+        None for relevance when there is no text or the full-text index is
+        unavailable and plain substring matching is used instead.
+
+        The search only considers the filtered documents, so the cap of
+        MAX_TEXT_MATCHES applies to matches that pass every other filter;
+        when it is reached the response says so with `truncated`.
+        """
+        if not text:
+            return qs, None
+        within = qs.values('id').query.sql_with_params()
+        hits = CAREGIVER_TEXT_INDEX.search(text, limit=self.MAX_TEXT_MATCHES, within=within)
+        if hits is None:
+            return qs.filter(
+                Q(headline__icontains=text) | Q(city__icontains=text) | Q(full_name__icontains=text)
+            ), None
+
+        if not hits:
+            return qs.none(), {}
+        self.text_truncated = len(hits) >= self.MAX_TEXT_MATCHES
+        best = max(hit.score for hit in hits) or 1.0
+        relevance = {hit.key: hit.score / best for hit in hits}
+        return qs.filter(id__in=list(relevance)), relevance
+
+    def get_cursor_position(self, request, sort, mode):
+        token = request.GET.get('cursor')
+        if not token:
+            return None
+        payload = decode_cursor(token)
+        if payload.get('sort') != sort or payload.get('mode') != mode:
+            raise InvalidCursor("Cursor does not match the requested sort")
+        return payload['after']
+
+    def get_page_response(self, sort, mode, results, next_key, facets=None):
+        next_cursor = None
+        if next_key is not None:
+            next_cursor = encode_cursor({'sort': sort, 'mode': mode, 'after': next_key})
+        data = {
+            "next_cursor": next_cursor,
+            "results": results,
+        }
+        if self.text_truncated:
+            data["truncated"] = True
+        if facets is not None:
+            data["facets"] = {"specialties": facets}
+        return Response(data)
+
+    def get_nearby(self, request, qs, lat, lng, sort, mode, page_size, after, text='', with_facets=False):
+        """Radius search: indexed geohash/bounding-box prefilter, exact haversine on survivors."""
+        try:
+            lat = float(lat)
+            lng = float(lng)
+            radius_km = float(request.GET.get('radius_km', self.DEFAULT_RADIUS_KM))
+        except (ValueError, TypeError):
+            return Response(
+                {"error": "lat, lng and radius_km must be numbers"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+            return Response(
+                {"error": "lat/lng out of range"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not (0 < radius_km <= self.MAX_RADIUS_KM):
+            return Response(
+                {"error": f"radius_km must be between 0 and {self.MAX_RADIUS_KM:g}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        qs = qs.filter(radius_filter(lat, lng, radius_km))
+        qs, relevance = self.apply_text_query(qs, text)
+
+        nearby = []
+        for document in qs:
+            distance = haversine_km(lat, lng, document.latitude, document.longitude)
+            if distance <= radius_km:
+                nearby.append((document, distance))
+
+        return self.get_ranked_page(nearby, sort, mode, page_size, after, relevance, radius_km, with_facets)
+
+    def get_ranked_page(self, candidates, sort, mode, page_size, after, relevance=None, radius_km=None,
+                        with_facets=False):
+        """
+        Rank (document, distance) pairs in memory and page over them with
+        the same keyset semantics; the radius or the text match bounds the
+        candidate set.
+        """
+        if sort == 'distance':
+            def key(item):
+                return [item[1], item[0].id]
+        elif sort == 'best_match':
+            def key(item):
+                document, distance = item
+                proximity = 1 - distance / radius_km
+                rating = float(document.average_rating) / 5
+                score = self.PROXIMITY_WEIGHT * proximity + (1 - self.PROXIMITY_WEIGHT) * rating
+                return [-score, document.id]
+        elif sort == 'recommended' and relevance:
+            def key(item):
+                document = item[0]
+                rating = float(document.average_rating) / 5
+                score = self.RELEVANCE_WEIGHT * relevance.get(document.id, 0.0) + (1 - self.RELEVANCE_WEIGHT) * rating
+                return [-score, -document.total_reviews, document.id]
+        else:
+            def key(item):
+                document = item[0]
+                values = []
+                for field in self.SORT_ORDERINGS[sort][:-1]:
+                    value = float(getattr(document, field.lstrip('-')))
+                    values.append(-value if field.startswith('-') else value)
+                return values + [document.id]
+
+        facets = None
+        if with_facets:
+            facets = specialty_facets([document.profile_id for document, _ in candidates])
+
+        candidates.sort(key=key)
+        page, next_key = paginate_sorted(candidates, key, page_size, after)
+
+        data = CaregiverSearchDocumentSerializer([document for document, _ in page], many=True).data
+        for item, (_, distance) in zip(data, page):
+            if distance is not None:
+                item['distance_km'] = round(distance, 2)
+        return self.get_page_response(sort, mode, data, next_key, facets)
+
 class HealthCheckView(APIView):
     permission_classes = [permissions.AllowAny]
     def get(self, request):
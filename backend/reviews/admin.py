@@ -7,6 +7,7 @@ class ReviewAdmin(admin.ModelAdmin):
     list_filter = ('rating', 'would_recommend', 'created_at')
     search_fields = ('caregiver__email', 'reviewer__email', 'comment')
     readonly_fields = ('created_at', 'updated_at', 'responded_at')
+    list_select_related = ('caregiver__caregiver_profile', 'reviewer__client_profile')
     
     def caregiver_name(self, obj):
         return obj.caregiver.caregiver_profile.first_name if hasattr(obj.caregiver, 'caregiver_profile') else obj.caregiver.email
@@ -0,0 +1,29 @@
+"""
+CareNest Pro - Review Cache Invalidation
+Description: Bumps the per-caregiver `reviews` cache stamp read by
+caregiver_reviews and ReviewStatsView whenever their inputs change.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from api.cache import bump_version
+from profiles.models import CaregiverProfile
+
+from .models import Review
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def review_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    bump_version('reviews', instance.caregiver_id)
+
+
+@receiver(post_save, sender=CaregiverProfile)
+def caregiver_profile_changed(sender, instance, raw=False, **kwargs):
+    # caregiver_reviews shows the caregiver's name
+    if raw:
+        return
+    bump_version('reviews', instance.user_id)
@@ -1,3 +1,58 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from bookings.models import Booking
+from profiles.models import CaregiverProfile, ClientProfile
+
+from .models import Review
+
+User = get_user_model()
+
+
+class ReviewListQueryCountTests(TestCase):
+    """
+    The review list runs the same number of queries for a small and a large
+    page: each review has its own reviewer, caregiver and booking.
+    """
+
+    SMALL, LARGE = 2, 20
+
+    def setUp(self):
+        cache.clear()
+        admin = User.objects.create_user(email='admin@example.com', password=None, user_type='admin')
+        self.api = APIClient()
+        self.api.force_authenticate(admin)
+        self.rows = 0
+
+    def add_review(self):
+        n = self.rows = self.rows + 1
+        client = User.objects.create_user(email=f'client-{n}@example.com', password=None, user_type='client')
+        ClientProfile.objects.create(user=client, first_name='Client', last_name=str(n), city='Austin')
+        caregiver = User.objects.create_user(
+            email=f'caregiver-{n}@example.com', password=None, user_type='caregiver',
+        )
+        CaregiverProfile.objects.create(
+            user=caregiver, first_name='Caregiver', last_name=str(n), city='Austin',
+            hourly_rate=25, specialties=['Elder Care'],
+        )
+        start = timezone.now() - timedelta(days=n)
+        booking = Booking.objects.create(
+            client=client, caregiver=caregiver, service_type='Care',
+            start_datetime=start, end_datetime=start + timedelta(hours=2), hours=2,
+            address='1 Main St', city='Austin', hourly_rate=25, status='completed',
+        )
+        Review.objects.create(booking=booking, reviewer=client, caregiver=caregiver, rating=5, comment='Great')
 
-# Create your tests here.
+    def test_review_list(self):
+        for size in (self.SMALL, self.LARGE):
+            while self.rows < size:
+                self.add_review()
+            with self.assertNumQueries(4):
+                response = self.api.get('/api/reviews/reviews/')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data['count'], size)
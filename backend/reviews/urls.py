@@ -7,7 +7,7 @@ router.register(r'reviews', views.ReviewViewSet, basename='review')
 
 urlpatterns = [
     path('', include(router.urls)),
-    path('caregiver/<int:caregiver_id>/', views.caregiver_reviews, name='caregiver-reviews'),
-    path('caregiver/<int:caregiver_id>/stats/', views.ReviewStatsView.as_view(), name='review-stats'),
+    path('caregiver/<uuid:caregiver_id>/', views.caregiver_reviews, name='caregiver-reviews'),
+    path('caregiver/<uuid:caregiver_id>/stats/', views.ReviewStatsView.as_view(), name='review-stats'),
     path('available/', views.available_to_review, name='available-to-review'),
 ]
\ No newline at end of file
@@ -2,8 +2,12 @@ from rest_framework import generics, permissions, status, viewsets
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes, action
 from django.shortcuts import get_object_or_404
-from django.db.models import Avg, Count
+from django.db.models import Avg, Count, Q
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from api.cache import cache_response
+from api.query_plans import plan_queryset
 
 from .models import Review
 from .serializers import ReviewSerializer, CreateReviewSerializer, CaregiverResponseSerializer
@@ -24,11 +28,12 @@ class ReviewViewSet(viewsets.ModelViewSet):
         user = self.request.user
         
         if user.user_type == 'client':
-            return Review.objects.filter(reviewer=user)
+            queryset = Review.objects.filter(reviewer=user)
         elif user.user_type == 'caregiver':
-            return Review.objects.filter(caregiver=user)
+            queryset = Review.objects.filter(caregiver=user)
         else:  # admin
-            return Review.objects.all()
+            queryset = Review.objects.all()
+        return plan_queryset(queryset, self.get_serializer_class())
     
     def perform_create(self, serializer):
         serializer.save()
@@ -56,6 +61,7 @@ class ReviewViewSet(viewsets.ModelViewSet):
 
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
+@cache_response('reviews', scope_kwarg='caregiver_id')
 def caregiver_reviews(request, caregiver_id):
     """Get all reviews for a specific caregiver (public endpoint)"""
     try:
@@ -73,7 +79,7 @@ def caregiver_reviews(request, caregiver_id):
     stats = reviews.aggregate(
         avg_rating=Avg('rating'),
         total_reviews=Count('id'),
-        recommended=Count('id', filter=models.Q(would_recommend=True))
+        recommended=Count('id', filter=Q(would_recommend=True))
     )
     
     return Response({
@@ -117,6 +123,7 @@ class ReviewStatsView(generics.RetrieveAPIView):
     """Get review statistics for a caregiver"""
     permission_classes = [permissions.AllowAny]
     
+    @cache_response('reviews', scope_kwarg='caregiver_id')
     def get(self, request, caregiver_id):
         try:
             caregiver = User.objects.get(id=caregiver_id, user_type='caregiver')
@@ -131,17 +138,18 @@ class ReviewStatsView(generics.RetrieveAPIView):
         stats = reviews.aggregate(
             avg_rating=Avg('rating'),
             total_reviews=Count('id'),
-            five_star=Count('id', filter=models.Q(rating=5)),
-            four_star=Count('id', filter=models.Q(rating=4)),
-            three_star=Count('id', filter=models.Q(rating=3)),
-            two_star=Count('id', filter=models.Q(rating=2)),
-            one_star=Count('id', filter=models.Q(rating=1)),
-            recommended=Count('id', filter=models.Q(would_recommend=True))
+            five_star=Count('id', filter=Q(rating=5)),
+            four_star=Count('id', filter=Q(rating=4)),
+            three_star=Count('id', filter=Q(rating=3)),
+            two_star=Count('id', filter=Q(rating=2)),
+            one_star=Count('id', filter=Q(rating=1)),
+            recommended=Count('id', filter=Q(would_recommend=True)),
+            responded=Count('id', filter=~Q(caregiver_response=''))
         )
         
         # Calculate percentages
         total = stats['total_reviews'] or 1  # Avoid division by zero
         stats['recommendation_rate'] = round((stats['recommended'] / total) * 100, 1) if total > 0 else 0
-        stats['response_rate'] = round((reviews.filter(caregiver_response__isnull=False).count() / total) * 100, 1) if total > 0 else 0
+        stats['response_rate'] = round((stats.pop('responded') / total) * 100, 1) if total > 0 else 0
         
         return Response(stats)
\ No newline at end of file